@@ -0,0 +1,168 @@
+"""
+HNSW Parametre Değerlendirmesi - recall@k / gecikme tablosu
+
+Otel koleksiyonunun vektörleriyle her (M, ef_construction) için ayrı bir Chroma
+koleksiyonu kurar; her ef_search değerinde sorguları çalıştırıp ANN sonuçlarını
+float32 kaba kuvvet komşularla (tam sonuç) karşılaştırır. Rapor: recall@k,
+p50/p95 sorgu gecikmesi ve kurulum süresi. Seçilen çalışma noktası
+MERGENX_HNSW_M / MERGENX_HNSW_EF_CONSTRUCTION / MERGENX_HNSW_EF_SEARCH ile verilir.
+
+Sorgular: korpus (benchmarks/queries_tr.json) + iki rastgele otelin ortası olarak
+üretilen sentetik sorgular (--synthetic).
+
+Kullanım:
+    python benchmarks/hnsw_eval.py --embedder hash
+    python benchmarks/hnsw_eval.py --data-dir /tmp/mergenx_100k --m 16 32 --ef-construction 100 200 \\
+        --ef-search 20 50 100 200 --k 30 --out benchmarks/results/hnsw.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from run_benchmark import DEFAULT_CORPUS, percentile_summary  # noqa: E402
+from vector_recall import build_collection, query_vectors, recall  # noqa: E402
+from src.model.hotel_vectors import exact_search, load_or_build  # noqa: E402
+from src.model.index_config import HnswParams  # noqa: E402
+
+_ADD_BATCH = 5000
+
+
+def build_index(client, name: str, params: HnswParams, ids: list, vectors: np.ndarray) -> tuple:
+    """Verilen parametrelerle koleksiyon kur; (koleksiyon, kurulum süresi sn)."""
+    started = time.perf_counter()
+    collection = client.create_collection(name=name, metadata=params.collection_metadata())
+    for start in range(0, len(ids), _ADD_BATCH):
+        collection.add(ids=ids[start:start + _ADD_BATCH], embeddings=vectors[start:start + _ADD_BATCH].tolist())
+    return collection, time.perf_counter() - started
+
+
+def _evaluate_fresh(index_dir: str, name: str, ef_search: int, queries: np.ndarray, expected: dict, ks: list,
+                    position: dict) -> dict:
+    """
+    Ayrı süreçte: ef_search'ü yaz, koleksiyonu yeniden aç ve ölç.
+
+    Chroma HNSW indeksini süreçte ilk yüklerken ef_search'ü okur; her ayar temiz bir
+    süreçte ölçülür ki önceki ayarla yüklenmiş indeks kullanılmasın.
+    """
+    import chromadb
+    from src.model.offline import chroma_settings
+
+    client = chromadb.PersistentClient(path=index_dir, settings=chroma_settings())
+    client.get_collection(name=name).modify(configuration={"hnsw": {"ef_search": ef_search}})
+    return evaluate(client.get_collection(name=name), queries, expected, ks, position)
+
+
+def evaluate(collection, queries: np.ndarray, expected: dict, ks: list, position: dict) -> dict:
+    """Koleksiyonun mevcut ef_search ayarında recall@k ve gecikme."""
+    n_results = max(ks)
+    # Isınma: indeks belleğe yüklensin
+    collection.query(query_embeddings=[queries[0].tolist()], n_results=n_results, include=[])
+    latencies, recalls = [], {k: [] for k in ks}
+    for index, query in enumerate(queries):
+        started = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=n_results, include=[])
+        latencies.append((time.perf_counter() - started) * 1000)
+        found = [position[hotel_id] for hotel_id in result["ids"][0]]
+        for k in ks:
+            recalls[k].append(recall(found[:k], expected[k][index]))
+    latency = percentile_summary(latencies)
+    return {
+        **{f"recall@{k}": round(float(np.mean(values)), 4) for k, values in recalls.items()},
+        "p50_ms": latency["p50"],
+        "p95_ms": latency["p95"],
+    }
+
+
+def run(args) -> dict:
+    db_path = args.db_path or tempfile.mkdtemp(prefix="mergenx_hnsw_db_")
+    cache_dir = tempfile.mkdtemp(prefix="mergenx_hnsw_vectors_")
+    index_dir = tempfile.mkdtemp(prefix="mergenx_hnsw_eval_")
+    try:
+        import chromadb
+        from src.model.offline import chroma_settings
+
+        planner = build_collection(args, db_path)
+        store = load_or_build(planner.collection, cache_dir, "float16", db_path)
+        ids = [value.decode("utf-8") for value in store.ids]
+        position = {hotel_id: index for index, hotel_id in enumerate(ids)}
+        vectors = np.asarray(store.full)
+        queries = query_vectors(planner, store, args)
+        planner.close()
+        expected = {k: [exact_search(vectors, query, k) for query in queries] for k in args.k}
+
+        client = chromadb.PersistentClient(path=index_dir, settings=chroma_settings())
+        result = {"hotels": len(ids), "queries": len(queries), "k": args.k, "runs": []}
+        for m in args.m:
+            for ef_construction in args.ef_construction:
+                params = HnswParams(m=m, ef_construction=ef_construction, ef_search=args.ef_search[0])
+                collection, build_s = build_index(client, f"hnsw_m{m}_efc{ef_construction}", params, ids, vectors)
+                for ef_search in args.ef_search:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                        run_result = pool.submit(_evaluate_fresh, index_dir, collection.name, ef_search,
+                                                 queries, expected, args.k, position).result()
+                    result["runs"].append({"m": m, "ef_construction": ef_construction, "ef_search": ef_search,
+                                           "build_s": round(build_s, 2), **run_result})
+                client.delete_collection(name=collection.name)
+        return result
+    finally:
+        for path in (cache_dir, index_dir):
+            shutil.rmtree(path, ignore_errors=True)
+        if not args.db_path:
+            shutil.rmtree(db_path, ignore_errors=True)
+
+
+def print_report(result: dict):
+    print(f"{result['hotels']} otel, {result['queries']} sorgu (referans: float32 kaba kuvvet)\n")
+    recall_columns = [f"recall@{k}" for k in result["k"]]
+    header = ["M", "ef_c", "ef_s"] + recall_columns + ["p50 ms", "p95 ms", "kurulum s"]
+    print("  ".join(f"{column:>10}" for column in header))
+    for run in result["runs"]:
+        row = [run["m"], run["ef_construction"], run["ef_search"]] + [f"{run[c]:.4f}" for c in recall_columns]
+        row += [f"{run['p50_ms']:.2f}", f"{run['p95_ms']:.2f}", f"{run['build_s']:.2f}"]
+        print("  ".join(f"{value:>10}" for value in row))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HNSW parametreleri: recall@k / gecikme değerlendirmesi")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="Sorgu korpusu (JSON)")
+    parser.add_argument("--data-dir", default=str(ROOT / "data"), help="hotels.json dizini")
+    parser.add_argument("--db-path", default=None, help="Mevcut ChromaDB dizini (varsayılan: geçici, sıfırdan kurulur)")
+    parser.add_argument("--embedder", choices=["model", "hash"], default="model")
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32], help="M değerleri")
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[100, 200], help="ef_construction değerleri")
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 30, 100, 200], help="ef_search değerleri")
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 30], help="recall@k değerleri")
+    parser.add_argument("--synthetic", type=int, default=200, help="Sentetik sorgu sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Sonuç JSON dosyası")
+    parser.add_argument("--verbose", action="store_true", help="Pipeline çıktısını gizleme")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    result = run(args)
+    print_report(result)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Sonuç yazıldı: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""
+MergenX Uçtan Uca Benchmark
+
+Sabit Türkçe sorgu korpusunu (benchmarks/queries_tr.json) TravelPlanner üzerinden
+çalıştırır ve her aşama için p50/p95/p99 gecikme, throughput ve tepe RSS raporlar.
+Aşama süreleri plan_travel_page'in trace span'lerinden okunur (src/model/tracing.py).
+
+- LLM: offline Groq benzeri backend (gecikme dağılımı ve 429 ayarlanabilir; varsayılan gecikmesiz)
+- İndeks: geçici dizinde data/hotels.json'dan sıfırdan kurulur
+- Embedder: gerçek model (--embedder model) veya model çıkarımını ölçüm dışı bırakan
+  deterministik hashing embedder (--embedder hash; CI ve pipeline ek yükü için)
+- Paket önbelleği varsayılan olarak kapalıdır (her sorgu tam pipeline'dan geçer)
+
+Kullanım:
+    python benchmarks/run_benchmark.py --embedder hash --out benchmarks/results/run.json
+    python benchmarks/run_benchmark.py --compare benchmarks/baseline.json benchmarks/results/run.json
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.model.tracing import start_trace  # noqa: E402
+
+DEFAULT_CORPUS = ROOT / "benchmarks" / "queries_tr.json"
+PERCENTILES = (50, 95, 99)
+
+
+class HashingEmbedder:
+    """
+    Deterministik bag-of-words hashing embedder (model indirmez, GPU/torch gerektirmez).
+
+    Anlamsal kalite ölçmez; pipeline'ın model dışındaki maliyetini ölçmek içindir.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def create_embeddings(self, texts: list) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"\w+", str(text).lower()):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                vectors[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+            norm = np.linalg.norm(vectors[row])
+            if norm:
+                vectors[row] /= norm
+        return vectors
+
+
+def build_llm(args):
+    """
+    Offline LLM (src/model/llm_backends.py): süreç içi fake istemci veya yerel stub sunucu + Groq SDK.
+
+    Returns: (MergenLLM, FakeChatBackend, stub_server veya None)
+    """
+    from src.model.llm_backends import FakeChatBackend, FakeGroqClient, LatencyModel, RateLimiter, serve_stub
+    from src.model.llm_wrapper import MergenLLM
+
+    backend = FakeChatBackend(
+        latency=LatencyModel(median_ms=args.llm_latency_ms, seed=args.llm_seed),
+        rate_limiter=RateLimiter(args.llm_rpm),
+    )
+    if args.llm_backend == "http":
+        from groq import Groq
+
+        # Gerçek Groq SDK'sı (HTTP, retry, 429 işleme) yerel stub sunucuya karşı
+        server = serve_stub("127.0.0.1", 0, backend)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        return MergenLLM(client=Groq(api_key="offline", base_url=base_url)), backend, server
+    return MergenLLM(client=FakeGroqClient(backend)), backend, None
+
+
+def percentile_summary(values: list) -> dict:
+    if not values:
+        return {}
+    data = np.asarray(values, dtype=np.float64)
+    summary = {f"p{q}": round(float(np.percentile(data, q)), 3) for q in PERCENTILES}
+    summary["mean"] = round(float(data.mean()), 3)
+    summary["max"] = round(float(data.max()), 3)
+    summary["count"] = int(data.size)
+    return summary
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döndürür
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def git_commit() -> str:
+    """Ölçülen ağacın commit'i; izlenen dosyalarda commit edilmemiş değişiklik varsa "-dirty" eki."""
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        changes = subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if changes.strip() else commit
+
+
+@contextlib.contextmanager
+def quiet(verbose: bool):
+    """Pipeline'ın print çıktısını (DB kurulumu vb.) rapordan ayır."""
+    if verbose:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def build_planner(args, db_path: str, llm):
+    from src.model.search_engine import TravelPlanner
+
+    # None: planner süreçte paylaşılan MiniLM modelini alır
+    embedder = HashingEmbedder() if args.embedder == "hash" else None
+
+    with quiet(args.verbose):
+        planner = TravelPlanner(db_path=db_path, embedder=embedder, llm=llm,
+                                data_dir=args.data_dir)
+    if planner.error_message:
+        raise RuntimeError(planner.error_message)
+    if not args.cache:
+        planner.package_cache.ttl_seconds = 0
+    return planner
+
+
+def run_query(planner, query: str, page_size: int, pages: int) -> dict:
+    """Tek sorgu (ve istenirse sonraki sayfalar); her sayfa ayrı bir trace'tir."""
+    records = []
+    cursor = None
+    for _ in range(pages):
+        with start_trace("benchmark") as trace:
+            packages, cursor, error = planner.plan_travel_page(query, page_size=page_size, cursor=cursor)
+        records.append({
+            "duration_ms": trace.duration_ms,
+            "stages": {stage["stage"]: stage["total_ms"] for stage in trace.breakdown()},
+            "packages": len(packages),
+            "error": bool(error),
+        })
+        if not cursor:
+            break
+    return records
+
+
+def run_benchmark(args) -> dict:
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        queries = json.load(f)["queries"]
+
+    db_path = args.db_path or tempfile.mkdtemp(prefix="mergenx_bench_")
+    llm, llm_backend, stub_server = build_llm(args)
+    planner = None
+    try:
+        build_start = time.perf_counter()
+        planner = build_planner(args, db_path, llm)
+        index_build_s = time.perf_counter() - build_start
+
+        with quiet(args.verbose):
+            for query in queries[:args.warmup]:
+                run_query(planner, query, args.page_size, 1)
+
+            workload = queries * args.repeat
+            wall_start = time.perf_counter()
+            if args.concurrency > 1:
+                with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                    results = list(pool.map(lambda q: run_query(planner, q, args.page_size, args.pages), workload))
+            else:
+                results = [run_query(planner, query, args.page_size, args.pages) for query in workload]
+            wall_s = time.perf_counter() - wall_start
+    finally:
+        if planner is not None:
+            planner.close()
+        if stub_server is not None:
+            stub_server.shutdown()
+            stub_server.server_close()
+        if not args.db_path:
+            shutil.rmtree(db_path, ignore_errors=True)
+
+    records = [record for query_records in results for record in query_records]
+    stage_values = {}
+    for record in records:
+        for stage, duration_ms in record["stages"].items():
+            stage_values.setdefault(stage, []).append(duration_ms)
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "embedder": args.embedder,
+            "corpus": os.path.relpath(args.corpus, ROOT),
+            "queries": len(queries),
+            "repeat": args.repeat,
+            "page_size": args.page_size,
+            "pages": args.pages,
+            "concurrency": args.concurrency,
+            "package_cache": args.cache,
+            "llm_backend": args.llm_backend,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_rpm": args.llm_rpm,
+        },
+        "index_build_s": round(index_build_s, 3),
+        "wall_s": round(wall_s, 3),
+        "requests": len(records),
+        "errors": sum(record["error"] for record in records),
+        "throughput_rps": round(len(records) / wall_s, 2) if wall_s else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "llm": dict(llm_backend.stats, retries=getattr(llm.client, "retries", None)),
+        "end_to_end": percentile_summary([record["duration_ms"] for record in records]),
+        "stages": {stage: percentile_summary(values) for stage, values in stage_values.items()},
+    }
+
+
+def print_report(result: dict):
+    meta = result["meta"]
+    print(f"MergenX benchmark @ {meta['git_commit']} | embedder={meta['embedder']} | "
+          f"{result['requests']} istek | {result['errors']} hata/boş sonuç")
+    print(f"İndeks kurulumu: {result['index_build_s']:.2f}s | Throughput: {result['throughput_rps']:.2f} istek/s | "
+          f"Tepe RSS: {result['peak_rss_mb']:.1f} MB")
+    llm = result.get("llm", {})
+    print(f"LLM ({meta.get('llm_backend', 'fake')}): {llm.get('completions', 0)} yanıt, "
+          f"{llm.get('rate_limited', 0)} adet 429")
+    print(f"{'aşama':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'n':>7}")
+    rows = [("end_to_end", result["end_to_end"])] + list(result["stages"].items())
+    for stage, summary in rows:
+        print(f"{stage:<20}{summary['p50']:>10.3f}{summary['p95']:>10.3f}{summary['p99']:>10.3f}{summary['count']:>7}")
+
+
+def compare_runs(base: dict, new: dict, threshold: float) -> int:
+    """
+    İki sonucu karşılaştır. Uçtan uca p50/p95 veya throughput threshold (%) üzerinde
+    kötüleştiyse 1 döner (CI için); aşama farkları bilgi amaçlıdır.
+    """
+    def delta(old, current):
+        return (current - old) / old * 100 if old else 0.0
+
+    print(f"base={base['meta']['git_commit']} ({base['meta']['embedder']})  "
+          f"new={new['meta']['git_commit']} ({new['meta']['embedder']})")
+    print(f"{'aşama':<20}{'metrik':>7}{'base':>11}{'new':>11}{'fark %':>9}")
+    regressions = []
+    stages = ["end_to_end"] + sorted(set(base["stages"]) | set(new["stages"]))
+    for stage in stages:
+        old_summary = base["end_to_end"] if stage == "end_to_end" else base["stages"].get(stage, {})
+        new_summary = new["end_to_end"] if stage == "end_to_end" else new["stages"].get(stage, {})
+        for metric in ("p50", "p95", "p99"):
+            if metric not in old_summary or metric not in new_summary:
+                continue
+            change = delta(old_summary[metric], new_summary[metric])
+            marker = ""
+            if stage == "end_to_end" and metric in ("p50", "p95") and change > threshold:
+                regressions.append(f"{stage} {metric} +{change:.1f}%")
+                marker = "  <-- regresyon"
+            print(f"{stage:<20}{metric:>7}{old_summary[metric]:>11.3f}{new_summary[metric]:>11.3f}{change:>+9.1f}{marker}")
+
+    throughput_change = delta(base["throughput_rps"], new["throughput_rps"])
+    print(f"{'throughput':<20}{'rps':>7}{base['throughput_rps']:>11.2f}{new['throughput_rps']:>11.2f}{throughput_change:>+9.1f}")
+    print(f"{'peak_rss':<20}{'MB':>7}{base['peak_rss_mb']:>11.1f}{new['peak_rss_mb']:>11.1f}"
+          f"{delta(base['peak_rss_mb'], new['peak_rss_mb']):>+9.1f}")
+    if throughput_change < -threshold:
+        regressions.append(f"throughput {throughput_change:.1f}%")
+
+    if base["meta"]["embedder"] != new["meta"]["embedder"]:
+        print("UYARI: Farklı embedder'larla alınmış sonuçlar karşılaştırılıyor.")
+    if regressions:
+        print("REGRESYON: " + ", ".join(regressions))
+        return 1
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MergenX uçtan uca benchmark")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="Sorgu korpusu (JSON)")
+    parser.add_argument("--data-dir", default=str(ROOT / "data"), help="hotels/flights/transfers.json dizini")
+    parser.add_argument("--db-path", default=None, help="Mevcut ChromaDB dizini (varsayılan: geçici, sıfırdan kurulur)")
+    parser.add_argument("--embedder", choices=["model", "hash"], default="model")
+    parser.add_argument("--repeat", type=int, default=3, help="Korpusun kaç kez çalıştırılacağı")
+    parser.add_argument("--warmup", type=int, default=5, help="Ölçüm dışı ısınma sorgusu sayısı")
+    parser.add_argument("--page-size", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=1, help="Sorgu başına çekilecek sayfa sayısı")
+    parser.add_argument("--concurrency", type=int, default=1, help="Eşzamanlı istek sayısı (thread)")
+    parser.add_argument("--llm-backend", choices=["fake", "http"], default="fake",
+                        help="fake: süreç içi istemci, http: yerel stub sunucu + Groq SDK")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Sahte LLM medyan ilk token gecikmesi")
+    parser.add_argument("--llm-rpm", type=float, default=0.0, help="Sahte LLM dakika başı istek limiti (429)")
+    parser.add_argument("--llm-seed", type=int, default=0)
+    parser.add_argument("--cache", action="store_true", help="Paket önbelleğini açık bırak")
+    parser.add_argument("--out", default=None, help="Sonuç JSON dosyası")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="İki sonuç dosyasını karşılaştır")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regresyon eşiği (%%)")
+    parser.add_argument("--verbose", action="store_true", help="Pipeline çıktısını gizleme")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], "r", encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.compare[1], "r", encoding="utf-8") as f:
+            new = json.load(f)
+        return compare_runs(base, new, args.threshold)
+
+    result = run_benchmark(args)
+    print_report(result)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Sonuç yazıldı: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,424 @@
+"""
+MergenX Sentetik Envanter Ölçekleyici (yük testi için)
+
+hotels.json / flights.json / transfers.json dosyalarını aynı şemayla 10k-1M otele
+ve buna orantılı uçuş tarifesine büyütür. Tohumlu (seed) ve deterministiktir:
+aynı parametreler her zaman byte-byte aynı dosyaları üretir.
+
+Coğrafi tutarlılık:
+- Oteller data/geography.json'daki şehir / ilçe / bölge düğümlerine yerleştirilir
+- Her otelin birincil havalimanı GeographyIndex ile çözülür (arama motoruyla aynı kural)
+- O havalimanına otel yoğunluğuyla orantılı günlük uçuş üretilir
+- Otel bulunan her ilçe / bölge için o havalimanından VIP + ECO transfer rotası üretilir
+
+Dağılımlar (şehir ağırlıkları, konsept, fiyat, amenity) mevcut veri dosyalarından
+örneklenir; mevcut kayıtlar varsayılan olarak korunur (--no-base ile atlanır).
+Kayıtlar diske akış halinde yazılır; 1M otelde bellek kullanımı düğüm sayısıyla sınırlıdır.
+
+Kullanım:
+    python benchmarks/scale_inventory.py --hotels 100000 --out-dir /tmp/mergenx_100k
+    python benchmarks/run_benchmark.py --embedder hash --data-dir /tmp/mergenx_100k
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.model.geography import GEOGRAPHY_PATH, GeographyIndex, geo_key  # noqa: E402
+
+GENERATOR_VERSION = 1
+
+# Kalkış merkezleri ve mevcut tarifedeki payları
+ORIGIN_WEIGHTS = {"IST": 0.72, "SAW": 0.20, "ESB": 0.08}
+CARRIERS = ["TK", "PC", "HV", "U6", "AJT"]
+CABIN_BASE_PRICE = {"ECONOMY": 2500, "BUSINESS": 4500}
+BUSINESS_SHARE = 0.2
+
+HOTEL_PREFIXES = ["Grand", "Luxury", "Boutique", "Villa", "Resort", "Palace", "Paradise", "Golden",
+                  "Blue", "Royal", "Sea", "Garden", "Park", "Marina", "Green", "Sunset"]
+HOTEL_SUFFIXES = ["Hotel", "Resort", "Beach", "Club", "Palace", "Suites", "Otel", "Butik Otel", "Apart"]
+DESCRIPTION_ADJECTIVES = ["lüks", "konforlu", "ekonomik", "butik", "sakin", "aile dostu", "modern", "denize yakın"]
+DESCRIPTION_CLOSERS = [
+    "Merkeze yakın konumu ile ideal konaklama.",
+    "Havuz ve restoranıyla keyifli bir tatil sunar.",
+    "Sessiz ve huzurlu bir ortamda dinlenme imkanı.",
+    "Plaja yürüme mesafesinde, ailelere uygun.",
+    "Romantik kaçamaklar için özel atmosfer.",
+    "İş ve tatili bir arada yaşamak isteyenler için.",
+]
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def weighted_sample(rng: random.Random, population: list, weights: list, k: int) -> list:
+    """Ağırlıklı, tekrarsız örnekleme (küçük k için)."""
+    chosen = []
+    seen = set()
+    attempts = 0
+    while len(chosen) < k and attempts < k * 10:
+        item = rng.choices(population, weights=weights)[0]
+        attempts += 1
+        if item not in seen:
+            seen.add(item)
+            chosen.append(item)
+    return chosen
+
+
+class InventoryProfile:
+    """Mevcut veri dosyalarından çıkarılan dağılımlar + coğrafya düğümleri."""
+
+    def __init__(self, data_dir: Path, geography_path: Path = GEOGRAPHY_PATH):
+        self.base_hotels = load_json(data_dir / "hotels.json")
+        self.base_flights = load_json(data_dir / "flights.json")
+        self.base_transfers = load_json(data_dir / "transfers.json")
+        self.geography = GeographyIndex.from_file(geography_path)
+
+        city_counts = Counter(geo_key(h.get("location", {}).get("city", "")) for h in self.base_hotels)
+        concept_counts = Counter(h.get("concept", "") for h in self.base_hotels if h.get("concept"))
+        amenity_counts = Counter(a for h in self.base_hotels for a in h.get("amenities", []) or [])
+
+        self.concepts = sorted(concept_counts)
+        self.concept_weights = [concept_counts[c] for c in self.concepts]
+        # Tek seferlik yazım varyantlarını (gürültü) dağılıma katma
+        self.amenities = sorted(a for a, count in amenity_counts.items() if count >= 5)
+        self.amenity_weights = [amenity_counts[a] for a in self.amenities]
+        self.amenity_list_sizes = [len(h.get("amenities", []) or []) or 3 for h in self.base_hotels]
+        self.prices = sorted(int(h.get("price_per_night", 0)) for h in self.base_hotels if h.get("price_per_night"))
+
+        # Otel yerleştirilebilecek düğümler: ilçesi olan şehirler (kalkış merkezleri hariç)
+        geography_data = load_json(geography_path)
+        self.places = []
+        self.place_weights = []
+        for city in geography_data.get("cities", []):
+            districts = city.get("districts", [])
+            if not districts:
+                continue
+            city_places = []
+            for district in districts:
+                city_places.append((city["name"], district["name"], district["name"]))
+                for area in district.get("areas", []):
+                    city_places.append((city["name"], district["name"], area["name"]))
+            # Şehir ağırlığı mevcut otel dağılımından; verisi olmayan şehre küçük pay
+            city_weight = max(city_counts.get(geo_key(city["name"]), 0), 20)
+            for place in city_places:
+                self.places.append(place)
+                self.place_weights.append(city_weight / len(city_places))
+
+        self.place_airports = [self.geography.primary_airport(*place) for place in self.places]
+        self.route_durations = self._route_durations()
+
+    def _route_durations(self) -> dict:
+        """Mevcut tarifeden rota başına ortalama uçuş süresi (dakika)."""
+        durations = {}
+        for flight in self.base_flights.get("flights", []):
+            leg = flight.get("leg", {})
+            try:
+                departure = datetime.fromisoformat(leg["departure"])
+                arrival = datetime.fromisoformat(leg["arrival"])
+            except (KeyError, ValueError):
+                continue
+            minutes = (arrival - departure).total_seconds() / 60
+            if minutes > 0:
+                durations.setdefault((leg.get("origin"), leg.get("destination")), []).append(minutes)
+        return {route: int(sum(values) / len(values)) for route, values in durations.items()}
+
+
+class InventoryScaler:
+    """
+    Tohumlu sentetik envanter üreticisi.
+
+    Args:
+        profile: Mevcut veriden çıkarılan dağılımlar
+        hotels: Toplam hedef otel sayısı (mevcut kayıtlar dahil)
+        seed: Rastgelelik tohumu
+        days: Uçuş tarifesinin kapsadığı gün sayısı
+        hotels_per_daily_flight: Havalimanı başına günlük 1 uçuşa düşen otel sayısı
+        start_date: Tarifenin ilk günü
+        include_base: Mevcut kayıtları çıktıya dahil et
+    """
+
+    def __init__(self, profile: InventoryProfile, hotels: int, seed: int = 42, days: int = 30,
+                 hotels_per_daily_flight: int = 50, start_date: str = "2026-06-15", include_base: bool = True):
+        self.profile = profile
+        self.target_hotels = hotels
+        self.seed = seed
+        self.days = days
+        self.hotels_per_daily_flight = hotels_per_daily_flight
+        self.start_date = datetime.fromisoformat(start_date)
+        self.include_base = include_base
+        # Otel geçişinde doldurulur; uçuş / transfer hacmi buna göre belirlenir
+        self.hotels_by_place = Counter()
+        self.hotels_by_airport = Counter()
+
+    def _rng(self, stream: str) -> random.Random:
+        # Her dosya kendi akışını kullanır: uçuş parametresi değişince oteller değişmez
+        return random.Random(f"{self.seed}:{stream}")
+
+    # ------------------------------------------------------------------ oteller
+    def iter_hotels(self):
+        profile = self.profile
+        base = profile.base_hotels if self.include_base else []
+        for hotel in base:
+            location = hotel.get("location", {})
+            self._count_hotel(location.get("city", ""), location.get("district", ""), location.get("area", ""))
+            yield hotel
+
+        rng = self._rng("hotels")
+        for _ in range(max(self.target_hotels - len(base), 0)):
+            place_index = rng.choices(range(len(profile.places)), weights=profile.place_weights)[0]
+            city, district, area = profile.places[place_index]
+            self._count_hotel(city, district, area, profile.place_airports[place_index])
+
+            size = min(rng.choice(profile.amenity_list_sizes), 12)
+            amenities = weighted_sample(rng, profile.amenities, profile.amenity_weights, size)
+            # Gerçek dağılımdan fiyat + %15 oynama, 50'ye yuvarla
+            price = rng.choice(profile.prices) * rng.uniform(0.85, 1.15)
+            yield {
+                "hotel_name": f"{rng.choice(HOTEL_PREFIXES)} {area} {rng.choice(HOTEL_SUFFIXES)}",
+                "location": {"city": city, "district": district, "area": area},
+                "concept": rng.choices(profile.concepts, weights=profile.concept_weights)[0],
+                "price_per_night": int(round(price / 50) * 50) or 50,
+                "amenities": amenities,
+                "description": f"{area} bölgesinde {rng.choice(DESCRIPTION_ADJECTIVES)} konaklama. "
+                               f"{rng.choice(DESCRIPTION_CLOSERS)}",
+            }
+
+    def _count_hotel(self, city: str, district: str, area: str, airport: str = None):
+        airport = airport or self.profile.geography.primary_airport(city, district, area)
+        self.hotels_by_place[(airport, city, district, area)] += 1
+        self.hotels_by_airport[airport] += 1
+
+    # ------------------------------------------------------------------ uçuşlar
+    def _daily_flights(self, airport: str) -> int:
+        return max(2, math.ceil(self.hotels_by_airport[airport] / self.hotels_per_daily_flight))
+
+    def flight_count(self) -> int:
+        synthetic = sum(self._daily_flights(airport) for airport in self.hotels_by_airport) * self.days
+        return synthetic + (len(self.profile.base_flights.get("flights", [])) if self.include_base else 0)
+
+    def iter_flights(self):
+        """Otel geçişinden SONRA çağrılmalı (havalimanı yoğunluğu gerekir)."""
+        if self.include_base:
+            yield from self.profile.base_flights.get("flights", [])
+
+        rng = self._rng("flights")
+        zones_by_airport = {}
+        for airport, _city, district, _area in sorted(self.hotels_by_place):
+            zones = zones_by_airport.setdefault(airport, [])
+            if district not in zones:
+                zones.append(district)
+
+        flight_counter = 5000
+        for destination in sorted(self.hotels_by_airport):
+            daily = self._daily_flights(destination)
+            zones = zones_by_airport.get(destination, [])[:8]
+            for day in range(self.days):
+                date = self.start_date + timedelta(days=day)
+                date_str = date.strftime("%Y-%m-%d")
+                for _ in range(daily):
+                    origin = rng.choices(list(ORIGIN_WEIGHTS), weights=list(ORIGIN_WEIGHTS.values()))[0]
+                    if origin == destination:
+                        origin = "IST" if destination != "IST" else "SAW"
+                    carrier = rng.choice(CARRIERS)
+                    cabin = "BUSINESS" if rng.random() < BUSINESS_SHARE else "ECONOMY"
+                    # Kalkışlar 06:00-22:45 arası çeyrek saatlerde; sabah ve akşam daha yoğun
+                    hour = rng.choices(range(6, 23), weights=[3, 3, 3, 2, 1, 1, 1, 1, 1, 1, 1, 2, 3, 3, 3, 2, 1])[0]
+                    departure = date.replace(hour=hour, minute=rng.choice([0, 15, 30, 45]))
+                    duration = self.profile.route_durations.get((origin, destination), 75)
+                    arrival = departure + timedelta(minutes=duration)
+                    # Hafta sonu talebi fiyatı yükseltir
+                    weekend = 1.15 if date.weekday() >= 4 else 1.0
+                    price = CABIN_BASE_PRICE[cabin] * weekend + rng.randint(-300, 500)
+                    yield {
+                        "flight_id": f"{carrier}{flight_counter}-{date_str.replace('-', '')}",
+                        "carrier": carrier,
+                        "flight_no": str(flight_counter),
+                        "status": "SCHEDULED",
+                        "leg": {
+                            "origin": origin,
+                            "destination": destination,
+                            "departure": departure.strftime("%Y-%m-%dT%H:%M:%S"),
+                            "arrival": arrival.strftime("%Y-%m-%dT%H:%M:%S"),
+                        },
+                        "pricing": {
+                            "amount": float(round(price)),
+                            "currency": "TRY",
+                            "fare_class": "Y" if cabin == "ECONOMY" else "C",
+                            "cabin": cabin,
+                        },
+                        "baggage": "1PC x 20KG" if cabin == "ECONOMY" else "2PC x 30KG",
+                        "transfer_zones": zones,
+                    }
+                    flight_counter += 1
+
+    # --------------------------------------------------------------- transferler
+    def iter_transfers(self):
+        """Otel geçişinden SONRA çağrılmalı (otel bulunan bölgeler gerekir)."""
+        if self.include_base:
+            yield from self.profile.base_transfers.get("transfer_routes", [])
+
+        rng = self._rng("transfers")
+        service_counter = 10000
+        routes = Counter()
+        for (airport, _city, district, area), count in self.hotels_by_place.items():
+            routes[(airport, area)] += count
+            if district != area:
+                # Bölgesi olan oteller için ilçe düzeyinde de rota (hotel_coverage ilçe toplamı)
+                routes[(airport, district)] += count
+
+        for (airport, area_name) in sorted(routes):
+            duration = rng.randint(20, 180)
+            price_vip = float(round((600 + duration * 18) / 50) * 50)
+            vip_route = {
+                "service_code": f"TR-{airport}-VIP-{service_counter}",
+                "operator_id": "MERGEN_LOJ",
+                "route": {
+                    "from_code": airport,
+                    "from_name": f"{airport} Havalimanı",
+                    "to_area_code": geo_key(area_name).upper().replace(" ", "_"),
+                    "to_area_name": area_name,
+                    "estimated_duration": duration,
+                },
+                "vehicle_info": {
+                    "category": "VAN_VIP",
+                    "max_pax": 6,
+                    "features": ["WIFI", "BABY_SEAT_AVAIL", "LEATHER_SEATS", "CLIMATE_CONTROL"],
+                },
+                "total_price": price_vip,
+                "currency": "TRY",
+                "hotel_coverage": routes[(airport, area_name)],
+            }
+            eco_route = dict(vip_route)
+            eco_route["service_code"] = f"TR-{airport}-ECO-{service_counter}"
+            eco_route["vehicle_info"] = {"category": "VAN_ECONOMY", "max_pax": 8, "features": ["AC", "LUGGAGE_SPACE"]}
+            eco_route["total_price"] = float(round(price_vip * 0.6 / 50) * 50)
+            yield vip_route
+            yield eco_route
+            service_counter += 1
+
+    # ------------------------------------------------------------------- yazma
+    def write(self, out_dir: Path) -> dict:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        counts = {}
+
+        # Sıra önemli: uçuş ve transfer hacmi otel geçişinin sayaçlarına bağlı
+        counts["hotels"] = write_json_array(out_dir / "hotels.json", self.iter_hotels())
+
+        flights_meta = {
+            "metadata": {
+                "generated_for": "MergenX Load Testing (synthetic)",
+                "total_hotels": sum(self.hotels_by_airport.values()),
+                "total_flights": self.flight_count(),
+                "generation_date": self.start_date.strftime("%Y-%m-%d"),
+                "season": self.profile.base_flights.get("metadata", {}).get("season", "Summer 2026"),
+            },
+            "hotel_distribution": {
+                airport: {"count": count} for airport, count in sorted(self.hotels_by_airport.items())
+            },
+        }
+        counts["flights"] = write_json_array(out_dir / "flights.json", self.iter_flights(),
+                                             wrapper=flights_meta, key="flights")
+
+        operator_info = dict(self.profile.base_transfers.get("operator_info", {}))
+        operator_info["total_hotel_inventory"] = counts["hotels"]
+        counts["transfers"] = write_json_array(out_dir / "transfers.json", self.iter_transfers(),
+                                               wrapper={"operator_info": operator_info}, key="transfer_routes")
+
+        manifest = {
+            "generator_version": GENERATOR_VERSION,
+            "seed": self.seed,
+            "target_hotels": self.target_hotels,
+            "days": self.days,
+            "hotels_per_daily_flight": self.hotels_per_daily_flight,
+            "start_date": self.start_date.strftime("%Y-%m-%d"),
+            "include_base": self.include_base,
+            "counts": counts,
+            "hotels_by_airport": dict(sorted(self.hotels_by_airport.items())),
+            "generation_seconds": round(time.perf_counter() - started, 2),
+        }
+        with open(out_dir / "scale_manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest
+
+
+def write_json_array(path: Path, items, wrapper: dict = None, key: str = None) -> int:
+    """
+    Kayıtları tek tek yazarak JSON dizisi oluştur (tüm liste bellekte tutulmaz).
+
+    wrapper verilirse dosya bir nesnedir: önce wrapper alanları, sonra dizi wrapper[key] olarak yazılır.
+    Returns: Yazılan kayıt sayısı
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if wrapper is not None:
+            f.write("{\n")
+            for wrapper_key, value in wrapper.items():
+                f.write(f"  {json.dumps(wrapper_key)}: {json.dumps(value, ensure_ascii=False)},\n")
+            f.write(f"  {json.dumps(key)}: [")
+        else:
+            f.write("[")
+        for item in items:
+            f.write(",\n" if count else "\n")
+            f.write(json.dumps(item, ensure_ascii=False))
+            count += 1
+        f.write("\n]")
+        if wrapper is not None:
+            f.write("\n}")
+        f.write("\n")
+    return count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MergenX sentetik envanter ölçekleyici")
+    parser.add_argument("--hotels", type=int, required=True, help="Toplam otel sayısı (örn. 10000 - 1000000)")
+    parser.add_argument("--out-dir", required=True, help="Çıktı dizini (hotels/flights/transfers.json)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=30, help="Uçuş tarifesi gün sayısı")
+    parser.add_argument("--hotels-per-daily-flight", type=int, default=50,
+                        help="Havalimanı başına günlük 1 uçuşa düşen otel sayısı")
+    parser.add_argument("--start-date", default="2026-06-15")
+    parser.add_argument("--data-dir", default=str(ROOT / "data"), help="Dağılımların okunacağı mevcut veri")
+    parser.add_argument("--no-base", action="store_true", help="Mevcut kayıtları çıktıya dahil etme")
+    parser.add_argument("--force", action="store_true", help="Çıktı dizini veri dizini ise üzerine yaz")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    data_dir = Path(args.data_dir).resolve()
+    out_dir = Path(args.out_dir).resolve()
+    if out_dir == data_dir and not args.force:
+        print("❌ Çıktı dizini kaynak veri dizini ile aynı; üzerine yazmak için --force kullanın.")
+        return 1
+
+    profile = InventoryProfile(data_dir)
+    scaler = InventoryScaler(
+        profile,
+        hotels=args.hotels,
+        seed=args.seed,
+        days=args.days,
+        hotels_per_daily_flight=args.hotels_per_daily_flight,
+        start_date=args.start_date,
+        include_base=not args.no_base,
+    )
+    manifest = scaler.write(out_dir)
+    counts = manifest["counts"]
+    print(f"✅ {out_dir}: {counts['hotels']} otel, {counts['flights']} uçuş, {counts['transfers']} transfer "
+          f"({manifest['generation_seconds']}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
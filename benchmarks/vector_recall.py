@@ -0,0 +1,163 @@
+"""
+Kompakt Otel Vektörleri - Recall Raporu
+
+src/model/hotel_vectors.py deposunu float32 kaba kuvvet aramaya (referans) karşı ölçer:
+her hassasiyet (int8 / float16) için yeniden puanlamalı ve puanlamasız recall@k,
+bellekte kalan bayt / otel ve sorgu gecikmesi. Bağlam için Chroma HNSW'nin recall'u da
+raporlanır.
+
+Sorgular: korpus (benchmarks/queries_tr.json) + iki rastgele otel vektörünün ortası
+olarak üretilen sentetik sorgular (--synthetic).
+
+Kullanım:
+    python benchmarks/vector_recall.py --embedder hash
+    python benchmarks/vector_recall.py --data-dir /tmp/scale --db-path /tmp/scale_db --k 10 30
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from run_benchmark import DEFAULT_CORPUS, HashingEmbedder, quiet  # noqa: E402
+from src.model.hotel_vectors import PRECISIONS, exact_search, load_or_build  # noqa: E402
+
+
+def build_collection(args, db_path: str):
+    from src.model.llm_backends import FakeGroqClient
+    from src.model.llm_wrapper import MergenLLM
+    from src.model.search_engine import TravelPlanner
+
+    embedder = HashingEmbedder() if args.embedder == "hash" else None
+    with quiet(args.verbose):
+        planner = TravelPlanner(db_path=db_path, embedder=embedder, llm=MergenLLM(client=FakeGroqClient()),
+                                data_dir=args.data_dir)
+    if planner.error_message:
+        raise RuntimeError(planner.error_message)
+    return planner
+
+
+def query_vectors(planner, store, args) -> np.ndarray:
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        queries = json.load(f)["queries"]
+    with quiet(args.verbose):
+        corpus = np.asarray(planner.embedder.create_embeddings(queries), dtype=np.float32)
+    rng = np.random.default_rng(args.seed)
+    pairs = rng.integers(0, len(store), size=(args.synthetic, 2))
+    synthetic = (np.asarray(store.full[pairs[:, 0]]) + np.asarray(store.full[pairs[:, 1]])) / 2.0
+    return np.concatenate([corpus, synthetic.astype(np.float32)])
+
+
+def recall(found, expected) -> float:
+    expected = set(int(i) for i in expected)
+    return len(expected & set(int(i) for i in found)) / max(len(expected), 1)
+
+
+def measure(store, queries: np.ndarray, k: int, rescore_factor: int, position: dict) -> dict:
+    recalls, latencies = [], []
+    for query in queries:
+        expected = exact_search(store.full, query, k)
+        started = time.perf_counter()
+        ids, _scores, _rescored = store.search(query, k, rescore_factor=rescore_factor)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(recall([position[hotel_id] for hotel_id in ids], expected))
+    return {
+        "recall": round(float(np.mean(recalls)), 4),
+        "min_recall": round(float(np.min(recalls)), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+    }
+
+
+def chroma_recall(planner, store, queries: np.ndarray, k: int, position: dict) -> float:
+    recalls = []
+    for query in queries:
+        result = planner.collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        recalls.append(recall([position[hotel_id] for hotel_id in result["ids"][0]], exact_search(store.full, query, k)))
+    return round(float(np.mean(recalls)), 4)
+
+
+def run(args) -> dict:
+    db_path = args.db_path or tempfile.mkdtemp(prefix="mergenx_recall_")
+    cache_dir = tempfile.mkdtemp(prefix="mergenx_vectors_")
+    try:
+        planner = build_collection(args, db_path)
+        stores = {precision: load_or_build(planner.collection, cache_dir, precision, db_path) for precision in PRECISIONS}
+        reference = stores[PRECISIONS[0]]
+        position = {value.decode("utf-8"): index for index, value in enumerate(reference.ids)}
+        queries = query_vectors(planner, reference, args)
+
+        result = {"hotels": len(reference), "queries": len(queries), "dim": int(reference.full.shape[1]),
+                  "rescore_factor": args.rescore, "precisions": {}, "chroma_hnsw": {}}
+        for precision, store in stores.items():
+            sizes = store.resident_bytes_per_hotel()
+            entry = {"bytes_per_hotel": sizes["compact"], "float32_bytes_per_hotel": sizes["float32"],
+                     "reduction": round(sizes["float32"] / sizes["compact"], 2)}
+            for k in args.k:
+                entry[f"recall@{k}"] = {
+                    "candidate_pass_only": measure(store, queries, k, 0, position),
+                    "rescored": measure(store, queries, k, args.rescore, position),
+                }
+            result["precisions"][precision] = entry
+        for k in args.k:
+            result["chroma_hnsw"][f"recall@{k}"] = chroma_recall(planner, reference, queries, k, position)
+        planner.close()
+        return result
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        if not args.db_path:
+            shutil.rmtree(db_path, ignore_errors=True)
+
+
+def print_report(result: dict):
+    print(f"{result['hotels']} otel, {result['queries']} sorgu, {result['dim']} boyut, "
+          f"yeniden puanlama x{result['rescore_factor']}")
+    for precision, entry in result["precisions"].items():
+        print(f"\n{precision}: {entry['bytes_per_hotel']} bayt/otel (float32 {entry['float32_bytes_per_hotel']}, "
+              f"{entry['reduction']}x)")
+        for key, value in entry.items():
+            if key.startswith("recall@"):
+                raw, rescored = value["candidate_pass_only"], value["rescored"]
+                print(f"  {key}: aday geçişi {raw['recall']:.4f} ({raw['p50_ms']} ms) | "
+                      f"yeniden puanlamalı {rescored['recall']:.4f} (min {rescored['min_recall']:.2f}, {rescored['p50_ms']} ms)")
+    for key, value in result["chroma_hnsw"].items():
+        print(f"\nChroma HNSW {key}: {value:.4f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Kompakt otel vektörleri recall raporu (float32 referansına karşı)")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="Sorgu korpusu (JSON)")
+    parser.add_argument("--data-dir", default=str(ROOT / "data"), help="hotels.json dizini")
+    parser.add_argument("--db-path", default=None, help="Mevcut ChromaDB dizini (varsayılan: geçici, sıfırdan kurulur)")
+    parser.add_argument("--embedder", choices=["model", "hash"], default="model")
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 30], help="recall@k değerleri")
+    parser.add_argument("--rescore", type=int, default=4, help="Yeniden puanlanan aday çarpanı (k x)")
+    parser.add_argument("--synthetic", type=int, default=200, help="Sentetik sorgu sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Sonuç JSON dosyası")
+    parser.add_argument("--verbose", action="store_true", help="Pipeline çıktısını gizleme")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    result = run(args)
+    print_report(result)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Sonuç yazıldı: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
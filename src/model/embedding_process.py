@@ -0,0 +1,162 @@
+"""
+Süreç Dışı Embedder: model ayrı bir worker sürecinde, vektörler paylaşılan bellekte.
+
+Encode Streamlit sürecinde çalışınca tokenizasyon ve ön / son işlem GIL'i tutar; bir
+rebuild veya sorgu patlaması diğer oturumların rerun'larını bekletir. ProcessEmbedder
+modeli (torch veya ONNX) ayrı bir süreçte yükler:
+
+  - İstek: metin listesi yerel pipe (multiprocessing.Pipe) üzerinden gider.
+  - Cevap: vektörler worker'ın paylaşılan bellek tamponuna (SharedMemory) yazılır;
+    pipe'tan sadece (tampon adı, şekil) döner, istemci satırları tampondan kopyalar.
+    Tampon yeniden kullanılır, daha büyük bir parti geldiğinde büyütülür.
+
+UI süreci torch'u hiç import etmez; embedding kendi çekirdeklerinde çalışır.
+Pipe'ta aynı anda tek istek olur (kilit); eşzamanlı sorgular BatchingEmbedder ile
+tek isteğe toplanır (paylaşılan embedder'da ikisi birlikte kullanılır).
+
+    MERGENX_EMBEDDER_PROCESS=1 streamlit run src/streamlit_app.py
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.model.offline import record_asset
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_START_TIMEOUT_S = 300.0
+_MIN_BUFFER_BYTES = 1 << 20
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Python 3.13+: istemci tamponun sahibi değil, resource tracker onu silmemeli
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _serve(conn, backend: str, model_name: str):
+    """Worker süreci: modeli yükle, istekleri encode et, sonuçları paylaşılan tampona yaz."""
+    from src.model.offline import asset_report
+    from src.model.resources import load_embedder
+
+    buffer = None
+    try:
+        embedder = load_embedder(backend, model_name)
+        conn.send(("ready", {"pid": os.getpid(), "assets": asset_report()["assets"]}))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        conn.close()
+        return
+
+    try:
+        while True:
+            try:
+                texts = conn.recv()
+            except EOFError:
+                break
+            if texts is None:
+                break
+            try:
+                embeddings = np.ascontiguousarray(embedder.create_embeddings(texts), dtype=np.float32)
+                if buffer is None or buffer.size < embeddings.nbytes:
+                    if buffer is not None:
+                        buffer.close()
+                        buffer.unlink()
+                    buffer = shared_memory.SharedMemory(create=True, size=max(_MIN_BUFFER_BYTES, 2 * embeddings.nbytes))
+                np.ndarray(embeddings.shape, dtype=np.float32, buffer=buffer.buf)[...] = embeddings
+                conn.send(("ok", buffer.name, embeddings.shape))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        if buffer is not None:
+            buffer.close()
+            buffer.unlink()
+        conn.close()
+
+
+class ProcessEmbedder:
+    """create_embeddings'i ayrı bir süreçteki modele yönlendiren embedder."""
+
+    def __init__(self, backend: str = "torch", model_name: str = "paraphrase-multilingual-MiniLM-L12-v2",
+                 start_timeout: float = None):
+        """
+        Args:
+            backend: Worker'da yüklenecek embedder (torch | onnx | onnx-fp32)
+            model_name: Model adı
+            start_timeout: Modelin yüklenmesi için beklenecek süre (sn; varsayılan MERGENX_EMBEDDER_START_TIMEOUT)
+        """
+        if start_timeout is None:
+            start_timeout = float(os.getenv("MERGENX_EMBEDDER_START_TIMEOUT", str(DEFAULT_START_TIMEOUT_S)))
+        # spawn: çocuk süreç ana sürecin thread / torch durumunu devralmaz
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_serve, args=(child_conn, backend, model_name), name="mergenx-embedder", daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._lock = threading.Lock()
+        self._buffer = None
+
+        if not self._conn.poll(start_timeout):
+            self._stop()
+            raise RuntimeError(f"Embedding süreci {start_timeout:.0f} sn içinde hazır olmadı")
+        status, info = self._conn.recv()
+        if status != "ready":
+            self._stop()
+            raise RuntimeError(f"Embedding süreci başlatılamadı: {info}")
+        self.pid = info["pid"]
+        for name, asset in info["assets"].items():
+            record_asset(name, asset["source"], f"{asset['detail']} (süreç {self.pid})")
+        logger.info("Embedding worker process %s ready (%s, %s)", self.pid, backend, model_name)
+
+    def create_embeddings(self, texts: list) -> np.ndarray:
+        """
+        Metin listesini vektorlere (embedding) cevirir (worker sürecinde).
+        """
+        with self._lock:
+            if self._conn is None:
+                raise RuntimeError("Embedding süreci kapatıldı")
+            try:
+                self._conn.send(list(texts))
+                reply = self._conn.recv()
+            except (EOFError, OSError) as e:
+                raise RuntimeError(f"Embedding süreci yanıt vermiyor: {e}") from e
+            if reply[0] != "ok":
+                raise RuntimeError(f"Embedding süreci hatası: {reply[1]}")
+            _, name, shape = reply
+            if self._buffer is None or self._buffer.name != name:
+                # Worker tamponu büyüttü: yenisine bağlan
+                if self._buffer is not None:
+                    self._buffer.close()
+                self._buffer = _attach(name)
+            # Tampon bir sonraki istekte üzerine yazılır: satırlar kilit altında kopyalanır
+            return np.ndarray(shape, dtype=np.float32, buffer=self._buffer.buf).copy()
+
+    def close(self, timeout: float = 10.0):
+        """Worker sürecini durdur (tampon worker tarafından silinir)."""
+        with self._lock:
+            self._stop(timeout)
+
+    def _stop(self, timeout: float = 10.0):
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout)
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
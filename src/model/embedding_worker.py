@@ -0,0 +1,124 @@
+"""
+Embedding Worker: eşzamanlı oturumların sorgularını tek encode partisinde toplar.
+
+Streamlit tüm tarayıcı oturumlarını aynı (st.cache_resource) motordan sunar; her
+arama create_embeddings([sorgu]) ile 1'lik parti encode eder ve torch thread'leri için
+yarışır. BatchingEmbedder tek bir worker thread'i ve istek kuyruğu tutar:
+
+  - Sistem boştayken gelen istek beklemeden encode edilir (tek kullanıcı gecikmesi aynı).
+  - Worker meşgulken (veya son parti birden fazla istekten oluştuysa) gelen istekler
+    kuyrukta birikir; birkaç ms'lik pencere içinde gelenler tek encode çağrısında
+    birleştirilir ve her çağıranın Future'ı kendi satırlarıyla çözülür.
+
+    embedder = BatchingEmbedder(MergenEmbedder(), window_ms=2, max_batch=64)
+    embedder.create_embeddings(["İzmir aile oteli"])   # aynı arayüz
+
+Paylaşılan embedder (resources.acquire_embedder) MERGENX_EMBED_BATCH_WINDOW_MS > 0
+iken bu sarmalayıcıyla döner (varsayılan 0: kapalı; çok oturumlu dağıtımlar açar).
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH = 64
+
+_STOP = object()
+
+
+class BatchingEmbedder:
+    """create_embeddings çağrılarını dinamik mikro partilere toplayan sarmalayıcı."""
+
+    def __init__(self, embedder, window_ms: float = DEFAULT_WINDOW_MS, max_batch: int = DEFAULT_MAX_BATCH):
+        """
+        Args:
+            embedder: create_embeddings(texts) sağlayan asıl embedder
+            window_ms: Yük altında bir partiye istek toplama süresi
+            max_batch: Bir encode çağrısındaki en fazla metin sayısı
+        """
+        self.embedder = embedder
+        self.window_s = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._queue = queue.Queue()
+        self._closed = False
+        # Teşhis: toplam encode çağrısı / istek / metin
+        self.stats = {"batches": 0, "requests": 0, "texts": 0}
+        self._last_batch_requests = 1
+        self._worker = threading.Thread(target=self._run, name="mergenx-embedder", daemon=True)
+        self._worker.start()
+
+    def submit(self, texts: list) -> Future:
+        """Metinleri kuyruğa ekle; Future sonucu (len(texts), boyut) dizisidir."""
+        if self._closed:
+            raise RuntimeError("BatchingEmbedder kapatıldı")
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def create_embeddings(self, texts: list) -> np.ndarray:
+        """
+        Metin listesini vektorlere (embedding) cevirir (worker partisi üzerinden).
+        """
+        if not texts:
+            return self.embedder.create_embeddings(texts)
+        return self.submit(texts).result()
+
+    def close(self, timeout: float = 5.0):
+        """Kuyruktaki istekleri bitir, worker'ı durdur ve asıl embedder'ı (close varsa) kapat."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+        close = getattr(self.embedder, "close", None)
+        if close is not None:
+            close()
+
+    def _collect(self, first) -> list:
+        """İlk isteğe kuyrukta bekleyenleri (ve yük altında pencere içinde gelenleri) ekle."""
+        batch, size = [first], len(first[0])
+        # Sadece son parti birden fazla istekten oluştuysa (eşzamanlı kullanım) pencere beklenir
+        deadline = time.perf_counter() + (self.window_s if self._last_batch_requests > 1 else 0.0)
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Durdurma işareti geri konur: bu parti bittikten sonra worker çıkar
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = self._collect(item)
+            self._last_batch_requests = len(batch)
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                embeddings = np.asarray(self.embedder.create_embeddings(texts))
+            except Exception as e:
+                logger.warning("Embedding batch failed (%d requests): %s", len(batch), e)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.stats["batches"] += 1
+            self.stats["requests"] += len(batch)
+            self.stats["texts"] += len(texts)
+            offset = 0
+            for request_texts, future in batch:
+                future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
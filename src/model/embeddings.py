@@ -1,16 +1,36 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from src.model.offline import (
+    SOURCE_HUB, configure_environment, model_cache_dir, offline_mode, record_asset, resolve_model,
+)
+
 class MergenEmbedder:
     def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"):
         """
         Turkce dil destegi olan cok dilli embedding modelini yukler.
+
+        Model once yerelden (MERGENX_MODEL_PATH, MERGENX_MODEL_CACHE) cozulur; cevrimdisi
+        modda (MERGENX_OFFLINE=1) hub'a hic gidilmez.
         """
+        # Hub ortam degiskenleri sentence-transformers import edilmeden once ayarlanmali;
+        # model yerelde yoksa (cevrimdisi) torch import edilmeden hata verilir
+        configure_environment()
+        path, source = resolve_model(model_name)
+
+        # sentence-transformers (torch) ağır bir import; sadece model gerçekten yüklenirken içe aktarılır
+        from sentence_transformers import SentenceTransformer
+
         # Cok dilli (multilingual) model secimi Turkce NLP kalitesi icin kritiktir.
-        self.model = SentenceTransformer(model_name)
+        # Hub'dan indirilen model sabit onbellege yazilir: sonraki acilislar yerelden (agsiz) yuklenir
+        self.model = SentenceTransformer(
+            path,
+            cache_folder=str(model_cache_dir()),
+            local_files_only=offline_mode() or source != SOURCE_HUB,
+        )
+        record_asset("embedding_model", source, path)
 
     def create_embeddings(self, texts: list) -> np.ndarray:
         """
         Metin listesini vektorlere (embedding) cevirir.
         """
-        return self.model.encode(texts, show_progress_bar=True)
\ No newline at end of file
+        return self.model.encode(texts, show_progress_bar=True)
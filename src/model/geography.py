@@ -0,0 +1,176 @@
+"""
+Coğrafya Tablosu: şehir -> ilçe -> bölge -> havalimanı listesi.
+
+Tüm havalimanı / bölge kararları data/geography.json dosyasından yüklenen tek
+bir hiyerarşik yapıdan okunur. Arama motoru, transfer eşleştirme, sorgu parser'ı
+ve LLM parametre çıkarımı aynı tabloyu kullanır; böylece Antalya -> GZT gibi
+çelişkili eşleşmeler tek noktadan düzeltilir.
+
+Çözümleme O(1) sözlük erişimidir: (şehir), (şehir, ilçe), (şehir, ilçe, bölge).
+"""
+import json
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from src.model.keyword_matcher import KeywordMatcher, fold_case
+
+GEOGRAPHY_PATH = Path(__file__).resolve().parents[2] / "data" / "geography.json"
+
+# level: 'city' | 'district' | 'area'
+# airports: birincil havalimanı ilk sırada (üst düğümden devralınmış olabilir)
+GeoPlace = namedtuple("GeoPlace", ["level", "name", "key", "city_key", "city_name", "district_key", "airports"])
+
+_TURKISH_FOLD = str.maketrans({
+    "ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u",
+    "â": "a", "î": "i", "û": "u", "̇": None,
+})
+
+
+def geo_key(name: str) -> str:
+    """
+    Yer adını sözlük anahtarına çevir: 'İzmir', 'IZMIR', 'izmir', 'i̇zmir' -> 'izmir'.
+
+    Hem ham JSON değerleri hem de _normalize_city_name çıktısı aynı anahtara düşer.
+    """
+    if not name:
+        return ""
+    folded = str(name).replace("İ", "i").replace("I", "i").lower().translate(_TURKISH_FOLD)
+    return " ".join(folded.split())
+
+
+class GeographyIndex:
+    """
+    data/geography.json'dan oluşturulan hiyerarşik arama yapısı.
+
+    airports alanı olmayan ilçe/bölgeler üst düğümün havalimanı listesini devralır.
+    """
+
+    def __init__(self, data: dict):
+        self.default_airport = data.get("default_airport", "ADB")
+        self._cities = {}
+        self._districts = {}
+        self._areas = {}
+        self._places_by_name = {}
+        self._query_keywords = {}
+
+        for city in data.get("cities", []):
+            city_key = geo_key(city["name"])
+            city_airports = tuple(city.get("airports") or [self.default_airport])
+            city_place = GeoPlace("city", city["name"], city_key, city_key, city["name"], None, city_airports)
+            self._cities[city_key] = city_place
+            self._register_name(city_place)
+            if city.get("query_keyword"):
+                self._add_query_keyword(city["name"], (city["name"], city_airports[0]))
+
+            for district in city.get("districts", []):
+                district_key = geo_key(district["name"])
+                district_airports = tuple(district.get("airports") or city_airports)
+                district_place = GeoPlace("district", district["name"], district_key, city_key, city["name"], district_key, district_airports)
+                self._districts[(city_key, district_key)] = district_place
+                self._register_name(district_place)
+                if district.get("query_keyword"):
+                    # İlçe adı sorguda geçerse: şehir kilidi + ilçenin havalimanı
+                    self._add_query_keyword(district["name"], (city["name"], district_airports[0]))
+
+                for area in district.get("areas", []):
+                    area_key = geo_key(area["name"])
+                    area_airports = tuple(area.get("airports") or district_airports)
+                    area_place = GeoPlace("area", area["name"], area_key, city_key, city["name"], district_key, area_airports)
+                    self._areas[(city_key, district_key, area_key)] = area_place
+                    self._register_name(area_place)
+
+        # Serbest metindeki yer adlarını tek geçişte bulmak için (transfer varış bölgeleri)
+        self._place_matcher = KeywordMatcher({"place": {key: key for key in self._places_by_name}})
+
+    @classmethod
+    def from_file(cls, path=GEOGRAPHY_PATH) -> "GeographyIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _add_query_keyword(self, name: str, value: tuple):
+        # Hem Türkçe yazım ('muğla') hem ASCII yazım ('mugla') sorguda eşleşsin
+        self._query_keywords.setdefault(fold_case(name), value)
+        self._query_keywords.setdefault(geo_key(name), value)
+
+    def _register_name(self, place: GeoPlace):
+        self._places_by_name.setdefault(place.key, []).append(place)
+
+    def resolve(self, city: str = "", district: str = "", area: str = ""):
+        """
+        Otel konumunu en spesifik düğüme çözümle: Area > District > City.
+
+        Şehir tabloda yoksa ilçe / bölge adı tek başına aranır.
+        Returns: GeoPlace veya None
+        """
+        city_key, district_key, area_key = geo_key(city), geo_key(district), geo_key(area)
+
+        if city_key in self._cities:
+            place = self._areas.get((city_key, district_key, area_key))
+            if place:
+                return place
+            place = self._districts.get((city_key, district_key))
+            if place:
+                return place
+            # Bölge adı ilçe gibi kaydedilmiş olabilir (örn. Antalya / Serik / Belek)
+            place = self._districts.get((city_key, area_key))
+            if place:
+                return place
+            return self._cities[city_key]
+
+        for key in (area_key, district_key):
+            if key and key in self._places_by_name:
+                return self._places_by_name[key][0]
+        return None
+
+    def primary_airport(self, city: str = "", district: str = "", area: str = "") -> str:
+        """Konum için birincil havalimanı (bilinmiyorsa default_airport)."""
+        place = self.resolve(city, district, area)
+        return place.airports[0] if place else self.default_airport
+
+    def accepted_airports(self, city: str = "", district: str = "", area: str = "") -> tuple:
+        """Konum için kabul edilebilir tüm havalimanları (spesifik düğüm + şehir listesi)."""
+        place = self.resolve(city, district, area)
+        if not place:
+            return ()
+        city_airports = self._cities[place.city_key].airports if place.city_key in self._cities else ()
+        return tuple(dict.fromkeys(place.airports + city_airports))
+
+    def find_place(self, name: str):
+        """Tek bir yer adını çözümle (şehir > ilçe > bölge önceliği)."""
+        places = self._places_by_name.get(geo_key(name))
+        if not places:
+            return None
+        level_order = {"city": 0, "district": 1, "area": 2}
+        return min(places, key=lambda place: level_order[place.level])
+
+    def city_name(self, city: str) -> str:
+        """Şehrin tablodaki görünen adı ('izmir' -> 'İzmir')."""
+        place = self._cities.get(geo_key(city))
+        return place.name if place else city
+
+    @lru_cache(maxsize=1024)
+    def cities_in(self, text: str) -> frozenset:
+        """
+        Serbest metinde (örn. transfer varış bölgesi 'Ilıca Plajı - Çeşme') geçen yer
+        adlarının ait olduğu şehir anahtarları. Sadece tam kelime eşleşmeleri sayılır.
+        """
+        folded = geo_key(text)
+        cities = set()
+        for hit in self._place_matcher.find_all(folded):
+            before = folded[hit.start - 1] if hit.start > 0 else " "
+            after = folded[hit.end] if hit.end < len(folded) else " "
+            if before.isalnum() or after.isalnum():
+                continue
+            cities.update(place.city_key for place in self._places_by_name[hit.value])
+        return frozenset(cities)
+
+    def query_keywords(self) -> dict:
+        """Sorgu parser'ı için {anahtar_kelime: (Şehir, IATA)} - tablo sırasıyla."""
+        return dict(self._query_keywords)
+
+
+@lru_cache(maxsize=1)
+def get_geography() -> GeographyIndex:
+    """Süreç başına tek GeographyIndex (data/geography.json)."""
+    return GeographyIndex.from_file()
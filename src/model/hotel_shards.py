@@ -0,0 +1,258 @@
+"""
+Şehir / Havalimanı Parçalı Otel Koleksiyonları: filtreli ANN tek küçük grafikte.
+
+Tek `hotels` koleksiyonunda İzmir'in 300 oteli ile küçük şehirler aynı HNSW grafiğindedir;
+şehre kilitli bir arama tüm grafiği dolaşır, şehir filtresi sonradan uygulanır.
+MERGENX_HOTEL_SHARDS=city | airport verilirse oteller ayrıca parça koleksiyonlarına
+(`hotels__city_<şehir>` / `hotels__airport_<IATA>`) bölünür:
+
+  - Şehre kilitli arama: sadece o şehrin parçası sorgulanır; sonuçlar tamamen o
+    şehirden gelir ve gecikme envanter büyüdükçe sabit kalır. airport modunda şehrin
+    otelleri birden fazla parçadaysa parçalar paralel sorgulanıp mesafeye göre birleştirilir.
+    Paralel görevler çağıranın context'inde çalışır: her parça bir `shard_query` span'i
+    olarak isteğin trace'ine (ve korelasyon kimliğine) bağlanır.
+  - Şehirsiz (çeşitlilik) arama: ana koleksiyon. Chroma her sorguda sabit bir maliyet
+    taşır; tüm parçalara dağıtmak (paralel bile) tek grafik sorgusundan yavaştır.
+
+Şehir filtresi where ile verilmez (Chroma'da metadata filtreli HNSW sorgusu çok daha
+yavaştır): başka şehirleri de içeren parçadan şehrin payı oranında fazla aday alınıp süzülür.
+
+Parçalar ana koleksiyondaki vektörlerden (yeniden embedding yapılmadan) kurulur.
+Her parça kaynak koleksiyonun id'sini metadata'sında taşır; ana koleksiyon yeniden
+oluşturulunca (veya otel sayısı tutmayınca) parçalar baştan kurulur.
+"""
+import contextvars
+import json
+import logging
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from src.model.geography import geo_key
+from src.model.tracing import span as trace_span
+
+logger = logging.getLogger(__name__)
+
+SHARD_FORMAT_VERSION = 1
+SHARD_MODES = ("city", "airport")
+SHARD_PREFIX = "hotels__"
+_EXPORT_BATCH = 5000
+_MAX_FANOUT_WORKERS = 8
+
+
+def _shard_name(mode: str, key: str) -> str:
+    # Chroma koleksiyon adı: [a-zA-Z0-9._-], harf / rakamla başlayıp biten
+    slug = re.sub(r"[^a-z0-9]+", "-", geo_key(key)).strip("-") or "bilinmiyor"
+    return f"{SHARD_PREFIX}{mode}_{slug}"
+
+
+def _empty_result() -> dict:
+    return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+
+class HotelShardRouter:
+    """
+    Otel sorgularını parça koleksiyonlarına yönlendiren router.
+
+    Args:
+        collection: Ana `hotels` koleksiyonu (şehirsiz aramalar)
+        shards: parça anahtarı -> koleksiyon
+        city_shards: metadata şehri -> {parça anahtarı: parçadaki otel sayısı}
+        mode: city | airport
+    """
+
+    def __init__(self, collection, shards: dict, city_shards: dict, mode: str):
+        self.collection = collection
+        self.shards = shards
+        self.city_shards = city_shards
+        self.mode = mode
+        # Parçalar kurulduktan sonra değişmez: sayılar her sorguda tekrar okunmaz
+        self.counts = {key: shard.count() for key, shard in shards.items()}
+        self._pool = ThreadPoolExecutor(max_workers=max(1, min(_MAX_FANOUT_WORKERS, len(shards))),
+                                        thread_name_prefix="mergenx-shard")
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    def routes(self, city: str = None) -> list:
+        """Şehrin otellerini içeren parça anahtarları (şehir yoksa veya bilinmiyorsa boş: ana koleksiyon)."""
+        return list(self.city_shards.get(city, {})) if city else []
+
+    def query(self, query_embeddings: list, n_results: int, where: dict = None, city: str = None,
+              include: list = None) -> dict:
+        """
+        collection.query ile aynı biçimde sonuç (distances dahil).
+
+        Args:
+            query_embeddings: Sorgu vektörleri (her biri için ayrı sonuç listesi)
+            n_results: Sorgu başına sonuç sayısı
+            where: Ek metadata filtresi (örn. fiyat)
+            city: Şehre kilitli aramada metadata şehri (parçası yoksa ana koleksiyon)
+            include: documents / metadatas (distances her zaman eklenir: birleştirme için)
+        """
+        include = list(dict.fromkeys(list(include or ["documents", "metadatas"]) + ["distances"]))
+        keys = self.routes(city)
+        if not keys:
+            # Şehirsiz arama tek grafikte: Chroma sorgu başına sabit maliyet taşır, tüm
+            # parçalara dağıtmak (paralel bile) tek ana koleksiyon sorgusundan yavaştır
+            params = {"query_embeddings": query_embeddings, "n_results": n_results, "include": include}
+            if where:
+                params["where"] = where
+            return self.collection.query(**params)
+
+        def run(key):
+            shard_total, city_total = self.counts[key], self.city_shards[city][key]
+            if city_total == 0:
+                return None
+            # Başka şehirlerin otellerini de içeren (airport) parçada where ile şehir filtresi
+            # HNSW'yi yavaşlatır: şehrin payı oranında fazla aday alınır, sonra şehir süzülür
+            n = min(shard_total, math.ceil(n_results * shard_total / city_total))
+            params = {"query_embeddings": query_embeddings, "n_results": n,
+                      "include": list(dict.fromkeys(include + ["metadatas"]))}
+            if where:
+                params["where"] = where
+            with trace_span("shard_query", shard=key, n_results=n):
+                result = self.shards[key].query(**params)
+            if shard_total != city_total:
+                result = _keep_city(result, city)
+            return result
+
+        if len(keys) == 1:
+            partials = [run(keys[0])]
+        else:
+            # Her görev çağıranın context'inin kopyasında: trace span'leri ve korelasyon
+            # kimliği worker thread'lerinde de aynı isteğe yazılır
+            futures = [self._pool.submit(contextvars.copy_context().run, run, key) for key in keys]
+            partials = [future.result() for future in futures]
+        return self._merge([partial for partial in partials if partial], len(query_embeddings), n_results, include)
+
+    @staticmethod
+    def _merge(partials: list, queries: int, n_results: int, include: list) -> dict:
+        """Parça sonuçlarını her sorgu için mesafeye göre birleştir (eşitlikte parça sırası)."""
+        if not queries:
+            return _empty_result()
+        fields = ["ids"] + [field for field in ("documents", "metadatas", "distances") if field in include]
+        merged = {field: [] for field in fields}
+        for query_index in range(queries):
+            rows = []
+            for partial in partials:
+                distances = partial["distances"][query_index]
+                for position, distance in enumerate(distances):
+                    rows.append((distance, tuple(partial[field][query_index][position] for field in fields)))
+            rows.sort(key=lambda row: row[0])
+            rows = rows[:n_results]
+            for field_index, field in enumerate(fields):
+                merged[field].append([values[field_index] for _, values in rows])
+        return merged
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+def _keep_city(result: dict, city: str) -> dict:
+    """Sorgu sonucundan sadece şehrin otelleri (alan sırası korunur)."""
+    fields = [field for field in ("ids", "documents", "metadatas", "distances") if result.get(field) is not None]
+    kept = {field: [] for field in fields}
+    for query_index, metadatas in enumerate(result["metadatas"]):
+        positions = [i for i, metadata in enumerate(metadatas) if (metadata or {}).get("city") == city]
+        for field in fields:
+            kept[field].append([result[field][query_index][i] for i in positions])
+    return kept
+
+
+def _shard_key(mode: str, metadata: dict, geography) -> str:
+    city = metadata.get("city") or "bilinmiyor"
+    if mode == "city":
+        return city
+    return geography.primary_airport(city, metadata.get("district", ""), metadata.get("area", ""))
+
+
+def _existing_shards(client) -> list:
+    return [collection for collection in client.list_collections() if collection.name.startswith(SHARD_PREFIX)]
+
+
+def _router_from(collection, shards: list, mode: str) -> HotelShardRouter:
+    by_key, city_shards = {}, {}
+    for shard in shards:
+        key = shard.metadata["mergenx_key"]
+        by_key[key] = shard
+        for city, count in json.loads(shard.metadata.get("mergenx_cities", "{}")).items():
+            city_shards.setdefault(city, {})[key] = count
+    return HotelShardRouter(collection, by_key, city_shards, mode)
+
+
+def load_or_build(client, collection, mode: str, geography, collection_metadata: dict = None) -> HotelShardRouter:
+    """
+    Güncel parçalar varsa aç; yoksa eski parçaları sil ve ana koleksiyondan kur.
+
+    Args:
+        client: Chroma client
+        collection: Ana `hotels` koleksiyonu
+        mode: city | airport
+        geography: GeographyIndex (airport modunda otelin birincil havalimanı)
+        collection_metadata: Parça koleksiyonlarının HNSW ayarları (varsayılan: cosine)
+    """
+    if mode not in SHARD_MODES:
+        raise ValueError(f"Bilinmeyen parçalama modu: {mode} ({' | '.join(SHARD_MODES)})")
+    source = str(collection.id)
+    total = collection.count()
+    collection_metadata = collection_metadata or {"hnsw:space": "cosine"}
+    # Kurulum parametreleri değişince parçalar yeniden kurulur (ucuz: embedding yok);
+    # ef_search sorgu ayarıdır, yeniden kurulum gerektirmez
+    build_params = {key: value for key, value in collection_metadata.items() if key != "hnsw:search_ef"}
+
+    shards = _existing_shards(client)
+    if shards and all((shard.metadata or {}).get("mergenx_source") == source
+                      and shard.metadata.get("mergenx_shard_by") == mode
+                      and shard.metadata.get("mergenx_format") == SHARD_FORMAT_VERSION
+                      and all(shard.metadata.get(key) == value for key, value in build_params.items())
+                      for shard in shards) \
+            and sum(shard.count() for shard in shards) == total:
+        return _router_from(collection, shards, mode)
+
+    for shard in shards:
+        client.delete_collection(name=shard.name)
+
+    # 1. geçiş (sadece metadata): parça anahtarları ve her parçadaki şehir başına otel sayısı
+    cities = {}
+    for page in _pages(collection, ["metadatas"]):
+        for metadata in page["metadatas"]:
+            metadata = metadata or {}
+            shard_cities = cities.setdefault(_shard_key(mode, metadata, geography), {})
+            city = metadata.get("city") or "bilinmiyor"
+            shard_cities[city] = shard_cities.get(city, 0) + 1
+    # Şehir -> parça eşlemesi parçanın metadata'sında saklanır (yeniden açılışta okunur)
+    created = {
+        key: client.create_collection(
+            name=_shard_name(mode, key),
+            metadata={**collection_metadata, "mergenx_source": source,
+                      "mergenx_format": SHARD_FORMAT_VERSION, "mergenx_shard_by": mode, "mergenx_key": key,
+                      "mergenx_cities": json.dumps(dict(sorted(shard_cities.items())), ensure_ascii=False)},
+        )
+        for key, shard_cities in cities.items()
+    }
+
+    # 2. geçiş: vektörler (yeniden embedding yok) sayfa sayfa parçalarına dağıtılır
+    for page in _pages(collection, ["embeddings", "documents", "metadatas"]):
+        groups = {}
+        for index, metadata in enumerate(page["metadatas"]):
+            groups.setdefault(_shard_key(mode, metadata or {}, geography), []).append(index)
+        for key, rows in groups.items():
+            created[key].add(
+                ids=[page["ids"][i] for i in rows],
+                embeddings=[page["embeddings"][i] for i in rows],
+                documents=[page["documents"][i] for i in rows],
+                metadatas=[page["metadatas"][i] for i in rows],
+            )
+    logger.info("Built %d hotel shards by %s from %d hotels", len(created), mode, total)
+    return _router_from(collection, _existing_shards(client), mode)
+
+
+def _pages(collection, include: list):
+    offset = 0
+    while True:
+        page = collection.get(include=include, limit=_EXPORT_BATCH, offset=offset)
+        if not page["ids"]:
+            return
+        yield page
+        offset += len(page["ids"])
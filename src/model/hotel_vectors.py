@@ -0,0 +1,259 @@
+"""
+Kompakt Otel Vektörleri: aday geçişi düşük hassasiyette, yeniden puanlama float32.
+
+Chroma otel vektörlerini float32 HNSW indeksinde tutar. MERGENX_VECTOR_PRECISION
+(int8 | float16) verilirse otel araması bu depoyu kullanır:
+
+  1. Aday geçişi: tüm otellerin int8 (boyut başına ölçekli skaler kuantizasyon) veya
+     float16 kopyası ile kosinüs; fiyat filtresi aynı geçişte maskelenir.
+  2. Yeniden puanlama: sadece en iyi k x MERGENX_VECTOR_RESCORE aday, diskteki float32
+     kopyadan (mmap; sadece okunan satırlar belleğe gelir) tam hassasiyetle puanlanır.
+
+Bellekte kalan: int8'de vektör başına D bayt (float32'nin 1/4'ü), float16'da 2D bayt.
+Otel dokümanları / metadata yine Chroma'dan (id ile) okunur.
+
+Depo Chroma koleksiyonundan derlenir (<data_dir>/.cache/hotel_vectors_*.npy; geçerli derleme\nmeta dosyasında) ve
+koleksiyon yeniden oluşturulunca (koleksiyon id'si / otel sayısı değişince)
+kendiliğinden yenilenir. Recall raporu: python benchmarks/vector_recall.py
+"""
+import hashlib
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTOR_FORMAT_VERSION = 2
+PRECISIONS = ("int8", "float16")
+DEFAULT_RESCORE_FACTOR = 4
+# Aday geçişi blok blok yapılır: int8 -> float32 dönüşümü için geçici bellek sınırlı kalır
+_SCORE_BLOCK_ROWS = 32768
+_EXPORT_BATCH = 5000
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def quantize(vectors: np.ndarray, precision: str) -> tuple:
+    """
+    Birim vektörleri düşük hassasiyete çevir.
+
+    Returns: (kodlar, ölçek) - int8'de boyut başına simetrik ölçek (kod x ölçek ~ değer),
+    float16'da ölçek 1
+    """
+    if precision == "float16":
+        return vectors.astype(np.float16), np.ones(vectors.shape[1], dtype=np.float32)
+    if precision != "int8":
+        raise ValueError(f"Bilinmeyen vektör hassasiyeti: {precision} ({' | '.join(PRECISIONS)})")
+    scale = np.abs(vectors).max(axis=0) / 127.0 if len(vectors) else np.ones(vectors.shape[1], dtype=np.float32)
+    scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+    return codes, scale
+
+
+class CompactVectorStore:
+    """
+    Düşük hassasiyetli aday geçişi + float32 yeniden puanlama.
+
+    Args:
+        ids: Chroma otel id'leri (S bayt dizisi)
+        codes: int8 / float16 vektörler (aday geçişi)
+        scale: Boyut başına ölçek (float16'da 1)
+        full: Birim float32 vektörler (mmap; yeniden puanlama)
+        prices: Gecelik fiyatlar (fiyat filtresi)
+    """
+
+    def __init__(self, ids: np.ndarray, codes: np.ndarray, scale: np.ndarray, full: np.ndarray,
+                 prices: np.ndarray, precision: str):
+        self.ids = ids
+        self.codes = codes
+        self.scale = scale
+        self.full = full
+        self.prices = prices
+        self.precision = precision
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def resident_bytes_per_hotel(self) -> dict:
+        """Aday geçişinin bellekte tuttuğu bayt / otel ve float32 karşılığı."""
+        dim = self.codes.shape[1] if self.codes.ndim == 2 else 0
+        overhead = self.ids.dtype.itemsize + self.prices.dtype.itemsize
+        return {"compact": dim * self.codes.dtype.itemsize + overhead, "float32": dim * 4 + overhead}
+
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Tüm otellerin düşük hassasiyetli kosinüs skoru (sorgu birim vektöre çevrilir)."""
+        weighted = _normalize(query) * self.scale
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), _SCORE_BLOCK_ROWS):
+            block = self.codes[start:start + _SCORE_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ weighted
+        return scores
+
+    def search(self, query, k: int, max_price: float = None, rescore_factor: int = DEFAULT_RESCORE_FACTOR) -> tuple:
+        """
+        En benzer k otel.
+
+        Args:
+            query: Sorgu vektörü
+            k: Sonuç sayısı
+            max_price: Verilirse gecelik fiyatı bunu aşan oteller elenir
+            rescore_factor: k x bu kadar aday float32 ile yeniden puanlanır (0: yeniden puanlama yok)
+
+        Returns: (id listesi, kosinüs benzerlikleri, yeniden puanlanan aday sayısı)
+        """
+        query = np.asarray(query, dtype=np.float32)
+        scores = self.approximate_scores(query)
+        if max_price is not None:
+            scores[self.prices > max_price] = -np.inf
+        eligible = int(np.isfinite(scores).sum())
+        if eligible == 0 or k <= 0:
+            return [], np.zeros(0, dtype=np.float32), 0
+
+        pool = min(eligible, max(k, k * rescore_factor))
+        candidates = np.argpartition(-scores, pool - 1)[:pool]
+        if rescore_factor > 0:
+            # mmap'ten sadece aday satırları okunur (sıralı erişim için indeks sıralanır)
+            candidates = np.sort(candidates)
+            scores = self.full[candidates] @ _normalize(query)
+        else:
+            scores = scores[candidates]
+        # Eşit skorda depo sırası korunur (kararlı sıralama)
+        order = np.argsort(-scores, kind="stable")[:k]
+        ids = [value.decode("utf-8") for value in self.ids[candidates[order]]]
+        return ids, scores[order], pool if rescore_factor > 0 else 0
+
+
+def exact_search(full: np.ndarray, query, k: int, prices: np.ndarray = None, max_price: float = None) -> np.ndarray:
+    """float32 kaba kuvvet (recall referansı): en benzer k satırın indeksi."""
+    scores = full @ _normalize(query)
+    if max_price is not None:
+        scores = np.where(prices > max_price, -np.inf, scores)
+    k = min(k, int(np.isfinite(scores).sum()))
+    return np.argsort(-scores, kind="stable")[:k]
+
+
+def _export_collection(collection) -> tuple:
+    """Koleksiyondaki tüm (id, vektör, fiyat) - sayfa sayfa."""
+    ids, vectors, prices = [], [], []
+    offset = 0
+    while True:
+        page = collection.get(include=["embeddings", "metadatas"], limit=_EXPORT_BATCH, offset=offset)
+        if not page["ids"]:
+            break
+        ids.extend(page["ids"])
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        prices.extend(float((meta or {}).get("price") or 0.0) for meta in page["metadatas"])
+        offset += len(page["ids"])
+    dim = vectors[0].shape[1] if vectors else 0
+    return ids, np.concatenate(vectors) if vectors else np.zeros((0, dim), dtype=np.float32), prices
+
+
+def load_or_build(collection, cache_dir, precision: str, db_path: str) -> CompactVectorStore:
+    """
+    Güncel depo varsa mmap ile aç; yoksa koleksiyondan derle, atomik yaz, sonra aç.
+
+    Her derleme dizilerini kendi kimliğiyle adlandırılmış dosyalara yazar
+    (<ad>.<derleme>.<parça>.npy); sürüm tek dosyada (meta) os.replace ile değişir.
+    Okuyucu meta'daki derlemenin dosyalarını açar, farklı derlemelerin dizilerini karıştırmaz.
+    Cache dizini yazılamıyorsa depo bellekte derlenir.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Bilinmeyen vektör hassasiyeti: {precision} ({' | '.join(PRECISIONS)})")
+    cache_dir = Path(cache_dir)
+    # Aynı data dizinini kullanan farklı Chroma dizinleri ayrı depolar kullanır
+    name = f"hotel_vectors_{hashlib.sha1(os.path.realpath(db_path).encode('utf-8')).hexdigest()[:10]}"
+    meta_path = cache_dir / f"{name}.meta.json"
+    parts = ("ids", "full", "prices", precision, f"{precision}_scale")
+    version = {"format": VECTOR_FORMAT_VERSION, "collection": str(collection.id), "count": collection.count()}
+
+    previous_build = None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        previous_build = meta["build"]
+        if meta.get("version") == version:
+            return _open_store(_build_paths(cache_dir, name, previous_build, parts), precision, version["count"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    ids, vectors, prices = _export_collection(collection)
+    full = _normalize(vectors)
+    arrays = {
+        "ids": np.array([value.encode("utf-8") for value in ids], dtype=f"S{max((len(v) for v in ids), default=1)}"),
+        "full": full,
+        "prices": np.asarray(prices, dtype=np.float32),
+    }
+    for other in PRECISIONS:
+        arrays[other], arrays[f"{other}_scale"] = quantize(full, other)
+    # Derleme sırasında koleksiyon değiştiyse meta dışa aktarılan sayıyı taşır
+    version["count"] = len(ids)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Eşzamanlı worker'lar aynı depoyu derleyebilir: her derleme kendi dosyalarına yazar,
+        # meta en son (benzersiz geçici dosya + os.replace) yeni derlemeye çevrilir
+        build = uuid.uuid4().hex[:12]
+        for part, array in arrays.items():
+            np.save(_build_paths(cache_dir, name, build, [part])[part], array)
+        tmp_meta = cache_dir / f"{name}.{build}.tmp.json"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "build": build}, f)
+        os.replace(tmp_meta, meta_path)
+        _remove_stale_builds(cache_dir, name, keep={build, previous_build})
+        logger.info("Compiled %d hotel vectors -> %s (%s)", len(ids), cache_dir / f"{name}.{build}", ", ".join(PRECISIONS))
+        return _open_store(_build_paths(cache_dir, name, build, parts), precision, version["count"])
+    except OSError as e:
+        logger.warning("Could not write hotel vector store (%s); using in-memory store", e)
+        return CompactVectorStore(arrays["ids"], arrays[precision], arrays[f"{precision}_scale"], full,
+                                  arrays["prices"], precision)
+
+
+def _build_paths(cache_dir: Path, name: str, build: str, parts) -> dict:
+    if not isinstance(build, str) or not build.isalnum():
+        raise ValueError(f"Geçersiz derleme kimliği: {build!r}")
+    return {part: cache_dir / f"{name}.{build}.{part}.npy" for part in parts}
+
+
+def _remove_stale_builds(cache_dir: Path, name: str, keep: set):
+    """Eski derlemelerin dosyalarını sil; yerine geçilen son derleme, onu yeni açan okuyucular için kalır."""
+    for path in cache_dir.glob(f"{name}.*.npy"):
+        build = path.name[len(name) + 1:].split(".", 1)[0]
+        if build not in keep:
+            try:
+                path.unlink()
+            except OSError:
+                # Windows'ta mmap'li dosya silinemez; sonraki derlemede tekrar denenir
+                pass
+
+
+def _open_store(paths: dict, precision: str, count: int) -> CompactVectorStore:
+    def open_array(path):
+        try:
+            return np.load(path, mmap_mode="r")
+        except ValueError:
+            # Boş dizi mmap edilemez
+            return np.load(path)
+
+    # Hepsi mmap: worker'lar aynı sayfaları paylaşır; aday geçişi dizileri her sorguda taranır
+    # (sürekli bellekte), float32 kopyadan sadece yeniden puanlanan satırlar okunur
+    arrays = {part: open_array(path) for part, path in paths.items()}
+    # Sürümle uyuşmayan dizi (yarım kalmış / başka derlemeden) depoyu geçersiz kılar
+    lengths = {part: len(array) for part, array in arrays.items() if part != f"{precision}_scale"}
+    dims = {arrays["full"].shape[-1], arrays[precision].shape[-1], len(arrays[f"{precision}_scale"])}
+    if any(length != count for length in lengths.values()) or len(dims) != 1:
+        raise ValueError(f"Vektör deposu dizileri sürümle uyuşmuyor (beklenen {count}): {lengths}, boyutlar {dims}")
+    return CompactVectorStore(
+        ids=arrays["ids"],
+        codes=arrays[precision],
+        scale=arrays[f"{precision}_scale"],
+        full=arrays["full"],
+        prices=arrays["prices"],
+        precision=precision,
+    )
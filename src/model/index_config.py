@@ -0,0 +1,90 @@
+"""
+HNSW İndeks Ayarları: koleksiyonların kurulum ve arama parametreleri.
+
+Chroma koleksiyonları şimdiye kadar sadece {"hnsw:space": "cosine"} ile oluşturuluyordu;
+M / ef_construction / ef_search envanter büyüklüğünden bağımsız olarak varsayılandaydı.
+Ayarlar ortam değişkenlerinden okunur (varsayılanlar Chroma'nınkiyle aynı):
+
+    MERGENX_HNSW_M                komşu sayısı (grafik derecesi; kurulumda sabitlenir)
+    MERGENX_HNSW_EF_CONSTRUCTION  kurulumdaki aday listesi (kurulumda sabitlenir)
+    MERGENX_HNSW_EF_SEARCH        sorgudaki aday listesi (mevcut koleksiyonda değiştirilebilir)
+
+M ve ef_construction koleksiyon oluşturulurken uygulanır; mevcut koleksiyonda farklıysa
+uyarı yazılır (yeni değerler için veritabanı yeniden kurulmalıdır). ef_search açılışta
+mevcut koleksiyona da yazılır; Chroma indeksi süreçte ilk yüklerken okuduğu için, indeks
+bu süreçte zaten yüklendiyse yeni değer bir sonraki başlatmada geçerli olur.
+
+Çalışma noktası seçimi: python benchmarks/hnsw_eval.py (recall@k - p50/p95 gecikme tablosu).
+"""
+import logging
+import os
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_M = 16
+DEFAULT_EF_CONSTRUCTION = 100
+DEFAULT_EF_SEARCH = 100
+
+
+@dataclass(slots=True, frozen=True)
+class HnswParams:
+    """HNSW kurulum (m, ef_construction) ve arama (ef_search) parametreleri."""
+    m: int = DEFAULT_M
+    ef_construction: int = DEFAULT_EF_CONSTRUCTION
+    ef_search: int = DEFAULT_EF_SEARCH
+
+    @classmethod
+    def from_env(cls) -> "HnswParams":
+        return cls(
+            m=int(os.getenv("MERGENX_HNSW_M", str(DEFAULT_M))),
+            ef_construction=int(os.getenv("MERGENX_HNSW_EF_CONSTRUCTION", str(DEFAULT_EF_CONSTRUCTION))),
+            ef_search=int(os.getenv("MERGENX_HNSW_EF_SEARCH", str(DEFAULT_EF_SEARCH))),
+        )
+
+    def collection_metadata(self) -> dict:
+        """create_collection / get_or_create_collection metadata'sı."""
+        return {
+            "hnsw:space": "cosine",
+            "hnsw:M": self.m,
+            "hnsw:construction_ef": self.ef_construction,
+            "hnsw:search_ef": self.ef_search,
+        }
+
+    def label(self) -> str:
+        return f"M={self.m}, ef_construction={self.ef_construction}, ef_search={self.ef_search}"
+
+
+def _current(collection) -> dict:
+    hnsw = (getattr(collection, "configuration", None) or {}).get("hnsw") or {}
+    metadata = collection.metadata or {}
+    return {
+        "m": hnsw.get("max_neighbors", metadata.get("hnsw:M", DEFAULT_M)),
+        "ef_construction": hnsw.get("ef_construction", metadata.get("hnsw:construction_ef", DEFAULT_EF_CONSTRUCTION)),
+        "ef_search": hnsw.get("ef_search", metadata.get("hnsw:search_ef", DEFAULT_EF_SEARCH)),
+    }
+
+
+def apply_params(client, collection, params: HnswParams):
+    """
+    Mevcut koleksiyonu ayarlara uydur: ef_search değiştirilir, kurulum parametreleri
+    farklıysa uyarı yazılır.
+
+    Returns: koleksiyon (ef_search değiştiyse yeni ayarı taşıyan yeni tutamaç)
+    """
+    current = _current(collection)
+    built_as = (current["m"], current["ef_construction"])
+    if built_as != (params.m, params.ef_construction):
+        logger.warning(
+            "Collection %s was built with M=%s, ef_construction=%s (configured %s); rebuild the database to apply",
+            collection.name, built_as[0], built_as[1], params.label(),
+        )
+    if current["ef_search"] == params.ef_search:
+        return collection
+    try:
+        collection.modify(configuration={"hnsw": {"ef_search": params.ef_search}})
+        # Sorgular tutamacın yapılandırmasını kullanır: yeni ayar için koleksiyon yeniden alınır
+        return client.get_collection(name=collection.name)
+    except Exception as e:
+        logger.warning("Could not set ef_search=%d on %s: %s", params.ef_search, collection.name, e)
+        return collection
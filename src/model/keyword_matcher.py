@@ -0,0 +1,117 @@
+from collections import deque, namedtuple
+
+# Tek bir eşleşme: hangi kategori, hangi anahtar kelime, sözlükteki değeri,
+# metindeki konumu ve sözlük sırasına göre önceliği (küçük = önce)
+KeywordHit = namedtuple("KeywordHit", ["category", "keyword", "value", "start", "end", "priority"])
+
+
+def fold_case(text: str) -> str:
+    """
+    Eşleştirme için büyük/küçük harf katlama.
+
+    Python'un lower() fonksiyonu 'İ' harfini 'i̇' (i + birleşik nokta) yapar ve
+    'İzmir' gibi kelimelerin eşleşmesini bozar. Bu yüzden önce İ -> i dönüşümü yapılır.
+    """
+    if not text:
+        return ""
+    return text.replace('İ', 'i').lower()
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick tabanlı çoklu anahtar kelime eşleştirici.
+
+    Tüm sözlükler (şehir, stil, zaman, uçuş, tema...) bir kez tek bir trie'ye derlenir.
+    Sorgu tek geçişte taranır; maliyet sözlük büyüklüğünden bağımsız olarak
+    sorgu uzunluğuyla doğrusaldır. Sonuç, `keyword in query_lower` kontrollerinin
+    birebir karşılığıdır (alt dize eşleşmesi, çakışan eşleşmeler dahil).
+
+    Args:
+        vocabularies: {kategori: {anahtar_kelime: değer}} veya {kategori: [anahtar_kelime, ...]}
+            Sözlük sırası önceliktir: aynı kategoride birden fazla eşleşme varsa
+            sözlükte önce gelen kazanır (eski if/elif zincirlerinin davranışı).
+    """
+
+    def __init__(self, vocabularies: dict):
+        # Trie durumları: her durum için geçişler, failure link ve çıktı listesi
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._patterns = []  # (category, keyword, value, priority, length)
+
+        for category, entries in vocabularies.items():
+            items = entries.items() if isinstance(entries, dict) else ((keyword, True) for keyword in entries)
+            for priority, (keyword, value) in enumerate(items):
+                folded = fold_case(keyword)
+                if not folded:
+                    continue
+                self._add_pattern(folded, (category, keyword, value, priority, len(folded)))
+
+        self._build_failure_links()
+
+    def _add_pattern(self, folded: str, pattern: tuple):
+        state = 0
+        for char in folded:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(len(self._patterns))
+        self._patterns.append(pattern)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Çıktıları failure zinciri boyunca birleştir (suffix eşleşmeleri)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> list:
+        """Metindeki tüm eşleşmeleri metin sırasına göre döndür (tek geçiş)."""
+        hits = []
+        state = 0
+        goto = self._goto
+        fail = self._fail
+        for index, char in enumerate(fold_case(text)):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in self._output[state]:
+                category, keyword, value, priority, length = self._patterns[pattern_id]
+                hits.append(KeywordHit(category, keyword, value, index - length + 1, index + 1, priority))
+        return hits
+
+    def scan(self, text: str) -> dict:
+        """
+        Metni tek geçişte tara ve eşleşmeleri kategoriye göre grupla.
+
+        Returns:
+            {kategori: [KeywordHit, ...]} - her kategori sözlük önceliğine göre sıralı,
+            her anahtar kelime en fazla bir kez (ilk geçtiği konumla)
+        """
+        grouped = {}
+        seen = set()
+        for hit in self.find_all(text):
+            key = (hit.category, hit.keyword)
+            if key in seen:
+                continue
+            seen.add(key)
+            grouped.setdefault(hit.category, []).append(hit)
+        for category_hits in grouped.values():
+            category_hits.sort(key=lambda hit: hit.priority)
+        return grouped
+
+    def first(self, text: str, category: str, default=None):
+        """Kategorideki en yüksek öncelikli eşleşmenin değerini döndür."""
+        category_hits = self.scan(text).get(category)
+        return category_hits[0].value if category_hits else default
@@ -0,0 +1,336 @@
+"""
+LLM Backend Seçimi: Groq, süreç içi sahte (fake) istemci veya yerel stub sunucu.
+
+MergenLLM ve TravelPlanner sadece Groq istemcisinin şeklini kullanır
+(client.chat.completions.create(...) -> ChatCompletion). Bu modül aynı şekli
+ağ ve API anahtarı olmadan sağlar; böylece batching, retry ve önbellek dahil
+tüm pipeline offline ve deterministik olarak ölçülebilir.
+
+MERGENX_LLM_BACKEND:
+- groq (varsayılan): Gerçek Groq API (GROQ_API_KEY gerekir)
+- fake: Süreç içi FakeGroqClient (ağ yok)
+- http: Groq SDK + MERGENX_LLM_BASE_URL'deki stub sunucu (gerçek SDK retry davranışı)
+
+Sahte backend ayarları:
+- MERGENX_FAKE_LLM_LATENCY_MS: Medyan ilk token gecikmesi (varsayılan 350, 0 = gecikme yok)
+- MERGENX_FAKE_LLM_TOKENS_PER_SEC: Çıktı üretim hızı (varsayılan 275)
+- MERGENX_FAKE_LLM_RPM: Dakika başı istek limiti, aşılınca 429 (varsayılan 0 = limitsiz)
+- MERGENX_FAKE_LLM_SEED: Gecikme örneklemesi tohumu (varsayılan 0)
+
+Stub sunucu:
+    python -m src.model.llm_backends --port 8765 --rpm 30
+    MERGENX_LLM_BACKEND=http MERGENX_LLM_BASE_URL=http://127.0.0.1:8765 streamlit run src/streamlit_app.py
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from groq import Groq, RateLimitError
+from groq.types.chat import ChatCompletion
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+# Groq SDK varsayılanları (groq._constants): 2 tekrar, 0.5s'den başlayıp 8s'de tavanlanan bekleme
+DEFAULT_MAX_RETRIES = 2
+INITIAL_RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 8.0
+
+
+class LatencyModel:
+    """
+    Groq benzeri gecikme: log-normal ilk token süresi + çıktı token'ı başına üretim süresi.
+
+    Args:
+        median_ms: İlk token gecikmesinin medyanı (0 = gecikme yok)
+        sigma: Log-normal yayılım (0.35 ≈ p95/medyan 1.8)
+        tokens_per_sec: Çıktı üretim hızı
+        seed: Örnekleme tohumu
+    """
+
+    def __init__(self, median_ms: float = 350.0, sigma: float = 0.35, tokens_per_sec: float = 275.0, seed: int = 0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.tokens_per_sec = tokens_per_sec
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_seconds(self, completion_tokens: int) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        with self._lock:
+            first_token = self.median_ms * math.exp(self._rng.gauss(0.0, self.sigma)) / 1000
+        generation = completion_tokens / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+        return first_token + generation
+
+
+class RateLimiter:
+    """Dakika başı istek limiti (token bucket). rpm <= 0 ise limitsiz."""
+
+    def __init__(self, rpm: float = 0):
+        self.rpm = rpm
+        self._tokens = float(rpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """İzin verilirse None, limit aşıldıysa tekrar denemeden önce beklenecek saniye."""
+        if self.rpm <= 0:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            rate = self.rpm / 60.0
+            self._tokens = min(float(self.rpm), self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return None
+            return (1.0 - self._tokens) / rate
+
+
+def estimate_tokens(text: str) -> int:
+    # Groq usage alanı için kaba tahmin (~4 karakter / token)
+    return max(1, len(text) // 4)
+
+
+def fake_completion_content(messages: list, response_format: dict = None) -> str:
+    """
+    Prompt türüne göre deterministik yanıt metni.
+
+    - Toplu paket özeti (PAKET n: satırları): paket sayısı kadar "✅ Paket i: ..." satırı
+    - JSON modu: boş olmayan geçerli bir JSON nesnesi (çağıran varsayılanları doldurur)
+    - Diğer: kısa Türkçe pazarlama paragrafı
+    """
+    prompt = str(messages[-1].get("content", "")) if messages else ""
+    if response_format and response_format.get("type") == "json_object":
+        return json.dumps({"origin_iata": "IST", "preferences": []})
+
+    package_count = len(re.findall(r"PAKET \d+:", prompt))
+    if package_count:
+        return "\n".join(
+            f"✅ Paket {i}: Keyifli Tatil - Tercihlerinize uygun otel, uçuş ve transfer seçenekleriyle "
+            f"huzurlu bir tatil sizi bekliyor."
+            for i in range(1, package_count + 1)
+        )
+    return ("Tercihlerinize uygun bu otel, konforlu odaları ve sıcak atmosferiyle huzurlu bir konaklama sunuyor. "
+            "Seçilen uçuş ve transfer hizmetleriyle yolculuğunuz da sorunsuz geçecek.")
+
+
+class FakeChatBackend:
+    """
+    Sahte chat-completions motoru: gecikme + 429 + Groq biçiminde JSON gövde.
+
+    Hem süreç içi FakeGroqClient hem de stub HTTP sunucu bunu kullanır. Thread-safe'tir.
+    """
+
+    def __init__(self, latency: LatencyModel = None, rate_limiter: RateLimiter = None):
+        self.latency = latency or LatencyModel(median_ms=0)
+        self.rate_limiter = rate_limiter or RateLimiter(0)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "completions": 0, "rate_limited": 0}
+
+    @classmethod
+    def from_env(cls) -> "FakeChatBackend":
+        latency = LatencyModel(
+            median_ms=float(os.getenv("MERGENX_FAKE_LLM_LATENCY_MS", "350")),
+            tokens_per_sec=float(os.getenv("MERGENX_FAKE_LLM_TOKENS_PER_SEC", "275")),
+            seed=int(os.getenv("MERGENX_FAKE_LLM_SEED", "0")),
+        )
+        return cls(latency=latency, rate_limiter=RateLimiter(float(os.getenv("MERGENX_FAKE_LLM_RPM", "0"))))
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def complete(self, body: dict) -> tuple:
+        """
+        Tek istek. Returns: (status_code, headers, payload)
+
+        429'da payload Groq hata gövdesi, headers 'retry-after' (saniye) içerir.
+        """
+        self._count("requests")
+        model = body.get("model", "")
+        wait = self.rate_limiter.acquire()
+        if wait is not None:
+            self._count("rate_limited")
+            retry_after = round(wait, 3)
+            return 429, {"retry-after": str(retry_after)}, {
+                "error": {
+                    "message": f"Rate limit reached for model `{model}` on requests per minute (RPM): "
+                               f"Limit {self.rate_limiter.rpm:g}. Please try again in {retry_after}s.",
+                    "type": "requests",
+                    "code": "rate_limit_exceeded",
+                }
+            }
+
+        messages = body.get("messages", [])
+        content = fake_completion_content(messages, body.get("response_format"))
+        prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = estimate_tokens(content)
+        delay = self.latency.sample_seconds(completion_tokens)
+        if delay:
+            time.sleep(delay)
+        self._count("completions")
+        return 200, {}, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "logprobs": None,
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "total_time": round(delay, 4),
+            },
+            "system_fingerprint": "fp_mergenx_fake",
+            "x_groq": {"id": f"req_{uuid.uuid4().hex[:24]}"},
+        }
+
+
+class _Namespace:
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class FakeGroqClient:
+    """
+    Groq istemcisinin süreç içi karşılığı: client.chat.completions.create(...) -> ChatCompletion.
+
+    429'da Groq SDK gibi davranır: retry-after kadar bekleyip max_retries kez tekrar dener,
+    sonunda groq.RateLimitError fırlatır.
+    """
+
+    def __init__(self, backend: FakeChatBackend = None, max_retries: int = DEFAULT_MAX_RETRIES):
+        self.backend = backend or FakeChatBackend()
+        self.max_retries = max_retries
+        self.retries = 0
+        self.chat = _Namespace(completions=_Namespace(create=self._create))
+
+    def _create(self, messages: list, model: str, **kwargs) -> ChatCompletion:
+        body = {"messages": messages, "model": model, **kwargs}
+        for attempt in range(self.max_retries + 1):
+            status, headers, payload = self.backend.complete(body)
+            if status == 200:
+                return ChatCompletion.model_validate(payload)
+            if attempt < self.max_retries:
+                self.retries += 1
+                time.sleep(_retry_delay(headers.get("retry-after"), attempt))
+
+        request = httpx.Request("POST", f"http://fake-groq{CHAT_COMPLETIONS_PATH}")
+        response = httpx.Response(status, headers=headers, json=payload, request=request)
+        raise RateLimitError(payload["error"]["message"], response=response, body=payload)
+
+
+def _retry_delay(retry_after, attempt: int) -> float:
+    """Groq SDK ile aynı kural: makul retry-after varsa ona uy, yoksa üstel bekleme."""
+    try:
+        seconds = float(retry_after)
+        if 0 < seconds <= 60:
+            return seconds
+    except (TypeError, ValueError):
+        pass
+    return min(INITIAL_RETRY_DELAY * 2 ** attempt, MAX_RETRY_DELAY)
+
+
+def create_llm_client(backend: str = None, api_key: str = None):
+    """
+    MERGENX_LLM_BACKEND'e göre Groq biçimli istemci oluştur.
+
+    groq backend'i için api_key zorunludur (çağıran doğrular).
+    """
+    backend = (backend or os.getenv("MERGENX_LLM_BACKEND", "groq")).lower()
+    if backend == "fake":
+        logger.info("LLM backend: in-process fake")
+        return FakeGroqClient(FakeChatBackend.from_env())
+    if backend == "http":
+        base_url = os.getenv("MERGENX_LLM_BASE_URL", "http://127.0.0.1:8765")
+        logger.info("LLM backend: stub server at %s", base_url)
+        return Groq(api_key=api_key or "offline", base_url=base_url)
+    if backend != "groq":
+        raise ValueError(f"Bilinmeyen MERGENX_LLM_BACKEND: {backend!r} (groq | fake | http)")
+    return Groq(api_key=api_key)
+
+
+def make_stub_handler(backend: FakeChatBackend):
+    """Stub sunucu için istek işleyicisi (POST /openai/v1/chat/completions)."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            if self.path.rstrip("/") != CHAT_COMPLETIONS_PATH:
+                self._send(404, {}, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send(400, {}, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+                return
+            status, headers, payload = backend.complete(body)
+            self._send(status, headers, payload)
+
+        def _send(self, status: int, headers: dict, payload: dict):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            logger.debug("stub llm: " + format, *args)
+
+    return StubHandler
+
+
+def serve_stub(host: str = "127.0.0.1", port: int = 8765, backend: FakeChatBackend = None) -> ThreadingHTTPServer:
+    """Groq uyumlu stub sunucuyu oluştur (çağıran serve_forever / shutdown yönetir)."""
+    return ThreadingHTTPServer((host, port), make_stub_handler(backend or FakeChatBackend.from_env()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MergenX Groq uyumlu offline LLM stub sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=float(os.getenv("MERGENX_FAKE_LLM_LATENCY_MS", "350")))
+    parser.add_argument("--tokens-per-sec", type=float, default=float(os.getenv("MERGENX_FAKE_LLM_TOKENS_PER_SEC", "275")))
+    parser.add_argument("--rpm", type=float, default=float(os.getenv("MERGENX_FAKE_LLM_RPM", "0")))
+    parser.add_argument("--seed", type=int, default=int(os.getenv("MERGENX_FAKE_LLM_SEED", "0")))
+    args = parser.parse_args(argv)
+
+    backend = FakeChatBackend(
+        latency=LatencyModel(median_ms=args.latency_ms, tokens_per_sec=args.tokens_per_sec, seed=args.seed),
+        rate_limiter=RateLimiter(args.rpm),
+    )
+    server = serve_stub(args.host, args.port, backend)
+    print(f"🧪 MergenX LLM stub: http://{args.host}:{args.port}{CHAT_COMPLETIONS_PATH} "
+          f"(latency={args.latency_ms}ms, rpm={args.rpm or 'limitsiz'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
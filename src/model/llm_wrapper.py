@@ -1,30 +1,46 @@
 import os
 import json
-from groq import Groq
 from dotenv import load_dotenv
+from src.model.geography import get_geography
+from src.model.llm_backends import create_llm_client
+from src.model.vocabulary import get_query_matcher
 
 load_dotenv()
 
 class MergenLLM:
-    def __init__(self):
+    def __init__(self, client=None, model: str = None):
+        """
+        Args:
+            client: Groq biçimli istemci (verilmezse MERGENX_LLM_BACKEND'e göre oluşturulur)
+            model: Model adı (varsayılan MERGENX_LLM_MODEL veya llama-3.3-70b-versatile)
+        """
+        self.model = model or os.getenv("MERGENX_LLM_MODEL", "llama-3.3-70b-versatile")
+        if client is not None:
+            self.client = client
+            return
+        
+        # Offline backend'ler (fake / http stub) API anahtarı gerektirmez
+        backend = os.getenv("MERGENX_LLM_BACKEND", "groq").lower()
+        api_key = self._resolve_api_key()
+        if backend == "groq" and not api_key:
+            raise ValueError("GROQ_API_KEY bulunamadı! Lütfen .env dosyasında veya Streamlit Secrets'ta ayarlayınız.")
+        
+        self.client = create_llm_client(backend, api_key)
+
+    @staticmethod
+    def _resolve_api_key():
         # Streamlit Cloud Secrets entegrasyonu
         try:
             import streamlit as st
             # Streamlit içindeyiz - secrets'tan dene
             try:
-                api_key = st.secrets["GROQ_API_KEY"]
+                return st.secrets["GROQ_API_KEY"]
             except (KeyError, AttributeError, FileNotFoundError):
                 # Secrets'ta yoksa environment variable'dan al
-                api_key = os.getenv("GROQ_API_KEY")
+                return os.getenv("GROQ_API_KEY")
         except ImportError:
             # Streamlit olmadığı için doğrudan environment variable'dan al
-            api_key = os.getenv("GROQ_API_KEY")
-        
-        if not api_key:
-            raise ValueError("GROQ_API_KEY bulunamadı! Lütfen .env dosyasında veya Streamlit Secrets'ta ayarlayınız.")
-        
-        self.client = Groq(api_key=api_key)
-        self.model = "llama-3.3-70b-versatile"
+            return os.getenv("GROQ_API_KEY")
 
     def generate_reasons(self, query: str, hotels: list):
         """Her otel için kullanıcı sorgusuna özel bir 'neden' cümlesi üretir."""
@@ -333,50 +349,10 @@ class MergenLLM:
         - "Kız kıza" → "eğlence, merkezi, sosyal, nightlife, bar"
         - "Help", "Muhafazakar" → İlgili tercihler eklenir
         """
-        # 🔥 PROMPT EXPANSION: Kısa promptları genişlet
-        expansions = {
-            "kız kıza": "eğlence, merkezi, sosyal, nightlife, bar, müzik, cafe",
-            "kız": "eğlence, merkezi, sosyal, nightlife, bar, müzik, cafe",
-            "help": "yardımcı personel, rehber, bilgilendirme, destek",
-            "hel": "yardımcı personel, rehber, bilgilendirme, destek",
-            "muhafazakar": "aile, çocuk, kapalı havuz, hijab friendly, sessiz",
-            "balayı": "romantik, honeymoon, jakuzi, özel, couples",
-            "iş": "business, wifi, workstation, meeting, conference"
-        }
-        
-        # User query'yi lowercase yap ve expansion uygula
-        query_lower = user_query.lower()
-        for keyword, expansion in expansions.items():
-            if keyword in query_lower:
-                user_query = f"{user_query} ({expansion})"
-                print(f"[PROMPT EXPANSION] '{keyword}' → '{expansion}'")
-        # Şehir-IATA eşleştirme sözlüğü
-        city_to_iata = {
-            "istanbul": "IST",
-            "ankara": "ESB",
-            "izmir": "ADB",
-            "antalya": "GZT",
-            "bodrum": "BJV",
-            "dalaman": "DLM",
-            "adana": "AYT",
-            "gaziantep": "GZT",
-            "gazipaşa": "GNY",
-            "van": "VAN",
-            "kayseri": "KYA",
-            "konya": "KYA",
-            "rize": "RZS",
-            "aydın": "ADB",
-            "muğla": "BJV",
-            "balıkesir": "BJV",
-            "çeşme": "ADB",
-            "alaçatı": "ADB",
-            "kuşadası": "ADB",
-            "didim": "ADB",
-            "belek": "GZT",
-            "lara": "GZT",
-            "konyaaltı": "GZT",
-        }
-        
+        # 🔥 PROMPT EXPANSION: Kısa promptları genişlet (tek geçişte, sözlük sırasıyla)
+        for hit in get_query_matcher().scan(user_query).get("expansion", []):
+            user_query = f"{user_query} ({hit.value})"
+            print(f"[PROMPT EXPANSION] '{hit.keyword}' → '{hit.value}'")
         # ============================================================
         # ✅ FIX 4: PROMPT RECOVERY - HARD-CODED
         # Kullanıcı niyetini analiz ederken şehri 'city', konsepti 'concept'
@@ -403,15 +379,17 @@ class MergenLLM:
         - IST: İstanbul
         - SAW: Sabiha Gökçen (İstanbul)
         - ADB: İzmir (Adnan Menderes)
-        - AYT: Adana
+        - AYT: Antalya
+        - ADA: Adana
         - BJV: Bodrum
         - DLM: Dalaman
         - EDR: Edirne
         - GZT: Gaziantep
-        - GNY: Gazipaşa
+        - GZP: Gazipaşa
         - VAN: Van
-        - KYA: Kayseri
-        - RZS: Rize
+        - ASR: Kayseri
+        - KYA: Konya
+        - RZV: Rize
         - ESB: Ankara (Esenboğa)
 
         Yanıtı SADECE şu JSON formatında ver, başka şey yazma:
@@ -450,9 +428,9 @@ class MergenLLM:
                 result["origin_iata"] = "IST"
             
             if not result.get("destination_iata"):
-                # Şehir adından IATA kodu çıkarmaya çalış
-                city_lower = result.get("destination_city", "").lower()
-                result["destination_iata"] = city_to_iata.get(city_lower, "ADB")
+                # Şehir adından IATA kodu çıkarmaya çalış (coğrafya tablosu)
+                place = get_geography().find_place(result.get("destination_city", ""))
+                result["destination_iata"] = place.airports[0] if place else get_geography().default_airport
             
             if not result.get("travel_style"):
                 result["travel_style"] = "aile"
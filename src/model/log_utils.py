@@ -0,0 +1,72 @@
+"""
+Yapılandırılmış Loglama: seviye, korelasyon kimliği ve örneklenmiş hot-path debug.
+
+- Her log kaydına aktif trace'in kimliği eklenir (correlation_id); aynı isteğin
+  satırları Streamlit Cloud loglarında birlikte bulunabilir.
+- Otel / aday rota başına tekrarlanan debug olayları HotPathLogger ile yazılır.
+  DEBUG kapalıyken tek bir isEnabledFor kontrolüyle döner (format maliyeti yok);
+  açıkken isteklerin sadece MERGENX_DEBUG_SAMPLE_RATE oranı kadarı loglanır.
+  Örnekleme istek bazlıdır: seçilen isteğin tüm hot-path satırları birlikte görünür.
+"""
+import logging
+import os
+import random
+
+from src.model.tracing import current_trace
+
+LOG_FORMAT = "[%(asctime)s] [%(name)s] [%(levelname)s] [%(correlation_id)s] %(message)s"
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Kayda aktif trace kimliğini ekler (trace yoksa '-')."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace = current_trace()
+        record.correlation_id = trace.trace_id if trace is not None else "-"
+        return True
+
+
+class HotPathLogger:
+    """
+    Sık tekrarlanan debug olayları için örneklenmiş logger sarmalayıcısı.
+
+    Args:
+        logger: Asıl modül logger'ı
+        sample_rate: 0.0-1.0 arası; None ise MERGENX_DEBUG_SAMPLE_RATE (varsayılan 0.1)
+    """
+
+    def __init__(self, logger: logging.Logger, sample_rate: float = None):
+        self._logger = logger
+        if sample_rate is None:
+            sample_rate = float(os.getenv("MERGENX_DEBUG_SAMPLE_RATE", "0.1"))
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+
+    def enabled(self) -> bool:
+        """DEBUG açık ve bu istek örneklemeye girdiyse True (pahalı argümanları korumak için)."""
+        if not self._logger.isEnabledFor(logging.DEBUG) or self.sample_rate <= 0.0:
+            return False
+        if self.sample_rate >= 1.0:
+            return True
+        trace = current_trace()
+        if trace is None:
+            return random.random() < self.sample_rate
+        return (int(trace.trace_id, 16) % 10000) < self.sample_rate * 10000
+
+    def debug(self, msg: str, *args):
+        if self.enabled():
+            self._logger.debug(msg, *args, stacklevel=2)
+
+
+def configure_logging(level: str = None):
+    """
+    Kök logger'ı yapılandır (uygulama girişinde bir kez).
+
+    Seviye: parametre > MERGENX_LOG_LEVEL > INFO. Tüm handler'lara korelasyon filtresi eklenir.
+    """
+    level = (level or os.getenv("MERGENX_LOG_LEVEL", "INFO")).upper()
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in root.handlers:
+        if not any(isinstance(f, CorrelationIdFilter) for f in handler.filters):
+            handler.addFilter(CorrelationIdFilter())
@@ -0,0 +1,154 @@
+"""
+Çevrimdışı Başlatma: ağ erişimi olmadan (model hub, telemetri) açılış.
+
+MERGENX_OFFLINE=1 iken:
+  - Embedding modeli sadece yerelden çözülür: önce MERGENX_MODEL_PATH (imaja gömülü
+    model dizini), sonra MERGENX_MODEL_CACHE (sabitlenmiş önbellek, varsayılan
+    data/models). Hiçbiri yoksa hub'a gidilmez, açık bir hatayla durulur.
+  - Hugging Face hub / transformers çevrimdışı moda alınır, telemetrileri kapatılır.
+Chroma telemetrisi her modda kapalıdır (MERGENX_TELEMETRY=1 ile açılır).
+
+Model önbelleği ağ erişimi olan bir makinede önceden doldurulur:
+    python -m src.model.offline --fetch
+
+Hangi varlığın nereden geldiği asset_report() ile okunur (Streamlit durum paneli).
+"""
+import argparse
+import logging
+import os
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_CACHE = Path(__file__).resolve().parents[2] / "data" / "models"
+
+# Varlık kaynakları (durum paneli için)
+SOURCE_BUNDLED = "gömülü"
+SOURCE_LOCAL_CACHE = "yerel önbellek"
+SOURCE_HUB = "model hub"
+SOURCE_LOCAL_DB = "yerel dizin"
+
+# huggingface_hub bu değişkenleri import anında okur: model yüklenmeden önce ayarlanır
+_OFFLINE_ENV = {
+    "HF_HUB_OFFLINE": "1",
+    "TRANSFORMERS_OFFLINE": "1",
+    "HF_HUB_DISABLE_TELEMETRY": "1",
+    "HF_HUB_DISABLE_IMPLICIT_TOKEN": "1",
+}
+
+_assets = {}
+_assets_lock = threading.Lock()
+
+
+def _flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def offline_mode() -> bool:
+    return _flag("MERGENX_OFFLINE")
+
+
+def telemetry_enabled() -> bool:
+    return _flag("MERGENX_TELEMETRY") and not offline_mode()
+
+
+def model_cache_dir() -> Path:
+    return Path(os.getenv("MERGENX_MODEL_CACHE") or DEFAULT_MODEL_CACHE)
+
+
+def configure_environment():
+    """Çevrimdışı modda hub / transformers ağ erişimini ve telemetriyi kapat (açıkça verilen değerler korunur)."""
+    if not telemetry_enabled():
+        os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+    if offline_mode():
+        for name, value in _OFFLINE_ENV.items():
+            os.environ.setdefault(name, value)
+
+
+def chroma_settings():
+    """Chroma client ayarları: telemetri kapalı (tüm client'lar aynı ayarla açılır)."""
+    from chromadb.config import Settings
+    return Settings(anonymized_telemetry=telemetry_enabled())
+
+
+def _hub_cache_name(model_name: str) -> str:
+    repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    return "models--" + repo.replace("/", "--")
+
+
+def resolve_model(model_name: str) -> tuple:
+    """
+    Modelin yükleneceği yer.
+
+    Returns: (SentenceTransformer'a verilecek ad veya dizin, kaynak)
+    Raises: FileNotFoundError - çevrimdışı modda model yerelde yoksa
+    """
+    bundled = os.getenv("MERGENX_MODEL_PATH")
+    if bundled and Path(bundled).is_dir():
+        return bundled, SOURCE_BUNDLED
+
+    cache = model_cache_dir()
+    # --fetch ile kaydedilmiş dizin veya hub önbellek düzeni (cache_folder)
+    saved = cache / model_name.split("/")[-1]
+    if saved.is_dir():
+        return str(saved), SOURCE_LOCAL_CACHE
+    if (cache / _hub_cache_name(model_name)).is_dir():
+        return model_name, SOURCE_LOCAL_CACHE
+
+    if offline_mode():
+        raise FileNotFoundError(
+            f"Çevrimdışı mod: '{model_name}' modeli yerelde bulunamadı "
+            f"(MERGENX_MODEL_PATH={bundled or '-'}, önbellek={cache}). "
+            f"Ağ erişimi olan bir makinede 'python -m src.model.offline --fetch' çalıştırın."
+        )
+    return model_name, SOURCE_HUB
+
+
+def record_asset(name: str, source: str, detail: str = ""):
+    with _assets_lock:
+        _assets[name] = {"source": source, "detail": detail}
+    logger.info("Asset %s loaded from %s (%s)", name, source, detail)
+
+
+def asset_report() -> dict:
+    """{varlık adı: {"source": ..., "detail": ...}} + mod bilgisi."""
+    with _assets_lock:
+        assets = {name: dict(info) for name, info in _assets.items()}
+    return {"offline": offline_mode(), "telemetry": telemetry_enabled(), "assets": assets}
+
+
+def fetch_model(model_name: str, cache: Path = None) -> Path:
+    """Modeli indirip önbellek dizinine kaydet (çevrimdışı kurulumdan önce, ağ erişimi olan makinede)."""
+    from sentence_transformers import SentenceTransformer
+
+    target = Path(cache or model_cache_dir()) / model_name.split("/")[-1]
+    target.parent.mkdir(parents=True, exist_ok=True)
+    SentenceTransformer(model_name).save(str(target))
+    return target
+
+
+def main(argv=None):
+    from src.model.resources import DEFAULT_EMBEDDING_MODEL
+
+    parser = argparse.ArgumentParser(description="Çevrimdışı başlatma için model önbelleği")
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--cache", default=None, help="Önbellek dizini (varsayılan MERGENX_MODEL_CACHE veya data/models)")
+    parser.add_argument("--fetch", action="store_true", help="Modeli indir ve önbelleğe kaydet")
+    args = parser.parse_args(argv)
+
+    if args.cache:
+        os.environ["MERGENX_MODEL_CACHE"] = args.cache
+    if args.fetch:
+        print(f"Saved {args.model} -> {fetch_model(args.model)}")
+    try:
+        path, source = resolve_model(args.model)
+        print(f"{args.model}: {source} ({path})")
+    except FileNotFoundError as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
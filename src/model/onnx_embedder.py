@@ -0,0 +1,245 @@
+"""
+ONNX Embedder: MiniLM'in int8 (dinamik kuantize) ONNX kopyası ile torch'suz CPU encode.
+
+Çalışma anında sadece onnxruntime + tokenizers gerekir; torch / sentence-transformers
+sadece dışa aktarma (export) adımında, model bir kez dönüştürülürken kullanılır.
+MergenEmbedder ile aynı arayüz: create_embeddings(texts) -> np.ndarray (float32).
+
+    python -m src.model.onnx_embedder --export     # data/models/<model>-onnx/ (fp32 + int8)
+    python -m src.model.onnx_embedder --check      # torch embedding'leri ile parite
+    MERGENX_EMBEDDER_BACKEND=onnx streamlit run src/streamlit_app.py
+
+Pooling (mean / cls), normalize ve maksimum uzunluk dışa aktarılan
+sentence-transformers dizinindeki yapılandırmadan okunur; böylece vektörler torch
+modeliyle aynı uzaydadır ve mevcut Chroma koleksiyonu yeniden oluşturulmadan kullanılır.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from src.model.offline import SOURCE_BUNDLED, SOURCE_LOCAL_CACHE, model_cache_dir, record_asset, resolve_model
+
+QUANTIZED_FILE = "model_qint8.onnx"
+FP32_FILE = "model.onnx"
+DEFAULT_BATCH_SIZE = 32
+# int8 kuantizasyon vektörleri hafifçe kaydırır; sıralama için bu benzerlik yeterli
+DEFAULT_PARITY_THRESHOLD = 0.98
+
+
+def onnx_model_dir(model_name: str) -> Path:
+    """Dışa aktarılmış ONNX modelinin dizini (MERGENX_ONNX_MODEL_PATH veya önbellek/<model>-onnx)."""
+    bundled = os.getenv("MERGENX_ONNX_MODEL_PATH")
+    if bundled:
+        return Path(bundled)
+    return model_cache_dir() / f"{model_name.split('/')[-1]}-onnx"
+
+
+def _find_model_file(model_dir: Path, file_name: str) -> Path:
+    # sentence-transformers ONNX dosyalarını onnx/ alt dizinine yazar; kökte de aranır
+    for candidate in (model_dir / "onnx" / file_name, model_dir / file_name):
+        if candidate.is_file():
+            return candidate
+    raise FileNotFoundError(
+        f"ONNX modeli bulunamadı: {model_dir}/[onnx/]{file_name}. "
+        f"'python -m src.model.onnx_embedder --export' ile oluşturun."
+    )
+
+
+def _read_json(path: Path, default: dict) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+class OnnxEmbedder:
+    def __init__(self, model_name: str = "paraphrase-multilingual-MiniLM-L12-v2", quantized: bool = True,
+                 batch_size: int = DEFAULT_BATCH_SIZE, threads: int = None):
+        """
+        Args:
+            model_name: Dışa aktarılan sentence-transformers modeli
+            quantized: int8 kopya (False: fp32 ONNX, parite karşılaştırması için)
+            batch_size: encode parti boyutu
+            threads: onnxruntime intra-op thread sayısı (varsayılan: onnxruntime seçer)
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = onnx_model_dir(model_name)
+        model_file = _find_model_file(model_dir, QUANTIZED_FILE if quantized else FP32_FILE)
+
+        # sentence-transformers yapılandırması: uzunluk sınırı, pooling, normalize
+        config = _read_json(model_dir / "sentence_bert_config.json", {})
+        pooling = _read_json(model_dir / "1_Pooling" / "config.json", {"pooling_mode_mean_tokens": True})
+        modules = _read_json(model_dir / "modules.json", [])
+        self.max_length = int(config.get("max_seq_length", 128))
+        self.pooling = "cls" if pooling.get("pooling_mode_cls_token") else "mean"
+        self.normalize = any(module.get("type", "").endswith("Normalize") for module in modules)
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self._input_names = {node.name for node in self.session.get_inputs()}
+
+        source = SOURCE_BUNDLED if os.getenv("MERGENX_ONNX_MODEL_PATH") else SOURCE_LOCAL_CACHE
+        record_asset("embedding_model", source, str(model_file))
+
+    def _encode_batch(self, texts: list) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        # İlk çıktı token embedding'leri: (parti, uzunluk, boyut)
+        token_embeddings = self.session.run(None, feeds)[0]
+        if self.pooling == "cls":
+            embeddings = token_embeddings[:, 0]
+        else:
+            mask = attention_mask[:, :, None].astype(np.float32)
+            embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.astype(np.float32)
+
+    def create_embeddings(self, texts: list) -> np.ndarray:
+        """
+        Metin listesini vektorlere (embedding) cevirir.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate([
+            self._encode_batch(texts[start:start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ])
+
+
+def export_onnx(model_name: str, out_dir: Path = None, opset: int = 17) -> Path:
+    """
+    Modeli ONNX'e aktar ve dinamik int8 kuantize et (torch + sentence-transformers gerekir).
+
+    Dizin: sentence-transformers yapılandırması + tokenizer.json + onnx/model.onnx (fp32)
+    + onnx/model_qint8.onnx (ağırlıklar int8, aktivasyonlar çalışma anında kuantize).
+    torch ağırlıkları dizine kopyalanmaz: çalışma anı imajı sadece ONNX dosyasını taşır.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    # Kaynak model MergenEmbedder ile aynı yerden (gömülü / yerel önbellek / hub) çözülür
+    path, _ = resolve_model(model_name)
+    out_dir = Path(out_dir or onnx_model_dir(model_name))
+    model = SentenceTransformer(path, device="cpu", cache_folder=str(model_cache_dir()))
+    model.save(str(out_dir))
+    for weights in ("model.safetensors", "pytorch_model.bin"):
+        (out_dir / weights).unlink(missing_ok=True)
+
+    # Transformer gövdesi: token embedding'leri (pooling numpy'da yapılır)
+    transformer = model[0].auto_model.eval()
+    sample = model.tokenizer(["örnek sorgu", "daha uzun bir örnek otel açıklaması"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class _Encoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs)))[0]
+
+    onnx_dir = out_dir / "onnx"
+    onnx_dir.mkdir(parents=True, exist_ok=True)
+    fp32 = onnx_dir / FP32_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(), tuple(sample[name] for name in input_names), str(fp32),
+            input_names=input_names, output_names=["token_embeddings"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in input_names + ["token_embeddings"]},
+            opset_version=opset, dynamo=False,
+        )
+    quantize_dynamic(str(fp32), str(onnx_dir / QUANTIZED_FILE), weight_type=QuantType.QInt8)
+    return out_dir
+
+
+def parity_report(reference, candidate, texts: list) -> dict:
+    """
+    İki embedder'ın aynı metinlerdeki vektör benzerliği.
+
+    Returns: min / ortalama kosinüs ve her metnin en yakın komşusunun (diğer metinler
+    arasında) iki embedder'da aynı çıkma oranı
+    """
+    ref = np.asarray(reference.create_embeddings(texts), dtype=np.float32)
+    cand = np.asarray(candidate.create_embeddings(texts), dtype=np.float32)
+    ref = ref / np.clip(np.linalg.norm(ref, axis=1, keepdims=True), 1e-12, None)
+    cand = cand / np.clip(np.linalg.norm(cand, axis=1, keepdims=True), 1e-12, None)
+    cosine = (ref * cand).sum(axis=1)
+
+    # Sıralama paritesi: metin-metin benzerlik matrisinde en yakın komşu
+    ref_sim, cand_sim = ref @ ref.T, cand @ cand.T
+    np.fill_diagonal(ref_sim, -np.inf)
+    np.fill_diagonal(cand_sim, -np.inf)
+    neighbour_agreement = float((ref_sim.argmax(axis=1) == cand_sim.argmax(axis=1)).mean())
+    return {
+        "texts": len(texts),
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "nearest_neighbour_agreement": neighbour_agreement,
+    }
+
+
+def _parity_texts(root: Path, hotels: int) -> list:
+    with open(root / "benchmarks" / "queries_tr.json", "r", encoding="utf-8") as f:
+        texts = list(json.load(f)["queries"])
+    with open(root / "data" / "hotels.json", "r", encoding="utf-8") as f:
+        data = json.load(f)
+    hotels_list = data["hotels"] if isinstance(data, dict) else data
+    for hotel in hotels_list[:hotels]:
+        texts.append(f"{hotel.get('name', '')} {hotel.get('concept', '')} {hotel.get('description', '')}")
+    return texts
+
+
+def main(argv=None):
+    from src.model.resources import DEFAULT_EMBEDDING_MODEL
+
+    parser = argparse.ArgumentParser(description="ONNX / int8 embedder: dışa aktarma ve parite kontrolü")
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--export", action="store_true", help="Modeli ONNX'e aktar + int8 kuantize et")
+    parser.add_argument("--check", action="store_true", help="torch embedding'leri ile karşılaştır")
+    parser.add_argument("--hotels", type=int, default=200, help="Paritede kullanılacak otel açıklaması sayısı")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_PARITY_THRESHOLD, help="Minimum kosinüs")
+    args = parser.parse_args(argv)
+
+    if args.export:
+        print(f"Exported {args.model} -> {export_onnx(args.model)}")
+    if not args.check:
+        return 0
+
+    from src.model.embeddings import MergenEmbedder
+
+    texts = _parity_texts(Path(__file__).resolve().parents[2], args.hotels)
+    reference = MergenEmbedder(args.model)
+    failed = False
+    for quantized in (False, True):
+        report = parity_report(reference, OnnxEmbedder(args.model, quantized=quantized), texts)
+        label = "int8" if quantized else "fp32"
+        passed = report["min_cosine"] >= args.threshold
+        failed |= not passed
+        print(f"{label}: {'OK' if passed else 'FAIL'} {json.dumps(report)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
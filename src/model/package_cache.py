@@ -0,0 +1,206 @@
+"""
+Paket Önbelleği: Aynı niyete indirgenen sorgular için hazır paketler.
+
+"İzmir aile", "ailemle izmir'e gitmek istiyorum" gibi farklı ifadeler aynı
+travel_params'a düşer. Bu sorgular için otel arama, uçuş/transfer filtreleme ve
+fiyatlama tekrar çalıştırılmaz; paketler bellekten döner, sadece LLM özeti üretilir.
+
+Anahtar: kanonik travel_params + ("pool", havuz boyutu) veya (offset, sayfa boyutu,
+havuzdaki aday sayısı). Otel arama sorgusu (şehir + konsept + tercihler) travel_params'tan
+türetildiği için ayrıca sorgu embedding'i anahtara girmez.
+Geçersizleştirme: TTL veya veri dosyalarının (hotels/flights/transfers/geography) değişmesi
+
+SearchSessionStore, sayfalı aramada bir kullanıcının aday havuzunu cursor ile
+sonraki sayfalara taşır.
+"""
+import copy
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+
+def canonical_travel_params(travel_params: dict) -> tuple:
+    """travel_params'ı sıralı, hashlenebilir bir tuple'a çevir (ifade farklarından bağımsız)."""
+    intent = travel_params.get("intent", {}) or {}
+    return (
+        str(travel_params.get("destination_city", "")).strip().lower(),
+        travel_params.get("destination_iata", ""),
+        travel_params.get("origin_iata", ""),
+        travel_params.get("travel_style", ""),
+        travel_params.get("time_preference") or "",
+        bool(travel_params.get("city_explicitly_specified", False)),
+        str(travel_params.get("concept", "")).strip().lower(),
+        tuple(sorted(str(p).strip().lower() for p in travel_params.get("preferences", []) or [])),
+        tuple(sorted((key, bool(value)) for key, value in intent.items())),
+        float(travel_params.get("budget") or 0),
+        int(travel_params.get("nights") or 1),
+        travel_params.get("check_in") or "",
+        travel_params.get("check_out") or "",
+    )
+
+
+class PackageCache:
+    """
+    TTL'li, boyut sınırlı (LRU) ve veri sürümüne bağlı paket önbelleği.
+
+    Streamlit tüm oturumlara tek engine verdiği için thread-safe'tir.
+    Paketler kopyalanarak saklanır ve kopyalanarak döner; çağıranın özet eklemesi
+    önbellekteki kaydı değiştirmez.
+    """
+
+    def __init__(self, data_files: list, ttl_seconds: float = 600, max_entries: int = 256):
+        self.data_files = list(data_files)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = self._data_version()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def _data_version(self) -> tuple:
+        version = []
+        for path in self.data_files:
+            try:
+                stat = os.stat(path)
+                version.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                version.append((path, None, None))
+        return tuple(version)
+
+    def make_key(self, travel_params: dict, *extra) -> tuple:
+        """extra: ("pool", havuz_boyutu) aday havuzu için, (offset, sayfa_boyutu, aday_sayısı) paket sayfası için."""
+        return (canonical_travel_params(travel_params),) + extra
+
+    def get(self, key: tuple):
+        """Geçerli kayıt varsa paketlerin kopyasını döndür, yoksa None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, packages = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(packages)
+
+    def put(self, key: tuple, packages: list):
+        """Paket listesini (veya aday otel havuzunu) kopyalayarak sakla; boş sonuç saklanmaz."""
+        if not self.enabled or not packages:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(packages))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = self._data_version()
+
+    def _check_version(self):
+        # Veri dosyaları değiştiyse (yeni envanter) tüm kayıtlar geçersiz
+        current = self._data_version()
+        if current != self._version:
+            self._entries.clear()
+            self._version = current
+
+
+class SearchSessionStore:
+    """
+    Sayfalı arama oturumları: oturum_id -> ilk aramanın durumu (travel_params, aday havuzu...).
+
+    Kısa ömürlüdür (TTL) ve boyut sınırlıdır; süresi dolan cursor'lar yeni arama gerektirir.
+    Durum kopyalanmaz: oturum sahibi kaydı değiştirmemelidir.
+    """
+
+    def __init__(self, ttl_seconds: float = 900, max_sessions: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, state: dict) -> str:
+        session_id = uuid.uuid4().hex[:16]
+        with self._lock:
+            self._sessions[session_id] = (time.monotonic(), state)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id
+
+    def get(self, session_id: str):
+        """Oturum durumunu döndür; yoksa veya süresi dolduysa None."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            created_at, state = entry
+            if time.monotonic() - created_at > self.ttl_seconds:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return state
+
+
+class QueryEmbeddingCache:
+    """
+    Arama sorgusu -> embedding LRU önbelleği (thread-safe).
+
+    get_many önbellekte olmayan sorguları tek encode çağrısında üretir; toplu arama
+    (search_hotels_batch) ve tekil arama aynı önbelleği paylaşır.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, queries: list, encode) -> tuple:
+        """
+        Args:
+            queries: Arama sorguları (tekrar edebilir)
+            encode: create_embeddings(texts) gibi, eksik sorguları tek çağrıda vektöre çeviren fonksiyon
+
+        Returns: (sorgu sırasıyla vektör tuple'ları, önbellek isabet sayısı)
+        """
+        with self._lock:
+            found = {}
+            for query in queries:
+                vector = self._entries.get(query)
+                if vector is not None:
+                    self._entries.move_to_end(query)
+                    found[query] = vector
+        missing = [query for query in dict.fromkeys(queries) if query not in found]
+        if missing:
+            for query, vector in zip(missing, encode(missing)):
+                found[query] = tuple(np.asarray(vector).tolist())
+            with self._lock:
+                for query in missing:
+                    self._entries[query] = found[query]
+                    self._entries.move_to_end(query)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        missing_set = set(missing)
+        hits = sum(query not in missing_set for query in queries)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(queries) - hits
+        return [found[query] for query in queries], hits
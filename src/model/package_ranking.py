@@ -0,0 +1,159 @@
+"""
+Paket Sıralama: Tüm (otel, uçuş, transfer) kombinasyonlarının NumPy ile puanlanması.
+
+Her otel için uygun uçuşlar (rota + zaman penceresi) ve konum hiyerarşisine uyan
+transferler aday kümesini oluşturur. Skor (düşük = daha iyi):
+
+    fiyat    * (paket toplamı / en ucuz paket toplamı - 1)
+  + kalite   * (kabin kademesi + araç kademesi cezası)
+  + süre     * transfer süresi (saat)
+  + eşleşme  * konum eşleşme kademesi (AREA=0, DISTRICT=1, CITY_REGION=2, CITY=3)
+
+Fiyat terimi otel fiyatını içerdiği için seçim otele bağlıdır (pahalı bir otelde uçuş
+farkı göreli olarak küçülür). Skor (otel x uçuş x transfer) dizisinde tek seferde
+hesaplanır; her otel için en iyi kombinasyon argmin ile seçilir. Skor fiyatta ve cezada
+monoton olduğundan, hem daha pahalı hem daha cezalı (baskın olunan) adaylar diziye
+girmeden elenir: büyük rotalarda binlerce uçuş birkaç Pareto adayına iner.
+
+Ağırlıklar travel_style başına STYLE_WEIGHTS'tadır; MERGENX_RANKING_WEIGHTS ile
+gösterilen JSON dosyası bunları kısmen ezebilir:
+    {"lüks": {"quality": 3.0}, "ekonomik": {"price": 4.0}}
+"""
+import json
+import logging
+import os
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from src.model.records import PREMIUM_TIER
+
+logger = logging.getLogger(__name__)
+
+MATCH_TIERS = ("AREA", "DISTRICT", "CITY_REGION", "CITY")
+DEFAULT_STYLE = "aile"
+
+# Araç kademesi 1-3; bilinmeyen kategori (99) standart kademe sayılır
+_MAX_VEHICLE_TIER = 3
+
+
+@dataclass(slots=True, frozen=True)
+class RankingWeights:
+    """Skor terimlerinin ağırlıkları (0 = terim yok sayılır)."""
+
+    price: float = 1.0
+    quality: float = 0.05
+    duration: float = 0.1
+    match: float = 3.0
+
+
+# Fiyat terimi paket toplamına görelidir (0.1 = %10 daha pahalı paket). Eşleşme ağırlığı yüksek:
+# daha yakın bölgeye transfer, paket %300'e kadar pahalı olsa da önce gelir
+STYLE_WEIGHTS = {
+    "aile": RankingWeights(price=1.0, quality=0.05, duration=0.1, match=3.0),
+    "lüks": RankingWeights(price=0.5, quality=1.0, duration=0.2, match=3.0),
+    "ekonomik": RankingWeights(price=2.0, quality=0.0, duration=0.05, match=3.0),
+}
+
+
+def load_style_weights(path: str = None) -> dict:
+    """
+    Varsayılan ağırlıklar + (varsa) JSON dosyasından kısmi ezmeler.
+
+    Args:
+        path: JSON dosyası (varsayılan MERGENX_RANKING_WEIGHTS ortam değişkeni)
+    """
+    weights = dict(STYLE_WEIGHTS)
+    path = path or os.getenv("MERGENX_RANKING_WEIGHTS")
+    if not path:
+        return weights
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        for style, values in overrides.items():
+            base = weights.get(style, weights[DEFAULT_STYLE])
+            weights[style] = replace(base, **{key: float(value) for key, value in values.items()})
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        logger.warning("Could not load ranking weights from %s (%s); using defaults", path, e)
+    return weights
+
+
+def resolve_weights(travel_style: str, style_weights: dict = None) -> RankingWeights:
+    style_weights = style_weights or STYLE_WEIGHTS
+    return style_weights.get(travel_style) or style_weights.get(DEFAULT_STYLE) or RankingWeights()
+
+
+def flight_penalty(rows: np.ndarray, weights: RankingWeights) -> np.ndarray:
+    """Uçuş satırlarının fiyat dışı cezası: premium olmayan kabin = 1 kalite adımı."""
+    return weights.quality * (rows["quality"] != PREMIUM_TIER).astype(np.float64)
+
+
+def transfer_penalty(rows: np.ndarray, match_tiers: np.ndarray, weights: RankingWeights) -> np.ndarray:
+    """Transfer satırlarının fiyat dışı cezası: araç kademesi + süre + konum eşleşme kademesi."""
+    vehicle = (np.minimum(rows["quality"].astype(np.float64), _MAX_VEHICLE_TIER) - 1) / (_MAX_VEHICLE_TIER - 1)
+    return (
+        weights.quality * vehicle
+        + weights.duration * rows["duration"].astype(np.float64) / 60.0
+        + weights.match * match_tiers.astype(np.float64)
+    )
+
+
+def pareto_front(prices: np.ndarray, penalties: np.ndarray) -> np.ndarray:
+    """
+    Baskın olunmayan adayların indeksleri (dosya sırasıyla).
+
+    Başka bir aday hem daha ucuz (veya eşit) hem daha az cezalı (veya eşit) ise aday
+    hiçbir ağırlıkta kazanamaz. Eşitlerden dosya sırasında ilki tutulur.
+    """
+    # lexsort kararlıdır: eşit (ceza, fiyat) adaylar dosya sırasında kalır
+    order = np.lexsort((prices, penalties))
+    sorted_prices = prices[order]
+    # Ceza sırasında ilerlerken sadece o ana kadarki en ucuzdan daha ucuz olanlar kalır
+    cheapest_before = np.concatenate(([np.inf], np.minimum.accumulate(sorted_prices)[:-1]))
+    return np.sort(order[sorted_prices < cheapest_before])
+
+
+def rank_combinations(hotel_prices, flight_prices, flight_penalties, transfer_prices, transfer_penalties,
+                      weights: RankingWeights, budget: float = None) -> tuple:
+    """
+    Her otel için en iyi (uçuş, transfer) çiftini seç.
+
+    Uçuş / transfer dizileri boş olabilir (niyet yok veya aday yok); o bileşen için
+    indeks -1 döner ve fiyatı 0 sayılır. Dizileri önce pareto_front ile daraltmak
+    sonucu değiştirmez, sadece puanlanan kombinasyon sayısını azaltır.
+
+    budget verilirse toplamı bütçeyi aşan kombinasyonların skoru inf olur; hiçbir
+    kombinasyonu bütçeye sığmayan otelin skoru inf döner.
+
+    Returns: (flight_idx, transfer_idx, scores, combinations) - ilk üçü otel sayısı
+    uzunluğunda; combinations puanlanan (otel, uçuş, transfer) sayısı
+    """
+    hotel_prices = np.asarray(hotel_prices, dtype=np.float64)
+    has_flight = len(flight_prices) > 0
+    has_transfer = len(transfer_prices) > 0
+    flight_prices = np.asarray(flight_prices, dtype=np.float64) if has_flight else np.zeros(1)
+    flight_penalties = np.asarray(flight_penalties, dtype=np.float64) if has_flight else np.zeros(1)
+    transfer_prices = np.asarray(transfer_prices, dtype=np.float64) if has_transfer else np.zeros(1)
+    transfer_penalties = np.asarray(transfer_penalties, dtype=np.float64) if has_transfer else np.zeros(1)
+
+    # (otel, uçuş, transfer) paket toplamları
+    totals = hotel_prices[:, None, None] + flight_prices[None, :, None] + transfer_prices[None, None, :]
+    cheapest = totals.reshape(len(hotel_prices), -1).min(axis=1)
+    relative = totals / np.where(cheapest > 0, cheapest, 1.0)[:, None, None] - 1.0
+
+    scores = (
+        weights.price * relative
+        + flight_penalties[None, :, None]
+        + transfer_penalties[None, None, :]
+    )
+    if budget is not None:
+        scores = np.where(totals <= budget, scores, np.inf)
+    scores = scores.reshape(len(hotel_prices), -1)
+    # Eşit skorda ilk kombinasyon (dosya sırası) seçilir
+    best = scores.argmin(axis=1)
+    flight_idx, transfer_idx = np.divmod(best, len(transfer_prices))
+    if not has_flight:
+        flight_idx = np.full(len(hotel_prices), -1)
+    if not has_transfer:
+        transfer_idx = np.full(len(hotel_prices), -1)
+    return flight_idx, transfer_idx, scores[np.arange(len(hotel_prices)), best], scores.size
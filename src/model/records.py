@@ -0,0 +1,243 @@
+"""
+Tipli Kayıtlar: Hotel, Flight, Transfer, Package (__slots__ dataclass).
+
+Paketleme pipeline'ı iç içe dict'ler yerine bu kayıtları taşır. Türetilmiş alanlar
+kayıt oluşturulurken bir kez hesaplanır (normalize konum, float fiyat, kalkış saati,
+kalite kademesi); sıcak döngüler .get(...) zincirleri ve tip dönüşümleri yerine
+attribute erişimi yapar.
+
+Dış format değişmez: Package.to_dict() Streamlit arayüzünün, LLM promptlarının ve
+paket önbelleğinin kullandığı dict'i üretir.
+"""
+import json
+from dataclasses import dataclass, field
+
+# Kalite kademeleri (düşük = daha iyi)
+PREMIUM_TIER = 1
+STANDARD_TIER = 2
+UNKNOWN_TIER = 99
+
+# Derlenmiş transfer tablosunda araç özelliklerinin ayracı
+FEATURE_SEPARATOR = "|"
+
+CABIN_TIERS = {"BUSINESS": PREMIUM_TIER, "PREMIUM_ECONOMY": PREMIUM_TIER}
+
+VEHICLE_TIERS = {
+    # Premium tier
+    "VIP": 1, "VAN_VIP": 1, "PREMIUM": 1, "PREMIUM_VAN": 1, "LUXURY": 1,
+    # Mid tier
+    "VAN": 2, "MINIVAN": 2, "VITO": 2, "MERCEDES": 2, "SPRINTER": 2, "SEDAN": 2, "MINIBUS": 2,
+    # Standard tier
+    "SHUTTLE": 3, "STANDARD": 3, "ECONOMY": 3, "BUS": 3
+}
+
+
+def normalize_place(name: str) -> str:
+    """Konum alanı karşılaştırma biçimi (transfer eşleştirme ile aynı: küçük harf + trim)."""
+    return (name or "").lower().strip()
+
+
+def cabin_tier(cabin: str) -> int:
+    return CABIN_TIERS.get((cabin or "").upper(), STANDARD_TIER)
+
+
+def vehicle_tier(category: str) -> int:
+    """
+    Araç kategorisinin kalite kademesi. Birleşik kategoriler (VAN_VIP, SEDAN_VIP,
+    VAN_ECONOMY, SHUTTLE_BUS...) parçalarından çözülür: premium parça varsa 1,
+    yoksa standart parça varsa 3, yoksa orta parça varsa 2.
+    """
+    category = (category or "").upper()
+    tier = VEHICLE_TIERS.get(category)
+    if tier is not None:
+        return tier
+    tiers = {VEHICLE_TIERS[part] for part in category.split("_") if part in VEHICLE_TIERS}
+    for tier in (1, 3, 2):
+        if tier in tiers:
+            return tier
+    return UNKNOWN_TIER
+
+
+@dataclass(slots=True)
+class Hotel:
+    """Vektör DB sonucundan oluşturulan otel (aday havuzunda ve oturumda bu haliyle durur)."""
+
+    id: str
+    name: str
+    city: str
+    district: str
+    area: str
+    concept: str
+    price: float
+    description: str
+    amenities: list
+    # Sorgu ile kosinüs benzerliği (vektör aramasından; yoksa None)
+    score: float = None
+    location_key: tuple = field(init=False)
+
+    def __post_init__(self):
+        # Transfer önbelleği ve eşleştirmesi için (şehir, ilçe, bölge)
+        self.location_key = (normalize_place(self.city), normalize_place(self.district), normalize_place(self.area))
+
+    @classmethod
+    def from_metadata(cls, hotel_id: str, metadata: dict, document: str, score: float = None) -> "Hotel":
+        amenities = metadata.get("amenities", "[]")
+        try:
+            amenities = json.loads(amenities) if isinstance(amenities, str) else amenities
+        except ValueError:
+            amenities = []
+        price = metadata.get("price", 0.0)
+        return cls(
+            id=hotel_id,
+            name=metadata.get("name", "Unknown"),
+            city=metadata.get("city", ""),
+            district=metadata.get("district", ""),
+            area=metadata.get("area", ""),
+            concept=metadata.get("concept", ""),
+            price=float(price) if price else 0.0,
+            description=document,
+            amenities=amenities or [],
+            score=score,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "city": self.city,
+            "concept": self.concept,
+            "price": self.price,
+            "description": self.description,
+            "amenities": self.amenities,
+            "score": round(self.score, 4) if self.score is not None else None,
+        }
+
+
+@dataclass(slots=True)
+class Flight:
+    """Derlenmiş uçuş tablosundan seçilen uçuş."""
+
+    flight_id: str
+    carrier: str
+    flight_no: str
+    origin: str
+    destination: str
+    departure: str
+    arrival: str
+    dep_hour: int
+    price: float
+    cabin: str
+    baggage: str
+    quality_tier: int
+
+    @classmethod
+    def from_row(cls, row) -> "Flight":
+        return cls(
+            flight_id=row["flight_id"].decode("utf-8"),
+            carrier=row["carrier"].decode("utf-8"),
+            flight_no=row["flight_no"].decode("utf-8"),
+            origin=row["origin"].decode("utf-8"),
+            destination=row["destination"].decode("utf-8"),
+            departure=row["departure"].decode("utf-8"),
+            arrival=row["arrival"].decode("utf-8"),
+            dep_hour=int(row["dep_hour"]),
+            price=float(row["price"]),
+            cabin=row["cabin"].decode("utf-8"),
+            baggage=row["baggage"].decode("utf-8") or None,
+            quality_tier=int(row["quality"]),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "flight_id": self.flight_id,
+            "carrier": self.carrier,
+            "flight_no": self.flight_no,
+            "origin": self.origin,
+            "destination": self.destination,
+            "departure": self.departure,
+            "arrival": self.arrival,
+            "price": self.price,
+            "cabin": self.cabin,
+            "baggage": self.baggage,
+        }
+
+
+@dataclass(slots=True)
+class Transfer:
+    """Derlenmiş transfer tablosundan seçilen rota."""
+
+    service_code: str
+    from_name: str
+    to_area_name: str
+    duration: int
+    category: str
+    features: list
+    price: float
+    quality_tier: int
+
+    @classmethod
+    def from_row(cls, row) -> "Transfer":
+        features = row["features"].decode("utf-8")
+        return cls(
+            service_code=row["service_code"].decode("utf-8"),
+            from_name=row["from_name"].decode("utf-8"),
+            to_area_name=row["to_area_name"].decode("utf-8"),
+            duration=int(row["duration"]),
+            category=row["category"].decode("utf-8"),
+            features=features.split(FEATURE_SEPARATOR) if features else [],
+            price=float(row["price"]),
+            quality_tier=int(row["quality"]),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "service_code": self.service_code,
+            "from": self.from_name,
+            "to": self.to_area_name,
+            "duration": self.duration,
+            "vehicle_category": self.category,
+            "vehicle_features": list(self.features),
+            "price": self.price,
+        }
+
+
+@dataclass(slots=True)
+class Package:
+    """
+    Otel + (opsiyonel) uçuş + (opsiyonel) transfer; fiyat dökümü alanlardan hesaplanır
+    (otel: gecelik x gece, uçuş: gidiş + varsa dönüş).
+    """
+
+    hotel: Hotel
+    flight: Flight = None
+    transfer: Transfer = None
+    return_flight: Flight = None
+    metadata: dict = None
+    error: str = None
+    intelligent_summary: str = ""
+    nights: int = 1
+
+    def price_breakdown(self) -> dict:
+        hotel_price = self.hotel.price * self.nights
+        flight_price = self.flight.price if self.flight is not None else 0
+        if self.return_flight is not None:
+            flight_price += self.return_flight.price
+        transfer_price = self.transfer.price if self.transfer is not None else 0
+        return {
+            "hotel": hotel_price,
+            "flight": flight_price,
+            "transfer": transfer_price,
+            "total": hotel_price + flight_price + transfer_price,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "hotel": self.hotel.to_dict(),
+            "flight": self.flight.to_dict() if self.flight is not None else None,
+            "return_flight": self.return_flight.to_dict() if self.return_flight is not None else None,
+            "transfer": self.transfer.to_dict() if self.transfer is not None else None,
+            "metadata": dict(self.metadata or {}),
+            "error": self.error,
+            "price_breakdown": self.price_breakdown(),
+            "intelligent_summary": self.intelligent_summary,
+        }
@@ -0,0 +1,211 @@
+"""
+Paylaşılan Kaynaklar: süreç başına tek embedding modeli, yol başına tek Chroma client.
+
+TravelPlanner, yeniden oluşturma (rebuild) ve MergenVectorStore aynı ~470 MB'lık
+MiniLM modelini ve aynı ChromaDB dizinini kullanır. Her bileşen kendi kopyasını
+yüklemek yerine kaynağı buradan ödünç alır (acquire) ve işi bitince bırakır
+(release). Son referans bırakıldığında kaynak kapatılır ve bellekten düşer.
+
+    embedder = acquire_embedder()
+    client = acquire_chroma_client(db_path)
+    ...
+    release_chroma_client(db_path, client)
+    release_embedder(embedder)
+
+Veritabanı dizini fiziksel olarak silinmeden önce invalidate_chroma_client(path)
+çağrılır: eski client kapatılır ve sonraki acquire temiz bir client açar. Eski
+client'ı tutanların release çağrıları yeni kaydı etkilemez.
+"""
+import logging
+import os
+import threading
+
+from src.model.offline import SOURCE_LOCAL_DB, chroma_settings, configure_environment, record_asset
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+
+
+class ResourceRegistry:
+    """Anahtar başına tek örnek + referans sayısı (thread-safe)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        # anahtar -> [kaynak, referans sayısı]
+        self._entries = {}
+
+    def acquire(self, key, factory):
+        """Kayıtlı örneği döndür; yoksa factory() ile oluştur. Referans sayısını artırır."""
+        # Oluşturma kilit altında: eşzamanlı ilk çağrılar modeli iki kez yüklemez
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                logger.info("Loading shared %s: %s", self.name, key)
+                entry = self._entries[key] = [factory(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, key, resource, teardown=None) -> bool:
+        """
+        Referansı bırak; son referansta kaydı sil ve teardown(resource) çağır.
+
+        resource kayıtlı örnek değilse (invalidate sonrası eski örnek) hiçbir şey
+        yapılmaz. Returns: kaynak kapatıldıysa True
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not resource:
+                return False
+            entry[1] -= 1
+            if entry[1] > 0:
+                return False
+            del self._entries[key]
+        _teardown(self.name, key, resource, teardown)
+        return True
+
+    def key_of(self, resource):
+        """Kayıtlı örneğin anahtarı (acquire anındaki); kayıtlı değilse None."""
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry[0] is resource:
+                    return key
+            return None
+
+    def invalidate(self, key, teardown=None) -> bool:
+        """Referans sayısından bağımsız olarak kaydı düşür ve kaynağı kapat."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        _teardown(self.name, key, entry[0], teardown)
+        return True
+
+    def refcount(self, key) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry else 0
+
+    def refcounts(self) -> dict:
+        with self._lock:
+            return {key: entry[1] for key, entry in self._entries.items()}
+
+    def close_all(self, teardown=None):
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        for key, (resource, _) in entries.items():
+            _teardown(self.name, key, resource, teardown)
+
+
+def _teardown(name: str, key, resource, teardown):
+    logger.info("Releasing shared %s: %s", name, key)
+    if teardown is None:
+        return
+    try:
+        teardown(resource)
+    except Exception as e:
+        logger.warning("Could not close shared %s %s: %s", name, key, e)
+
+
+_embedders = ResourceRegistry("embedder")
+_chroma_clients = ResourceRegistry("chroma client")
+
+
+def _chroma_key(path: str) -> str:
+    return os.path.realpath(os.path.abspath(path))
+
+
+def _close_chroma_client(client):
+    close = getattr(client, "close", None)
+    if close is not None:
+        close()
+
+
+def embedder_backend() -> str:
+    """MERGENX_EMBEDDER_BACKEND: torch (varsayılan) | onnx (int8) | onnx-fp32"""
+    return os.getenv("MERGENX_EMBEDDER_BACKEND", "torch").strip().lower()
+
+
+def load_embedder(backend: str, model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """Bu süreçte yeni bir embedder yükle (paylaşılmaz; embedding süreci de bunu kullanır)."""
+    if backend in ("onnx", "onnx-fp32"):
+        from src.model.onnx_embedder import OnnxEmbedder
+        return OnnxEmbedder(model_name, quantized=backend == "onnx")
+    if backend == "torch":
+        from src.model.embeddings import MergenEmbedder
+        return MergenEmbedder(model_name)
+    raise ValueError(f"Bilinmeyen embedder backend: {backend} (torch | onnx | onnx-fp32)")
+
+
+def acquire_embedder(model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """Süreç genelinde paylaşılan embedder (model ilk çağrıda bir kez yüklenir)."""
+    backend = embedder_backend()
+
+    def load():
+        # MERGENX_EMBEDDER_PROCESS=1: model ayrı süreçte, bu süreç torch'u hiç yüklemez
+        if os.getenv("MERGENX_EMBEDDER_PROCESS", "0").strip().lower() in ("1", "true", "yes", "on"):
+            from src.model.embedding_process import ProcessEmbedder
+            embedder = ProcessEmbedder(backend, model_name)
+        else:
+            embedder = load_embedder(backend, model_name)
+        # Eşzamanlı oturumların sorguları tek encode partisinde toplanır. Varsayılan 0 (kapalı):
+        # tek kullanıcılı kurulum her önbelleksiz sorguda pencere kadar beklemesin; çok
+        # oturumlu dağıtımlar açar (örn. 2)
+        window_ms = float(os.getenv("MERGENX_EMBED_BATCH_WINDOW_MS", "0"))
+        if window_ms > 0:
+            from src.model.embedding_worker import BatchingEmbedder
+            embedder = BatchingEmbedder(embedder, window_ms=window_ms,
+                                        max_batch=int(os.getenv("MERGENX_EMBED_MAX_BATCH", "64")))
+        return embedder
+
+    return _embedders.acquire((backend, model_name), load)
+
+
+def _close_embedder(embedder):
+    close = getattr(embedder, "close", None)
+    if close is not None:
+        close()
+
+
+def release_embedder(embedder) -> bool:
+    """
+    acquire_embedder ile alınan embedder'ı bırak. Anahtar (backend, model) alındığı
+    andaki kayıttan okunur: arada ortam değişkeni değişse de doğru referans düşer.
+    """
+    key = _embedders.key_of(embedder)
+    if key is None:
+        return False
+    return _embedders.release(key, embedder, _close_embedder)
+
+
+def acquire_chroma_client(path: str):
+    """Dizin başına paylaşılan chromadb.PersistentClient."""
+    def connect():
+        configure_environment()
+        import chromadb
+        client = chromadb.PersistentClient(path=path, settings=chroma_settings())
+        record_asset("vector_db", SOURCE_LOCAL_DB, path)
+        return client
+
+    return _chroma_clients.acquire(_chroma_key(path), connect)
+
+
+def release_chroma_client(path: str, client) -> bool:
+    return _chroma_clients.release(_chroma_key(path), client, _close_chroma_client)
+
+
+def invalidate_chroma_client(path: str) -> bool:
+    """Dizin silinmeden önce: açık client'ı kapat, sonraki acquire yeni client açsın."""
+    return _chroma_clients.invalidate(_chroma_key(path), _close_chroma_client)
+
+
+def shared_refcounts() -> dict:
+    """Teşhis: {"embedder": {model: n}, "chroma": {path: n}}"""
+    return {"embedder": _embedders.refcounts(), "chroma": _chroma_clients.refcounts()}
+
+
+def shutdown():
+    """Tüm paylaşılan kaynakları kapat (süreç sonu / testler)."""
+    _chroma_clients.close_all(_close_chroma_client)
+    _embedders.close_all(_close_embedder)
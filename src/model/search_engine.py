@@ -1,16 +1,49 @@
-import chromadb
 import json
 import traceback
 import os
 import uuid
 import logging
 from pathlib import Path
+from datetime import date
 from difflib import SequenceMatcher
-from src.model.embeddings import MergenEmbedder
+from collections import namedtuple
+import numpy as np
 from src.model.llm_wrapper import MergenLLM
+from src.model.geography import GEOGRAPHY_PATH, geo_key, get_geography
+from src.model.hotel_shards import load_or_build as load_hotel_shards
+from src.model.hotel_vectors import DEFAULT_RESCORE_FACTOR, load_or_build as load_hotel_vectors
+from src.model.index_config import HnswParams, apply_params as apply_hnsw_params
+from src.model.log_utils import HotPathLogger
+from src.model.package_cache import PackageCache, QueryEmbeddingCache, SearchSessionStore
+from src.model.tracing import span as trace_span, start_trace
+from src.model.package_ranking import (
+    MATCH_TIERS, flight_penalty, load_style_weights, pareto_front, rank_combinations, resolve_weights,
+    transfer_penalty,
+)
+from src.model.records import Flight, Hotel, Package, Transfer
+from src.model.resources import (
+    acquire_chroma_client, acquire_embedder, invalidate_chroma_client, release_chroma_client, release_embedder,
+)
+from src.model.travel_tables import (
+    CACHE_DIR_NAME, CompiledTable, departure_day, load_flight_table, load_transfer_table,
+)
+from src.model.vocabulary import get_query_matcher, parse_budget, parse_nights, parse_stay_dates, stay_nights, strip_nights
 
-# Logger ayarla
+# Logger ayarla: istek düzeyi olaylar logger'a, otel / rota başına olaylar örneklenmiş hot_log'a
 logger = logging.getLogger(__name__)
+hot_log = HotPathLogger(logger)
+
+
+# search_hotels_batch girdisi: arama sorgusu, hedef şehir ('bilinmiyor': tüm şehirler), sonuç sayısı, gecelik fiyat sınırı
+HotelSearch = namedtuple("HotelSearch", ["query", "city", "top_k", "max_price"], defaults=("bilinmiyor", 3, None))
+
+
+def _similarity(distance) -> float:
+    """Chroma kosinüs mesafesinden benzerlik skoru (1: aynı yön, 0: ilgisiz)."""
+    return 1.0 - float(distance)
+
+# Zaman tercihi -> kalkış saati aralığı [başlangıç, bitiş)
+FLIGHT_TIME_WINDOWS = {"sabah": (6, 12), "öğleden": (12, 17), "akşam": (17, 24)}
 
 class TravelPlanner:
     """
@@ -23,8 +56,21 @@ class TravelPlanner:
     6. Akıllı Özet: LLM'e paketi göndererek kişiselleştirilmiş özet oluştur
     """
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, embedder=None, llm=None, data_dir: str = None,
+                 ranking_weights: dict = None):
+        """
+        Args:
+            db_path: ChromaDB dizini (varsayılan ./data/chroma_db_v2)
+            embedder: create_embeddings(texts) sağlayan nesne (varsayılan süreçte paylaşılan MergenEmbedder)
+            llm: MergenLLM uyumlu nesne (varsayılan MergenLLM)
+            data_dir: hotels/flights/transfers.json dizini (varsayılan ./data)
+            ranking_weights: travel_style -> RankingWeights (varsayılan load_style_weights())
+        """
         self.error_message = None
+        self.client = None
+        self._shared_embedder = None
+        self.hotel_vectors = None
+        self.shard_router = None
         
         try:
             # Absolute path logic for cloud compatibility
@@ -36,12 +82,20 @@ class TravelPlanner:
                 db_path = os.path.join(os.getcwd(), db_path)
             
             self.db_path = db_path
-            self.hotels_json_path = os.path.join(os.getcwd(), "data", "hotels.json")
+            self.data_dir = data_dir or os.path.join(os.getcwd(), "data")
+            self.geography = get_geography()
+            self.hotels_json_path = os.path.join(self.data_dir, "hotels.json")
+            # HNSW kurulum / arama parametreleri (MERGENX_HNSW_*; varsayılan Chroma'nınki)
+            self.hnsw_params = HnswParams.from_env()
             
-            pass  # Production ready
+            # Embedder DB oluşturmadan önce hazır olmalı (boş koleksiyon hotels.json'dan doldurulur).
+            # Verilmezse süreçteki paylaşılan model kullanılır (close() ile bırakılır)
+            if embedder is None:
+                embedder = self._shared_embedder = acquire_embedder()
+            self.embedder = embedder
             
-            # ChromaDB client'ı oluştur
-            self.client = chromadb.PersistentClient(path=self.db_path)
+            # ChromaDB client'ı (aynı dizin için süreçte tek client)
+            self.client = acquire_chroma_client(self.db_path)
             
             # SMART RE-INIT: Check Streamlit Cloud environment
             is_streamlit_cloud = "STREAMLIT_CLOUD" in os.environ
@@ -70,12 +124,12 @@ class TravelPlanner:
                         import shutil
                         import time
                         
-                        # Close and wipe
+                        # Close and wipe (paylaşılan client kapatılır, diğer sahipler eski client'ı bırakır)
                         try:
                             del self.collection
-                            del self.client
                         except:
                             pass
+                        invalidate_chroma_client(self.db_path)
                         
                         # Physical wipe
                         if os.path.exists(self.db_path):
@@ -83,7 +137,7 @@ class TravelPlanner:
                             time.sleep(1)
                         
                         # Recreate
-                        self.client = chromadb.PersistentClient(path=self.db_path)
+                        self.client = acquire_chroma_client(self.db_path)
                         raise ValueError("Database reset due to metadata corruption")
                 
                 if collection_count == 0:
@@ -92,17 +146,100 @@ class TravelPlanner:
             except Exception as collection_error:
                 self._initialize_db_from_hotels_json()
             
-            self.embedder = MergenEmbedder()
-            self.llm = MergenLLM()
+            # ef_search mevcut koleksiyona da uygulanır (M / ef_construction farklıysa uyarı)
+            self.collection = apply_hnsw_params(self.client, self.collection, self.hnsw_params)
+            
+            self.llm = llm if llm is not None else MergenLLM()
             
             # Veri yükleme
             self._load_flight_data()
             self._load_transfer_data()
             
+            # Kompakt otel vektörleri (MERGENX_VECTOR_PRECISION=int8|float16; boş: Chroma ANN)
+            self.vector_rescore_factor = int(os.getenv("MERGENX_VECTOR_RESCORE", str(DEFAULT_RESCORE_FACTOR)))
+            self.hotel_vectors = self._load_hotel_vectors()
+            
+            # Şehir / havalimanı parçaları (MERGENX_HOTEL_SHARDS=city|airport; boş: tek koleksiyon)
+            self.shard_router = self._load_shard_router()
+            
+            # Uyarlamalı arama: n_results benzerlik eşiğinin üstünde kaldıkça büyür (MERGENX_ADAPTIVE_RETRIEVAL=1)
+            self.adaptive_retrieval = os.getenv("MERGENX_ADAPTIVE_RETRIEVAL", "0") == "1"
+            self.min_similarity = float(os.getenv("MERGENX_MIN_SIMILARITY", "0.3"))
+            self.adaptive_max_results = int(os.getenv("MERGENX_ADAPTIVE_MAX_RESULTS", "256"))
+            
+            # Paket sıralama ağırlıkları (travel_style başına; MERGENX_RANKING_WEIGHTS ile ezilebilir)
+            self.ranking_weights = ranking_weights if ranking_weights is not None else load_style_weights()
+            
+            # Sorgu embedding'leri (dinamik aramada aynı sorgu tekrar tekrar encode edilmesin)
+            self._embedding_cache = QueryEmbeddingCache(max_entries=512)
+            
+            # Sayfalama: ilk aramada bu kadar aday otel alınır, sayfalar bu havuzdan kesilir
+            self.candidate_pool_size = int(os.getenv("MERGENX_CANDIDATE_POOL", "30"))
+            # Bütçe yetersiz mesajı: şehir başına en ucuz gecelik fiyat (ilk ihtiyaçta hesaplanır)
+            self._hotel_price_floor = None
+            self.search_sessions = SearchSessionStore(
+                ttl_seconds=float(os.getenv("MERGENX_SEARCH_SESSION_TTL", "900"))
+            )
+            
+            # Paket önbelleği: veri dosyaları değişince kendiliğinden boşalır
+            self.package_cache = PackageCache(
+                data_files=[
+                    self.hotels_json_path,
+                    os.path.join(self.data_dir, "flights.json"),
+                    os.path.join(self.data_dir, "transfers.json"),
+                    str(GEOGRAPHY_PATH),
+                ],
+                ttl_seconds=float(os.getenv("MERGENX_PACKAGE_CACHE_TTL", "600")),
+            )
+            
         except Exception as e:
             self.error_message = f"Seyahat Planlayıcı Başlatma Hatası: {str(e)}"
             traceback.print_exc()
 
+    def close(self):
+        """Paylaşılan Chroma client'ı ve (planner kendisi aldıysa) embedding modelini bırak."""
+        if self.shard_router is not None:
+            self.shard_router.close()
+            self.shard_router = None
+        if self.client is not None:
+            release_chroma_client(self.db_path, self.client)
+            self.client = None
+            self.collection = None
+        if self._shared_embedder is not None:
+            release_embedder(self._shared_embedder)
+            self._shared_embedder = None
+
+    def _load_hotel_vectors(self):
+        """Düşük hassasiyetli aday deposu (koleksiyondan derlenir); kapalıysa veya açılamazsa None."""
+        precision = os.getenv("MERGENX_VECTOR_PRECISION", "").strip().lower()
+        if not precision:
+            return None
+        try:
+            store = load_hotel_vectors(self.collection, Path(self.data_dir) / CACHE_DIR_NAME, precision, self.db_path)
+        except Exception as e:
+            logger.warning("Compact hotel vectors unavailable (%s); using Chroma ANN", e)
+            return None
+        sizes = store.resident_bytes_per_hotel()
+        logger.info("Compact hotel vectors: %d hotels, %s (%d bytes/hotel vs %d float32)",
+                    len(store), precision, sizes["compact"], sizes["float32"])
+        return store
+
+    def _load_shard_router(self):
+        """Parça koleksiyonları router'ı (ana koleksiyondan kurulur); kapalıysa veya kurulamazsa None."""
+        mode = os.getenv("MERGENX_HOTEL_SHARDS", "").strip().lower()
+        if not mode:
+            return None
+        try:
+            router = load_hotel_shards(self.client, self.collection, mode, self.geography,
+                                       self.hnsw_params.collection_metadata())
+            for key, shard in router.shards.items():
+                router.shards[key] = apply_hnsw_params(self.client, shard, self.hnsw_params)
+        except Exception as e:
+            logger.warning("Hotel shards unavailable (%s); using single collection", e)
+            return None
+        logger.info("Hotel shards: %d collections by %s", len(router), mode)
+        return router
+
     def _initialize_db_from_hotels_json(self):
         """
         hotels.json dosyasından ChromaDB'yi on-the-fly oluştur
@@ -151,11 +288,11 @@ class TravelPlanner:
                 # Yeni koleksiyon oluştur
                 self.collection = self.client.get_or_create_collection(
                     name="hotels",
-                    metadata={"hnsw:space": "cosine"}
+                    metadata=self.hnsw_params.collection_metadata()
                 )
                 
-                # Embedder'ı oluştur
-                embedder = MergenEmbedder()
+                # Planner'ın embedder'ı (sorgu ve doküman vektörleri aynı modelden)
+                embedder = self.embedder
                 
                 # STEP 2 & 3: UUID-based IDs ile otelleri vektör DB'ye ekle ve batch control
                 batch_size = 50
@@ -323,7 +460,7 @@ class TravelPlanner:
                 self.client.delete_collection(name="hotels")
                 self.collection = self.client.get_or_create_collection(
                     name="hotels",
-                    metadata={"hnsw:space": "cosine"}
+                    metadata=self.hnsw_params.collection_metadata()
                 )
                 print("[WARNING] Koleksiyon sıfırlandı ve yeniden oluşturuldu")
             except Exception as reset_error:
@@ -331,35 +468,23 @@ class TravelPlanner:
             raise Exception(f"ChromaDB başlatma hatası: {str(e)}")
 
     def _load_flight_data(self):
-        """flights.json dosyasını yükle (OS-bağımsız dosya yolları)"""
+        """flights.json -> derlenmiş, memory-mapped uçuş tablosu ((origin, destination) dilimleri)"""
         try:
-            flights_path = os.path.join("data", "flights.json")
-            if os.path.exists(flights_path):
-                with open(flights_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # flights.json bir obje, "flights" anahtarı altında liste var
-                    if isinstance(data, dict) and "flights" in data:
-                        self.flights = data.get("flights", [])
-                    else:
-                        self.flights = data if isinstance(data, list) else []
-            else:
-                self.flights = []
+            self.flight_table = load_flight_table(self.data_dir)
         except Exception as e:
-            self.flights = []
+            logger.error("[ERROR] Flight data load failed: %s", e, exc_info=True)
+            self.flight_table = CompiledTable(np.zeros(0, dtype=[("price", "f8")]), {})
+        # Uçuş takvimi (ilk, son kalkış günü): yılsız sorgu tarihlerinin yılı buradan çıkarılır
+        days = self.flight_table.span("dep_day")
+        self.flight_calendar = (date.fromordinal(days[0]), date.fromordinal(days[1])) if days else None
 
     def _load_transfer_data(self):
-        """transfers.json dosyasını yükle (OS-bağımsız dosya yolları)"""
+        """transfers.json -> derlenmiş, memory-mapped transfer tablosu (from_code dilimleri)"""
         try:
-            transfers_path = os.path.join("data", "transfers.json")
-            if os.path.exists(transfers_path):
-                with open(transfers_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # transfers.json bir obje, "transfer_routes" anahtarı altında liste var
-                    self.transfers = data  # Tüm veriyi tut, sonra filter_transfers'ta extract et
-            else:
-                self.transfers = {"transfer_routes": []}
+            self.transfer_table = load_transfer_table(self.data_dir)
         except Exception as e:
-            self.transfers = {"transfer_routes": []}
+            logger.error("[ERROR] Transfer data load failed: %s", e, exc_info=True)
+            self.transfer_table = CompiledTable(np.zeros(0, dtype=[("price", "f8")]), {})
 
     def _simple_parse_query(self, user_query: str) -> dict:
         """
@@ -370,70 +495,35 @@ class TravelPlanner:
         - Travel style keywords
         - Time preferences (sabah, akşam, öğle, gece)
         - Intent (hotel, flight, transfer) with expanded keywords
+        - Budget (toplam TL) and nights (gece sayısı), if given
+        - Stay dates (giriş / çıkış); nights then comes from the dates
         
         Returns: travel_params dict with city_explicitly_specified flag
         """
-        query_lower = user_query.lower()
-        
-        # ✅ FIX 1: STRICT NORMALIZATION - Normalize user query to handle Turkish characters
-        # İzmir -> izmir, Ş -> s, etc.
-        query_normalized = self._normalize_city_name(user_query)
-        
-        # City mapping
-        city_keywords = {
-            "antalya": ("Antalya", "AYT"),
-            "izmir": ("İzmir", "ADB"),
-            "bodrum": ("Bodrum", "BJV"),
-            "dalaman": ("Dalaman", "DLM"),
-            "gaziantep": ("Gaziantep", "GZT")
-        }
+        # ✅ Tek geçiş: tüm sözlükler (şehir, stil, zaman, uçuş, transfer) derlenmiş
+        # Aho–Corasick matcher ile taranır. İzmir -> izmir gibi Türkçe büyük harfler
+        # matcher içinde katlanır.
+        hits = get_query_matcher().scan(strip_nights(user_query))
         
         destination_city = "İzmir"  # Default
         destination_iata = "ADB"
         city_explicitly_specified = False  # ✅ NEW: Track if user specified a city
         
-        # ✅ FIX 1: Use normalized query for city matching
-        for keyword, (city, iata) in city_keywords.items():
-            if keyword in query_normalized:
-                destination_city = city
-                destination_iata = iata
-                city_explicitly_specified = True  # ✅ User explicitly mentioned this city
-                break
+        if "city" in hits:
+            destination_city, destination_iata = hits["city"][0].value
+            city_explicitly_specified = True  # ✅ User explicitly mentioned this city
         
         # Travel style
-        travel_style = "aile"  # Default
-        if any(word in query_lower for word in ["lüks", "lux", "vip", "premium"]):
-            travel_style = "lüks"
-        elif any(word in query_lower for word in ["ekonomik", "ucuz", "budget"]):
-            travel_style = "ekonomik"
-        
-        # ✅ UPDATED: TIME PREFERENCE PARSING - Expanded keywords
-        # Detect time keywords: sabah, akşam, öğle, gece
-        time_preference = None
-        time_keywords = {
-            "sabah": ["sabah", "morning", "erken", "sabahları", "sabahın"],
-            "öğle": ["öğle", "öğleden", "noon", "afternoon", "öğleyin", "öğleden sonra"],
-            "akşam": ["akşam", "evening", "akşamları", "akşamın", "akşamüstü"],
-            "gece": ["gece", "night", "geç", "geceleyin", "gece yarısı"]
-        }
+        travel_style = hits["style"][0].value if "style" in hits else "aile"  # Default
         
-        for time_key, time_words in time_keywords.items():
-            if any(word in query_lower for word in time_words):
-                time_preference = time_key
-                break
+        # ✅ UPDATED: TIME PREFERENCE PARSING - sabah, öğle, akşam, gece
+        time_preference = hits["time"][0].value if "time" in hits else None
         
-        # ✅ UPDATED: EXPANDED FLIGHT INTENT KEYWORDS
         # Intent - assume all 3 unless specified
-        flight_keywords = [
-            "uçuş", "uçak", "uçağı", "uçağıyla", "uçakla", 
-            "flight", "gidiş", "dönüş", "uçma", "uçuyorum",
-            "havayolu", "bilet", "sefer"
-        ]
-        
         intent = {
             "hotel": True,
-            "flight": any(keyword in query_lower for keyword in flight_keywords),
-            "transfer": "transfer" in query_lower or "araç" in query_lower
+            "flight": "flight" in hits,
+            "transfer": "transfer" in hits
         }
         
         # If no specific mention, include all
@@ -441,6 +531,8 @@ class TravelPlanner:
             intent["flight"] = True
             intent["transfer"] = True
         
+        stay = parse_stay_dates(user_query, calendar=self.flight_calendar)
+        
         return {
             "destination_city": destination_city,
             "destination_iata": destination_iata,
@@ -450,9 +542,24 @@ class TravelPlanner:
             "preferences": [],  # Trust vector DB, no manual preferences
             "concept": "",
             "time_preference": time_preference,
-            "city_explicitly_specified": city_explicitly_specified  # ✅ NEW: Strict city lock flag
+            "city_explicitly_specified": city_explicitly_specified,  # ✅ NEW: Strict city lock flag
+            "budget": parse_budget(user_query),  # Toplam paket bütçesi (TL), yoksa None
+            "nights": stay_nights(*stay) if stay else parse_nights(user_query) or 1,
+            "check_in": stay[0].isoformat() if stay else None,  # Tarihli mod: gidiş / dönüş uçuşu tarihe göre
+            "check_out": stay[1].isoformat() if stay else None
         }
 
+    def _warn_if_no_departures(self, travel_params: dict):
+        """Tarihli aramada giriş gününde kalkış havalimanından hiç uçuş yoksa uyar (paketler uçuşsuz kalır)."""
+        origin_iata = travel_params["origin_iata"]
+        day = date.fromisoformat(travel_params["check_in"]).toordinal()
+        if any(len(self.flight_table.rows_between(key, "dep_day", day, day + 1))
+               for key in self.flight_table.index if key[0] == origin_iata):
+            return
+        calendar = " - ".join(d.isoformat() for d in self.flight_calendar) if self.flight_calendar else "empty"
+        logger.warning("No departures from %s on %s (flight calendar: %s)", origin_iata,
+                       travel_params["check_in"], calendar)
+
     def _simple_translate(self, code: str) -> str:
         """Simple code translation without LLM"""
         translations = {
@@ -466,407 +573,698 @@ class TravelPlanner:
         }
         return translations.get(code, code)
     
-    def plan_travel(self, user_query: str, top_k: int = 3) -> tuple:
+    def plan_travel(self, user_query: str, top_k: int = 3, budget: float = None, nights: int = None,
+                    check_in: str = None, check_out: str = None) -> tuple:
+        """
+        İlk sonuç sayfası (geriye dönük uyumluluk). Sonraki sayfalar için plan_travel_page.
+
+        Returns: (packages_list, error_message)
+        """
+        packages, _next_cursor, error = self.plan_travel_page(user_query, page_size=top_k, budget=budget, nights=nights,
+                                                              check_in=check_in, check_out=check_out)
+        return (packages, error)
+
+    def plan_travel_page(self, user_query: str, page_size: int = 3, cursor: str = None,
+                         budget: float = None, nights: int = None, check_in: str = None,
+                         check_out: str = None) -> tuple:
         """
-        ANA SEYAHATTRAFİK PLANLAMA FONKSİYONU - Tamamen Revize
+        ANA SEYAHATTRAFİK PLANLAMA FONKSİYONU - Sayfalı
 
         Adımlar:
-        1. extract_travel_params() ile niyeti anla
-        2. Preferences'ı kullanarak otel ara
-        3. Uçuş ve transfer filtrele
-        4. Paketleme yap
-        5. Akıllı özet oluştur
+        1. Niyeti anla (_prepare_search)
+        2. Aday otel havuzunu BİR KEZ oluştur (embedding + ANN + şehir çeşitliliği)
+        3. Sadece istenen sayfa için uçuş/transfer filtrele ve paketle
+        4. Sadece bu sayfanın paketleri için akıllı özet oluştur
 
-        Returns: (packages_list, error_message)
+        İlk çağrı (cursor=None) aday havuzunu kısa ömürlü bir arama oturumuna koyar.
+        Dönen next_cursor ile sonraki sayfalar aynı havuzdan okunur; sorgu tekrar
+        parse edilmez, embedding ve ANN sorgusu tekrarlanmaz.
+
+        BÜTÇE MODU: budget (toplam TL) verilirse veya sorguda geçerse ("20 bin TL",
+        "3 gece") sadece toplamı (gecelik x gece + uçuş + transfer) bütçeye sığan
+        paketler döner. Otel / rota / havalimanı alt sınırları bütçeyi aşan adaylar
+        filtrelemeden önce elenir; sayfa, bütçeye sığan paketlerle doldurulur.
+        budget / nights parametreleri sorgudan okunan değerleri ezer.
+
+        TARİHLİ MOD: check_in / check_out (ISO tarih) verilirse veya sorguda geçerse
+        ("15-20 haziran", "2026-06-15 - 2026-06-20") gece sayısı tarihlerden hesaplanır,
+        gidiş uçuşu giriş gününden, dönüş uçuşu çıkış gününden seçilir (rota + gün
+        indeksi, bkz. CompiledTable.rows_between).
+
+        Her çağrı bir trace açar (bkz. src/model/tracing.py); aşama süreleri
+        Streamlit panelinde ve MERGENX_TRACE_FILE ile JSONL olarak görülebilir.
+
+        Returns: (packages_list, next_cursor, error_message) - son sayfada next_cursor None
         """
-        
+        with start_trace("plan_travel", page_size=page_size, next_page=bool(cursor)) as trace:
+            packages, next_cursor, error = self._plan_travel_page(user_query, page_size, cursor, budget, nights,
+                                                                  check_in, check_out)
+            trace.attrs.update(packages=len(packages), error=bool(error))
+            return (packages, next_cursor, error)
+
+    def _plan_travel_page(self, user_query: str, page_size: int, cursor: str,
+                          budget: float = None, nights: int = None, check_in: str = None,
+                          check_out: str = None) -> tuple:
+        """plan_travel_page gövdesi (aktif trace içinde çalışır)."""
         # Initialization hatası kontrolü
         if self.error_message:
-            return ([], self.error_message)
-        
-        # ✅ CONTEXT ISOLATION: Her arama başında TravelParams sıfırla
-        # Eski sorgulardan kalabilecek niyetler (bebek koltuğu vb) temizlenir
+            return ([], None, self.error_message)
         
-        # ✅ MAKSIMUM 3 PAKET: top_k'ı kesinlikle 3'ü geçme
-        if top_k > 3:
-            top_k = 3
+        page_size = max(1, int(page_size))
         
         try:
-            # ============================================================
-            # ADIM 1: NİYET ANALİZİ (BASIT PARSING - NO LLM)
-            # ============================================================
-            travel_params = self._simple_parse_query(user_query)
-            
-            intent = travel_params.get("intent", {})
-            destination_city = travel_params.get("destination_city", "")
-            destination_iata = travel_params.get("destination_iata", "ADB")
-            origin_iata = travel_params.get("origin_iata", "IST")
-            travel_style = travel_params.get("travel_style", "aile")
-            preferences = travel_params.get("preferences", [])
-            city_explicitly_specified = travel_params.get("city_explicitly_specified", False)  # ✅ NEW
-            
-            # ✅ FIX 4: Konsepti ayrı al - city ile karıştırılmasın
-            concept = travel_params.get("concept", "")
-            
-            # ============================================================
-            # ✅ STRICT CITY LOCK: If user specified a city, NEVER fallback or infer
-            # ============================================================
-            if city_explicitly_specified:
-                print(f"[🔒 STRICT CITY LOCK] User explicitly requested: {destination_city}")
-                # NO inference, NO fallback - user's choice is final
+            if cursor:
+                # ============================================================
+                # SONRAKİ SAYFA: Oturumdaki aday havuzu (parse / embedding / ANN yok)
+                # ============================================================
+                session_id, offset = self._parse_cursor(cursor)
+                session = self.search_sessions.get(session_id) if session_id else None
+                if session is None:
+                    return ([], None, "Arama oturumunun süresi doldu. Lütfen aramayı yeniden yapın.")
+                
+                user_query = session["user_query"]
+                travel_params = session["travel_params"]
+                destination_city = session["destination_city"]
+                destination_iata = session["destination_iata"]
+                candidates = session["candidates"]
             else:
+                # ✅ CONTEXT ISOLATION: Her yeni arama başında TravelParams sıfırdan çıkarılır
+                # Eski sorgulardan kalabilecek niyetler (bebek koltuğu vb) temizlenir
+                with trace_span("query_parse"):
+                    travel_params, destination_city, destination_iata, search_query = self._prepare_search(user_query)
+                    if budget is not None:
+                        travel_params["budget"] = float(budget)
+                    if nights is not None:
+                        travel_params["nights"] = max(1, int(nights))
+                    if check_in and check_out:
+                        try:
+                            stay = (date.fromisoformat(str(check_in)), date.fromisoformat(str(check_out)))
+                        except ValueError:
+                            return ([], None, "Tarihler YYYY-AA-GG biçiminde olmalıdır.")
+                        if stay[1] <= stay[0]:
+                            return ([], None, "Çıkış tarihi giriş tarihinden sonra olmalıdır.")
+                        travel_params.update(check_in=stay[0].isoformat(), check_out=stay[1].isoformat(),
+                                             nights=stay_nights(*stay))
+                    if travel_params.get("check_in"):
+                        self._warn_if_no_departures(travel_params)
+                
                 # ============================================================
-                # ✅ FIX 2: NİYET VE ŞEHİR SENKRONİZASYONU (only if city NOT specified)
-                # Kullanıcı şehir belirtmediğinde; niyetten (travel_style/preferences)
-                # yola çıkarak destination_city parametresini otomatik doldur
+                # 📦 ADAY HAVUZU: Aynı niyet -> önbellekteki havuz
+                # search_query tamamen travel_params'tan (şehir, konsept, tercihler) türetilir;
+                # anahtara ayrıca sorgu embedding'i eklemek bir şey ayırt etmez
                 # ============================================================
-                if not destination_city or destination_city == "bilinmiyor":
-                    # Travel style ve preferences'tan şehir çıkarımı
-                    style_to_city = {
-                        "kız kıza": "İzmir",
-                        "eğlence": "İzmir",
-                        "villa": "Antalya",
-                        "lüks": "Antalya",
-                        "ekonomik": "İzmir",
-                        "aile": "Antalya"
-                    }
-                    
-                    # Preferences'tan şehir ipucu ara
-                    pref_str = ' '.join(preferences).lower()
-                    if any(word in pref_str for word in ['kız', 'eğlence', 'nightlife', 'bar']):
-                        destination_city = "İzmir"
-                        destination_iata = "ADB"
-                    elif any(word in pref_str for word in ['villa', 'lüks', 'spa', 'aquapark']):
-                        destination_city = "Antalya"
-                        destination_iata = "AYT"
-                    else:
-                        # Travel style'dan varsayılan
-                        destination_city = style_to_city.get(travel_style, "İzmir")
-                        destination_iata = "ADB" if destination_city == "İzmir" else "AYT"
-                    
-                    print(f"[AUTO DESTINATION] No city specified, inferred from style: {destination_city}")
+                pool_key = self.package_cache.make_key(travel_params, "pool", self.candidate_pool_size)
+                with trace_span("pool_cache") as stage:
+                    candidates = self.package_cache.get(pool_key)
+                    stage.add("cache_hits", int(candidates is not None))
+                if candidates is None:
+                    candidates, strict_message = self._collect_candidates(
+                        travel_params, search_query, destination_city, self.candidate_pool_size
+                    )
+                    if strict_message:
+                        return ([], None, strict_message)
+                    self.package_cache.put(pool_key, candidates)
+                
+                offset = 0
+                session_id = self.search_sessions.create({
+                    "user_query": user_query,
+                    "travel_params": travel_params,
+                    "destination_city": destination_city,
+                    "destination_iata": destination_iata,
+                    "candidates": candidates,
+                })
             
             # ============================================================
-            # ADIM 2: OTEL ARAMA (Preferences'ı Kullanarak)
+            # 📦 SAYFA PAKETLERİ: Sadece bu sayfanın otelleri paketlenir
+            # Otel arama, uçuş/transfer filtreleme ve fiyatlama önbellekten gelebilir
             # ============================================================
+            page_key = self.package_cache.make_key(travel_params, offset, page_size, len(candidates))
+            with trace_span("page_cache") as stage:
+                page = self.package_cache.get(page_key)
+                stage.add("cache_hits", int(page is not None))
+            if page is not None:
+                packages, next_offset = page
+                logger.debug("[📦 CACHE HIT] %d paket önbellekten alındı", len(packages))
+            else:
+                # Bütçe modunda bazı oteller elenebilir: sayfa dolana / havuz bitene kadar
+                # sıradaki otellerle devam edilir (cursor tüketilen son adaydan devam eder)
+                packages = []
+                next_offset = offset
+                while len(packages) < page_size and next_offset < len(candidates):
+                    page_hotels = candidates[next_offset:next_offset + page_size - len(packages)]
+                    next_offset += len(page_hotels)
+                    packages.extend(self._build_packages(page_hotels, travel_params, destination_city, destination_iata))
+                self.package_cache.put(page_key, (packages, next_offset))
             
-            # Preferences'tan irrelevant kelimeleri temizle (uçuş, transfer vb.)
-            clean_preferences = self._clean_preferences(preferences)
+            # ============================================================
+            # ✅ FIX 1: API VERİMLİLİĞİ - BATCH PROCESSING
+            # Her paket için ayrı ayrı LLM isteği yerine, tüm paketlerin
+            # 'Reasoning' metinlerini tek bir LLM çağrısıyla oluştur.
+            # Bu, 429 Too Many Requests hatasını %90 oranında kesecektir.
+            # ============================================================
+            if packages:
+                logger.debug("[BATCH PROCESSING] Generating reasoning for %d packages in single LLM call", len(packages))
+                with trace_span("llm_call", packages=len(packages)):
+                    batch_summaries = self._generate_batch_summaries(
+                        packages=packages,
+                        user_query=user_query,
+                        travel_params=travel_params
+                    )
+                
+                # Batch summaries'i paketlere ata
+                for idx, package in enumerate(packages):
+                    if idx < len(batch_summaries):
+                        package["intelligent_summary"] = batch_summaries[idx]
+                    else:
+                        # Fallback
+                        package["intelligent_summary"] = f"{package['hotel']['name']}, tercihlerinize uyumlu bir paket sunar."
             
-            # ✅ FIX 4: Konsepti sorguya ekle ama city ile karıştırma
-            # Temizlenmiş preferences'ı sorgu olarak kullan (destination_city'yi ayrı parameter olarak geç)
-            search_parts = []
-            if concept:  # Konsept varsa ekle
-                search_parts.append(concept)
-            if clean_preferences:  # Tercihler varsa ekle
-                search_parts.extend(clean_preferences)
+            if not packages and travel_params.get("budget") and offset == 0:
+                return ([], None, f"₺{travel_params['budget']:,.0f} bütçeye uygun paket bulunamadı. Lütfen bütçeyi veya gece sayısını değiştirin.")
             
-            search_query = ' '.join(search_parts) if search_parts else destination_city
-            print(f"[SEARCH QUERY] city='{destination_city}', concept='{concept}', query='{search_query}'")
+            next_cursor = f"{session_id}:{next_offset}" if next_offset < len(candidates) else None
+            return (packages, next_cursor, None)
             
+        except Exception as e:
+            error_msg = f"Seyahat Planlama Hatası: {str(e)}\n{traceback.format_exc()}"
+            logger.error("[ERROR] Seyahat planlama hatası: %s", e, exc_info=True)
+            return ([], None, error_msg)
+
+    @staticmethod
+    def _parse_cursor(cursor: str) -> tuple:
+        """'<oturum_id>:<offset>' -> (oturum_id, offset); geçersizse (None, 0)."""
+        session_id, _, offset = str(cursor).rpartition(":")
+        if not session_id or not offset.isdigit():
+            return (None, 0)
+        return (session_id, int(offset))
+
+    def _prepare_search(self, user_query: str) -> tuple:
+        """
+        Niyet analizi + hedef şehir çıkarımı + vektör arama sorgusu.
+
+        Returns: (travel_params, destination_city, destination_iata, search_query)
+        """
+        # ============================================================
+        # ADIM 1: NİYET ANALİZİ (BASIT PARSING - NO LLM)
+        # ============================================================
+        travel_params = self._simple_parse_query(user_query)
+        
+        destination_city = travel_params.get("destination_city", "")
+        destination_iata = travel_params.get("destination_iata", "ADB")
+        travel_style = travel_params.get("travel_style", "aile")
+        preferences = travel_params.get("preferences", [])
+        city_explicitly_specified = travel_params.get("city_explicitly_specified", False)  # ✅ NEW
+        
+        # ✅ FIX 4: Konsepti ayrı al - city ile karıştırılmasın
+        concept = travel_params.get("concept", "")
+        
+        # ============================================================
+        # ✅ STRICT CITY LOCK: If user specified a city, NEVER fallback or infer
+        # ============================================================
+        if city_explicitly_specified:
+            logger.debug("[🔒 STRICT CITY LOCK] User explicitly requested: %s", destination_city)
+            # NO inference, NO fallback - user's choice is final
+        else:
             # ============================================================
-            # 🔄 DYNAMIC CITY DIVERSITY LOOP (şehir belirtilmediğinde)
+            # ✅ FIX 2: NİYET VE ŞEHİR SENKRONİZASYONU (only if city NOT specified)
+            # Kullanıcı şehir belirtmediğinde; niyetten (travel_style/preferences)
+            # yola çıkarak destination_city parametresini otomatik doldur
             # ============================================================
-            if not city_explicitly_specified:
-                # Döngüsel algoritma: 3 farklı şehir bulana kadar ara
-                selected_cities = set()
-                all_hotels_pool = []
-                current_search_limit = top_k * 3  # İlk arama: 9 otel
-                max_search_limit = 50  # Maksimum arama limiti
+            if not destination_city or destination_city == "bilinmiyor":
+                # Travel style ve preferences'tan şehir çıkarımı
+                style_to_city = {
+                    "kız kıza": "İzmir",
+                    "eğlence": "İzmir",
+                    "villa": "Antalya",
+                    "lüks": "Antalya",
+                    "ekonomik": "İzmir",
+                    "aile": "Antalya"
+                }
                 
-                print(f"[🔄 DYNAMIC SEARCH] Şehir belirtilmedi, 3 farklı şehir aranıyor...")
+                # Preferences'tan şehir ipucu ara
+                pref_str = ' '.join(preferences).lower()
+                if any(word in pref_str for word in ['kız', 'eğlence', 'nightlife', 'bar']):
+                    destination_city = "İzmir"
+                elif any(word in pref_str for word in ['villa', 'lüks', 'spa', 'aquapark']):
+                    destination_city = "Antalya"
+                else:
+                    # Travel style'dan varsayılan
+                    destination_city = style_to_city.get(travel_style, "İzmir")
+                destination_iata = self.geography.primary_airport(destination_city)
                 
+                logger.debug("[AUTO DESTINATION] No city specified, inferred from style: %s", destination_city)
+        
+        # ============================================================
+        # ADIM 2: OTEL ARAMA (Preferences'ı Kullanarak)
+        # ============================================================
+        
+        # Preferences'tan irrelevant kelimeleri temizle (uçuş, transfer vb.)
+        clean_preferences = self._clean_preferences(preferences)
+        
+        # ✅ FIX 4: Konsepti sorguya ekle ama city ile karıştırma
+        # Temizlenmiş preferences'ı sorgu olarak kullan (destination_city'yi ayrı parameter olarak geç)
+        search_parts = []
+        if concept:  # Konsept varsa ekle
+            search_parts.append(concept)
+        if clean_preferences:  # Tercihler varsa ekle
+            search_parts.extend(clean_preferences)
+        
+        search_query = ' '.join(search_parts) if search_parts else destination_city
+        logger.debug("[SEARCH QUERY] city=%r, concept=%r, query=%r", destination_city, concept, search_query)
+        
+        return (travel_params, destination_city, destination_iata, search_query)
+
+    def _collect_candidates(self, travel_params: dict, search_query: str, destination_city: str,
+                            pool_size: int) -> tuple:
+        """
+        Aday otel havuzu: vektör arama + şehir çeşitliliği (sayfalar bu sıradan kesilir).
+
+        Şehir belirtilmediyse havuz şehirler arası round-robin ile sıralanır; böylece
+        her sayfa (ilki dahil) farklı şehirlerden otel içerir.
+
+        Returns: (hotels_list, strict_message) - otel bulunamazsa ([], mesaj)
+        """
+        city_explicitly_specified = travel_params.get("city_explicitly_specified", False)
+        
+        # 💰 Bütçe modu: gecelik fiyatı bütçeye hiç sığamayacak oteller ANN sorgusunda elenir
+        max_price = self._max_nightly_price(travel_params)
+
+        # ============================================================
+        # 🔄 DYNAMIC CITY DIVERSITY LOOP (şehir belirtilmediğinde)
+        # ============================================================
+        if not city_explicitly_specified:
+            with trace_span("diversity_loop") as stage:
+                # Döngüsel algoritma: 3 farklı şehir bulana kadar ara
+                selected_cities = {}  # dict: şehirler bulunma (benzerlik) sırasıyla - deterministik sıra
+                all_hotels_pool = []
+                current_search_limit = pool_size  # İlk arama: tüm havuz tek ANN sorgusunda
+                max_search_limit = max(50, pool_size)  # Maksimum arama limiti
+            
+                logger.debug("[🔄 DYNAMIC SEARCH] Şehir belirtilmedi, 3 farklı şehir aranıyor")
+            
                 while len(selected_cities) < 3 and current_search_limit <= max_search_limit:
                     # Vektör DB'den daha fazla otel çek (TÜM ŞEHİRLERDEN - destination_city='bilinmiyor')
-                    hotels_batch = self._search_hotels_simple(search_query, 'bilinmiyor', current_search_limit)
-                    
+                    hotels_batch = self._search_hotels_simple(search_query, 'bilinmiyor', current_search_limit, max_price)
+                    stage.add("ann_rounds")
+                
                     if not hotels_batch:
-                        print(f"[⚠️ EXHAUSTED] Veritabanında daha fazla otel bulunamadı")
+                        logger.debug("[⚠️ EXHAUSTED] Veritabanında daha fazla otel bulunamadı")
                         break
-                    
+                
                     # Yeni otelleri pool'a ekle (duplicate kontrolü)
-                    existing_ids = {h.get('id') for h in all_hotels_pool}
+                    existing_ids = {h.id for h in all_hotels_pool}
                     for hotel in hotels_batch:
-                        if hotel.get('id') not in existing_ids:
+                        if hotel.id not in existing_ids:
                             all_hotels_pool.append(hotel)
-                            existing_ids.add(hotel.get('id'))
-                    
+                            existing_ids.add(hotel.id)
+                
                     # Pool'daki otelleri incele ve farklı şehirlerden seç
                     for hotel in all_hotels_pool:
-                        hotel_city = hotel.get('city', '')
+                        hotel_city = hotel.city
                         if hotel_city and hotel_city not in selected_cities:
-                            selected_cities.add(hotel_city)
-                            print(f"[✅ CITY FOUND] '{hotel_city}' şehri eklendi ({len(selected_cities)}/3)")
-                            
+                            selected_cities[hotel_city] = True
+                            hot_log.debug("[✅ CITY FOUND] %r şehri eklendi (%d/3)", hotel_city, len(selected_cities))
+                        
                             if len(selected_cities) >= 3:
                                 break
-                    
+                
                     # Eğer 3 şehir bulunamazsa, aramayı genişlet
                     if len(selected_cities) < 3:
                         current_search_limit += 10
-                        print(f"[🔄 EXPANDING] 3 şehir bulunamadı, arama genişletiliyor: {current_search_limit}")
+                        logger.debug("[🔄 EXPANDING] 3 şehir bulunamadı, arama genişletiliyor: %d", current_search_limit)
                     else:
                         break
-                
-                # Şimdi pool'dan her şehirden en iyi otelleri seç (round-robin)
-                hotels = []
-                selected_city_list = list(selected_cities)
-                city_hotel_map = {city: [] for city in selected_city_list}
-                
-                # Otelleri şehirlere göre grupla
+            
+                # Otelleri şehirlere göre grupla (şehirler bulunma sırasıyla; ilk 3'ü selected_cities)
+                city_hotel_map = {}
                 for hotel in all_hotels_pool:
-                    hotel_city = hotel.get('city', '')
-                    if hotel_city in city_hotel_map:
-                        city_hotel_map[hotel_city].append(hotel)
-                
-                # Round-robin: Her şehirden sırayla top_k kadar otel al
-                for i in range(top_k):
-                    for city in selected_city_list:
-                        if i < len(city_hotel_map[city]):
-                            hotels.append(city_hotel_map[city][i])
-                            if len(hotels) >= top_k:
-                                break
-                    if len(hotels) >= top_k:
-                        break
-                
-                print(f"[🌍 DIVERSITY SUCCESS] {len(selected_cities)} farklı şehirden {len(hotels)} otel seçildi")
-                
-            else:
-                # Kullanıcı şehir belirttiyse, normal arama yap
-                hotels = self._search_hotels_simple(search_query, destination_city, top_k)
-            
-            # ✅ FIX 4: KILL FALLBACK - No alternative cities, no jumping
-            if not hotels:
-                if city_explicitly_specified:
-                    strict_message = f"İstediğiniz bölgede ({destination_city}) kriterlerinize uygun konaklama bulunamadı. Lütfen farklı bir şehir veya kriter deneyin."
-                    print(f"[🔒 STRICT CITY LOCK] User explicitly requested {destination_city}, no hotels found - NO FALLBACK")
-                else:
-                    strict_message = f"Kriterlerinize uygun konaklama bulunamadı. Lütfen farklı bir kriter deneyin."
-                    print(f"[✅ NO FALLBACK] No hotels found")
-                return ([], strict_message)
+                    hotel_city = hotel.city
+                    if hotel_city:
+                        city_hotel_map.setdefault(hotel_city, []).append(hotel)
             
-            # ============================================================
-            # ADIM 3: PAKETLEME VE FİLTRELEME (NO ALTERNATIVE CITY LOGIC)
-            # ============================================================
-            packages = []
+                # Round-robin: Tüm havuzu şehirler arasında sırayla diz (sayfalar buradan kesilir)
+                hotels = []
+                longest = max((len(city_hotels) for city_hotels in city_hotel_map.values()), default=0)
+                for i in range(longest):
+                    for city_hotels in city_hotel_map.values():
+                        if i < len(city_hotels):
+                            hotels.append(city_hotels[i])
             
-            for idx, hotel in enumerate(hotels, 1):
-                
-                try:
-                    # Debug: Intent kontrolü
-                    print(f"[DEBUG] Processing hotel {idx}, intent={intent}")
-                    
-                    # 🎯 AKILLI HAVALİMANI SEÇİMİ: Otelin ilçesine göre doğru havalimanını belirle
-                    smart_destination_iata = self._get_smart_airport_code(hotel)
-                    
-                    # Uçuş filtrele
-                    flight = None
-                    flight_reason = ""
-                    flight_error = None
-                    if intent.get("flight"):
-                        # ✅ FIX 3: Zaman tercihini travel_params'tan al ve flight filtreye gönder
-                        # ✅ AKILLI BOŞLUK DOLDURMA: Belirtilmemişse varsayılan 'sabah'
-                        time_preference = travel_params.get("time_preference", None)
-                        time_was_default = False
-                        if not time_preference:
-                            time_preference = 'sabah'
-                            time_was_default = True
-                            print(f"[SMART DEFAULT] No time preference specified, defaulting to 'sabah'")
-                        
-                        # 🎯 KULLAN: smart_destination_iata (otelin ilçesine göre belirlenen havalimanı)
-                        flight, flight_reason = self._filter_flights(
-                            origin_iata=origin_iata,
-                            destination_iata=smart_destination_iata,  # 🎯 DİNAMİK IATA!
-                            travel_style=travel_style,
-                            time_preference=time_preference
+                logger.debug("[🌍 DIVERSITY SUCCESS] %d farklı şehirden %d otel seçildi", len(selected_cities), len(hotels))
+                stage.set(cities=len(city_hotel_map), candidates=len(hotels))
+            
+        else:
+            # Kullanıcı şehir belirttiyse, normal arama yap
+            hotels = self._search_hotels_simple(search_query, destination_city, pool_size, max_price)
+        
+        # 💰 Bütçe en ucuz otele bile yetmiyorsa (fiyat filtresi adayları boşalttı) şehir
+        # kilidi mesajı yerine bütçe mesajı: en ucuz paket toplamı ile
+        if not hotels and max_price is not None:
+            cheapest = self._cheapest_package_total(travel_params, destination_city if city_explicitly_specified else None)
+            if cheapest is not None and cheapest > travel_params["budget"]:
+                where = f"{destination_city} için " if city_explicitly_specified else ""
+                logger.debug("[💰 BUDGET TOO LOW] budget=%s cheapest=%s", travel_params["budget"], cheapest)
+                return ([], f"₺{travel_params['budget']:,.0f} bütçe bu arama için yetersiz: {where}en ucuz paket "
+                            f"yaklaşık ₺{cheapest:,.0f}. Lütfen bütçeyi artırın veya gece sayısını azaltın.")
+        
+        # ✅ FIX 4: KILL FALLBACK - No alternative cities, no jumping
+        if not hotels:
+            if city_explicitly_specified:
+                strict_message = f"İstediğiniz bölgede ({destination_city}) kriterlerinize uygun konaklama bulunamadı. Lütfen farklı bir şehir veya kriter deneyin."
+                logger.debug("[🔒 STRICT CITY LOCK] User explicitly requested %s, no hotels found - NO FALLBACK", destination_city)
+            else:
+                strict_message = f"Kriterlerinize uygun konaklama bulunamadı. Lütfen farklı bir kriter deneyin."
+                logger.debug("[✅ NO FALLBACK] No hotels found")
+            return ([], strict_message)
+        
+        return (hotels, None)
+
+    def _build_packages(self, hotels: list, travel_params: dict, destination_city: str,
+                        destination_iata: str) -> list:
+        """
+        Verilen oteller için uçuş/transfer filtreleme + fiyatlama (LLM özeti hariç).
+
+        Sonuç sadece travel_params ve otel listesine bağlıdır; bu yüzden
+        PackageCache'te saklanabilir.
+        """
+        intent = travel_params.get("intent", {})
+        origin_iata = travel_params.get("origin_iata", "IST")
+        travel_style = travel_params.get("travel_style", "aile")
+        preferences = travel_params.get("preferences", [])
+        budget = travel_params.get("budget")
+        nights = max(1, int(travel_params.get("nights") or 1))
+        # Tarihli mod: gidiş giriş gününden, dönüş (havalimanı -> kalkış) çıkış gününden
+        check_in = travel_params.get("check_in")
+        check_out = travel_params.get("check_out")
+        dated = bool(intent.get("flight") and check_in and check_out)
+
+        # ============================================================
+        # ADIM 3: PAKETLEME VE FİLTRELEME (TOPLU - NO ALTERNATIVE CITY LOGIC)
+        # Uçuş sonucu sadece hedef havalimanına, transfer sonucu havalimanı + otel
+        # konumuna bağlıdır. Önce tüm otellerin havalimanları çözülür, sonra her
+        # benzersiz anahtar için filtre BİR KEZ çalışır; sayfa büyüse de filtre sayısı
+        # benzersiz havalimanı / konum sayısıyla sınırlı kalır. Filtreler aday kümesi
+        # döndürür; her otelin (uçuş, transfer) çifti tüm kombinasyonlar puanlanarak
+        # seçilir (package_ranking). Paket sırası otel sırasıdır.
+        # ============================================================
+        # 🎯 AKILLI HAVALİMANI SEÇİMİ: Her otelin ilçesine göre doğru havalimanı
+        with trace_span("airport_resolution", hotels=len(hotels)):
+            smart_airports = [self._get_smart_airport_code(hotel) for hotel in hotels]
+        
+        # 💰 BÜTÇE ELEME: Alt sınırı (otel x gece + rota / havalimanı en ucuzları) bütçeyi
+        # aşan oteller için uçuş / transfer filtresi hiç çalışmaz
+        if budget:
+            with trace_span("budget_prune", hotels=len(hotels)) as stage:
+                feasible = [
+                    self._package_lower_bound(hotel, airport_code, origin_iata, intent, nights, dated) <= budget
+                    for hotel, airport_code in zip(hotels, smart_airports)
+                ]
+                hotels = [hotel for hotel, keep in zip(hotels, feasible) if keep]
+                smart_airports = [airport_code for airport_code, keep in zip(smart_airports, feasible) if keep]
+                stage.set(pruned=feasible.count(False))
+        
+        # ✅ FIX 3: Zaman tercihini travel_params'tan al ve flight filtreye gönder
+        # ✅ AKILLI BOŞLUK DOLDURMA: Belirtilmemişse varsayılan 'sabah'
+        time_preference = travel_params.get("time_preference", None)
+        time_was_default = False
+        if intent.get("flight") and not time_preference:
+            time_preference = 'sabah'
+            time_was_default = True
+            logger.debug("[SMART DEFAULT] No time preference specified, defaulting to 'sabah'")
+        
+        with trace_span("flight_filter", dated=dated) as stage:
+            flights_by_airport = {}
+            returns_by_airport = {} if dated else None
+            if intent.get("flight"):
+                for airport_code in dict.fromkeys(smart_airports):
+                    flights_by_airport[airport_code] = self._flight_options(
+                        origin_iata=origin_iata,
+                        destination_iata=airport_code,  # 🎯 DİNAMİK IATA!
+                        time_preference=time_preference,
+                        day=departure_day(check_in) if dated else None
+                    )
+                    if dated:
+                        returns_by_airport[airport_code] = self._flight_options(
+                            origin_iata=airport_code,
+                            destination_iata=origin_iata,
+                            day=departure_day(check_out)
                         )
-                        
-                        # 🌍 RELAXED REGIONAL MAPPING: Airport-City-District Validation
-                        # Artık katı string eşleşmesi yok, bölgesel mantık var
-                        if flight:
-                            flight_dest = flight.get("destination", "")
-                            hotel_city_name = self._normalize_city_name(hotel.get("city", ""))
-                            hotel_district = self._normalize_city_name(hotel.get("district", ""))
-                            
-                            # ✅ PRIORITY 1: Smart airport selection zaten doğru IATA'yı seçti
-                            # Eğer smart_destination_iata == flight_dest ise, otomatik geçerli
-                            if flight_dest == smart_destination_iata:
-                                print(f"[✅ SMART MATCH] Flight {flight_dest} matches smart airport selection - VALID")
-                            else:
-                                # ✅ PRIORITY 2: Regional Mapping - Şehir bazlı gevşek kontrol
-                                # Muğla şehri için DLM ve BJV kabul et
-                                # Aydın şehri için ADB ve BJV kabul et
-                                regional_mapping = {
-                                    "mugla": ["DLM", "BJV"],  # Muğla için Dalaman veya Bodrum
-                                    "aydin": ["ADB", "BJV"],  # Aydın için İzmir veya Bodrum
-                                    "izmir": ["ADB"],
-                                    "antalya": ["AYT"],
-                                    "bodrum": ["BJV"],
-                                    "gaziantep": ["GZT"]
-                                }
-                                
-                                valid_airports = regional_mapping.get(hotel_city_name, [])
-                                
-                                if flight_dest not in valid_airports:
-                                    print(f"[⚠️ REGIONAL CHECK] Flight {flight_dest} not in valid list for {hotel_city_name}: {valid_airports}")
-                                    # District bazlı son şans kontrolü
-                                    if hotel_district:
-                                        district_mapping = {
-                                            "fethiye": "DLM", "oludeniz": "DLM", "marmaris": "DLM", "datca": "DLM",
-                                            "bodrum": "BJV", "didim": "BJV",
-                                            "cesme": "ADB", "alacati": "ADB", "kusadasi": "ADB"
-                                        }
-                                        expected_from_district = district_mapping.get(hotel_district, None)
-                                        if expected_from_district and flight_dest == expected_from_district:
-                                            print(f"[✅ DISTRICT OVERRIDE] Flight {flight_dest} valid for district {hotel_district}")
-                                        else:
-                                            print(f"[❌ MISMATCH] Flight {flight_dest} invalid for {hotel_city_name}/{hotel_district} - SKIPPING")
-                                            flight = None
-                                            flight_error = f"Bölgesel uyumsuzluk: {flight_dest} havalimanı {hotel_city_name} için uygun değil"
-                                else:
-                                    print(f"[✅ REGIONAL MATCH] Flight {flight_dest} valid for {hotel_city_name}")
-                        
-                        # Flight-Hotel şehir uyuşmazlığı kontrolü
-                        if not flight and destination_iata != "IST":  # IST dışı destinasyonlar kritik
-                            if not flight_error:
-                                flight_error = f"Şehir uyuşmazlığı: {destination_city} için uygun uçuş bulunamadı"
-                    
-                    # Transfer filtrele
-                    transfer = None
-                    transfer_reason = ""
-                    if intent.get("transfer"):
-                        # 🎯 KULLAN: smart_destination_iata (havalimanı-transfer tutarlılığı)
-                        transfer, transfer_reason = self._filter_transfers(
-                            airport_code=smart_destination_iata,  # 🎯 DİNAMİK IATA!
-                            hotel=hotel,
-                            travel_style=travel_style
+            stage.set(lookups=len(flights_by_airport), flights_scanned=sum(
+                len(flights) for flights in flights_by_airport.values()
+            ) + sum(len(flights) for flights in (returns_by_airport or {}).values()))
+        
+        with trace_span("transfer_filter") as stage:
+            transfers_by_location = {}
+            if intent.get("transfer"):
+                for hotel, airport_code in zip(hotels, smart_airports):
+                    location_key = self._transfer_location_key(airport_code, hotel)
+                    if location_key not in transfers_by_location:
+                        # 🎯 KULLAN: smart airport (havalimanı-transfer tutarlılığı)
+                        transfers_by_location[location_key] = self._transfer_options(
+                            airport_code=airport_code,
+                            hotel=hotel
                         )
+            stage.set(lookups=len(transfers_by_location), transfers_scanned=sum(
+                self.transfer_table.count(location_key[0]) for location_key in transfers_by_location
+            ))
+        
+        selections = self._rank_packages(hotels, smart_airports, flights_by_airport, transfers_by_location,
+                                         travel_style, nights, budget, returns_by_airport)
+        
+        packages = []
+        
+        for idx, (hotel, smart_destination_iata) in enumerate(zip(hotels, smart_airports), 1):
+            
+            try:
+                # Uçuş + transfer (sıralama sonucundan; bütçeye sığan kombinasyon yoksa otel atlanır)
+                if selections[idx - 1] is None:
+                    continue
+                flight, return_flight, transfer, score = selections[idx - 1]
+                flight_error = None
+                if intent.get("flight"):
                     
-                    # Paketi oluştur
-                    package = {
-                        "hotel": {
-                            "id": hotel.get("id"),
-                            "name": hotel.get("name"),
-                            "city": hotel.get("city"),
-                            "concept": hotel.get("concept"),
-                            "price": hotel.get("price"),
-                            "description": hotel.get("description"),
-                            "amenities": hotel.get("amenities", [])
-                        },
-                        "flight": flight,
-                        "transfer": transfer,
-                        "metadata": {
-                            "travel_style": travel_style,
-                            "preferences": preferences,
-                            "destination_iata": smart_destination_iata,  # 🎯 DİNAMİK IATA
-                            "original_destination_iata": destination_iata,  # Orijinal kullanıcı tercihi
-                            "origin_iata": origin_iata,
-                            "time_was_default": time_was_default if intent.get("flight") else False  # ✅ FIX 3
-                        },
-                        "error": flight_error  # ⚠️ Şehir uyuşmazlığı uyarısı
-                    }
-                    
-                    # ============================================================
-                    # TOPLAM FİYAT HESAPLAMASI (TİP GÜVENLI)
-                    # ============================================================
-                    try:
-                        # Hotel fiyatı
-                        hotel_price = hotel.get("price", 0)
-                        if hotel_price is not None:
-                            hotel_price = float(hotel_price)
-                        else:
-                            hotel_price = 0
+                    # 🌍 RELAXED REGIONAL MAPPING: Airport-City-District Validation
+                    # Artık katı string eşleşmesi yok, bölgesel mantık var
+                    if flight:
+                        flight_dest = flight.destination
                         
-                        # Flight fiyatı - flight bir dict mi liste mi kontrol et
-                        flight_price = 0
-                        if flight is not None:
-                            # Eğer flight bir liste ise [0]'ı kullan, değilse doğrudan kullan
-                            if isinstance(flight, list) and len(flight) > 0:
-                                flight_obj = flight[0]
-                            elif isinstance(flight, dict):
-                                flight_obj = flight
-                            else:
-                                flight_obj = None
+                        # ✅ PRIORITY 1: Smart airport selection zaten doğru IATA'yı seçti
+                        # Eğer smart_destination_iata == flight_dest ise, otomatik geçerli
+                        if flight_dest == smart_destination_iata:
+                            hot_log.debug("[✅ SMART MATCH] Flight %s matches smart airport selection - VALID", flight_dest)
+                        else:
+                            # ✅ PRIORITY 2: Regional Mapping - coğrafya tablosundaki kabul edilen
+                            # havalimanları (örn. Muğla için DLM/BJV, Aydın için ADB/BJV)
+                            valid_airports = self.geography.accepted_airports(
+                                hotel.city, hotel.district, hotel.area
+                            )
                             
-                            if flight_obj:
-                                price_value = flight_obj.get("price", 0)
-                                if price_value is not None:
-                                    flight_price = float(price_value)
-                                else:
-                                    flight_price = 0
-                        
-                        # Transfer fiyatı - transfer bir dict mi liste mi kontrol et
-                        transfer_price = 0
-                        if transfer is not None:
-                            # Eğer transfer bir liste ise [0]'ı kullan, değilse doğrudan kullan
-                            if isinstance(transfer, list) and len(transfer) > 0:
-                                transfer_obj = transfer[0]
-                            elif isinstance(transfer, dict):
-                                transfer_obj = transfer
+                            if flight_dest not in valid_airports:
+                                hot_log.debug("[❌ MISMATCH] Flight %s invalid for %s/%s: %s - SKIPPING", flight_dest, hotel.city, hotel.district, valid_airports)
+                                flight = None
+                                flight_error = f"Bölgesel uyumsuzluk: {flight_dest} havalimanı {hotel.city} için uygun değil"
                             else:
-                                transfer_obj = None
-                            
-                            if transfer_obj:
-                                price_value = transfer_obj.get("price", 0)
-                                if price_value is not None:
-                                    transfer_price = float(price_value)
-                                else:
-                                    transfer_price = 0
-                        
-                        total_price = hotel_price + flight_price + transfer_price
-                        
-                        package["price_breakdown"] = {
-                            "hotel": hotel_price,
-                            "flight": flight_price,
-                            "transfer": transfer_price,
-                            "total": total_price
-                        }
-                    
-                    except Exception as pricing_error:
-                        print(f"[PRICING ERROR] {pricing_error}")
-                        package["price_breakdown"] = {
-                            "hotel": 0,
-                            "flight": 0,
-                            "transfer": 0,
-                            "total": 0
-                        }
+                                hot_log.debug("[✅ REGIONAL MATCH] Flight %s valid for %s", flight_dest, hotel.city)
                     
-                    # ✅ FIX 1: Paket hazır, özet şimdilik boş (batch processing için)
-                    package["intelligent_summary"] = ""  # Batch'te doldurulacak
-                    packages.append(package)
+                    # Flight-Hotel şehir uyuşmazlığı kontrolü
+                    if not flight and dated and not flight_error:
+                        flight_error = f"{check_in} tarihinde {origin_iata} - {smart_destination_iata} uçuşu bulunamadı"
+                    if not flight and destination_iata != "IST":  # IST dışı destinasyonlar kritik
+                        if not flight_error:
+                            flight_error = f"Şehir uyuşmazlığı: {destination_city} için uygun uçuş bulunamadı"
+                    if flight and dated and return_flight is None:
+                        flight_error = f"{check_out} tarihinde {smart_destination_iata} - {origin_iata} dönüş uçuşu bulunamadı"
                 
-                except Exception as package_error:
-                    # Bu oteli atla, sonraki otele geç
-                    continue
-            
-            # ============================================================
-            # ✅ FIX 1: API VERİMLİLİĞİ - BATCH PROCESSING
-            # Her paket için ayrı ayrı LLM isteği yerine, tüm paketlerin
-            # 'Reasoning' metinlerini tek bir LLM çağrısıyla oluştur.
-            # Bu, 429 Too Many Requests hatasını %90 oranında kesecektir.
-            # ============================================================
-            if packages:
-                print(f"[BATCH PROCESSING] Generating reasoning for {len(packages)} packages in single LLM call...")
-                batch_summaries = self._generate_batch_summaries(
-                    packages=packages,
-                    user_query=user_query,
-                    travel_params=travel_params
+                # Paketi oluştur (fiyat dökümü kayıtların float fiyatlarından hesaplanır)
+                package = Package(
+                    hotel=hotel,
+                    flight=flight,
+                    return_flight=return_flight if flight else None,
+                    transfer=transfer,
+                    metadata={
+                        "travel_style": travel_style,
+                        "preferences": preferences,
+                        "destination_iata": smart_destination_iata,  # 🎯 DİNAMİK IATA
+                        "original_destination_iata": destination_iata,  # Orijinal kullanıcı tercihi
+                        "origin_iata": origin_iata,
+                        "time_was_default": time_was_default if intent.get("flight") else False,  # ✅ FIX 3
+                        "ranking_score": round(score, 4),  # Düşük = daha iyi (package_ranking)
+                        "budget": budget,
+                        "nights": nights,
+                        "check_in": check_in,
+                        "check_out": check_out
+                    },
+                    error=flight_error,  # ⚠️ Şehir uyuşmazlığı uyarısı
+                    nights=nights
                 )
                 
-                # Batch summaries'i paketlere ata
-                for idx, package in enumerate(packages):
-                    if idx < len(batch_summaries):
-                        package["intelligent_summary"] = batch_summaries[idx]
-                    else:
-                        # Fallback
-                        package["intelligent_summary"] = f"{package['hotel']['name']}, tercihlerinize uyumlu bir paket sunar."
-            
-            return (packages, None)
+                with trace_span("pricing"):
+                    # ============================================================
+                    # TOPLAM FİYAT HESAPLAMASI (özet şimdilik boş, batch'te doldurulacak)
+                    # ============================================================
+                    packages.append(package.to_dict())
             
-        except Exception as e:
-            error_msg = f"Seyahat Planlama Hatası: {str(e)}\n{traceback.format_exc()}"
-            print(f"[ERROR] {error_msg}")
-            return ([], error_msg)
+            except Exception as package_error:
+                # Bu oteli atla, sonraki otele geç
+                continue
+
+        return packages
+
+
+    def _max_nightly_price(self, travel_params: dict):
+        """
+        Bütçe modunda bir otelin gecelik fiyat üst sınırı; bütçe yoksa None.
+
+        Kalkış havalimanından en ucuz uçuş ve en ucuz transfer (tüm havalimanları)
+        bütçeden düşülür: bundan pahalı bir otel hiçbir kombinasyonla bütçeye sığmaz.
+        """
+        budget = travel_params.get("budget")
+        if not budget:
+            return None
+        return (budget - self._fixed_cost_floor(travel_params)) / max(1, int(travel_params.get("nights") or 1))
+
+    def _fixed_cost_floor(self, travel_params: dict) -> float:
+        """Kalkış havalimanından en ucuz uçuş + en ucuz transfer (niyete göre; tüm havalimanları)."""
+        intent = travel_params.get("intent", {})
+        origin_iata = travel_params.get("origin_iata", "IST")
+        floor = 0.0
+        if intent.get("flight"):
+            floor += min((price for (origin, _destination), price in self.flight_table.min_prices.items()
+                          if origin == origin_iata), default=0.0)
+        if intent.get("transfer"):
+            floor += min(self.transfer_table.min_prices.values(), default=0.0)
+        return floor
+
+    def _cheapest_package_total(self, travel_params: dict, city: str = None):
+        """
+        En ucuz paketin alt sınırı: şehrin (city yoksa tüm şehirlerin) en ucuz oteli x gece
+        + _fixed_cost_floor. Şehirde otel yoksa None.
+        """
+        if self._hotel_price_floor is None:
+            # Koleksiyon metadata'sı bir kez taranır (sadece bütçe yetersiz olduğunda gerekir)
+            floors, offset = {}, 0
+            while True:
+                page = self.collection.get(include=['metadatas'], limit=5000, offset=offset)
+                if not page['ids']:
+                    break
+                for metadata in page['metadatas']:
+                    key = self._normalize_city_name((metadata or {}).get('city', ''))
+                    price = float((metadata or {}).get('price') or 0)
+                    for group in (key, None):
+                        floors[group] = min(price, floors.get(group, price))
+                offset += len(page['ids'])
+            self._hotel_price_floor = floors
+        hotel_price = self._hotel_price_floor.get(self._normalize_city_name(city) if city else None)
+        if hotel_price is None:
+            return None
+        nights = max(1, int(travel_params.get("nights") or 1))
+        return hotel_price * nights + self._fixed_cost_floor(travel_params)
+
+    def _package_lower_bound(self, hotel: Hotel, airport_code: str, origin_iata: str, intent: dict,
+                             nights: int, dated: bool = False) -> float:
+        """
+        Paket toplamının alt sınırı: otel x gece + rotanın en ucuz uçuşu (tarihli modda
+        + dönüş rotasının en ucuzu) + havalimanının en ucuz transferi.
+        """
+        bound = hotel.price * nights
+        if intent.get("flight"):
+            bound += self.flight_table.min_price((origin_iata, airport_code)) or 0.0
+            if dated:
+                bound += self.flight_table.min_price((airport_code, origin_iata)) or 0.0
+        if intent.get("transfer"):
+            bound += self.transfer_table.min_price(airport_code) or 0.0
+        return bound
+
+    def _rank_packages(self, hotels: list, smart_airports: list, flights_by_airport: dict,
+                       transfers_by_location: dict, travel_style: str, nights: int = 1,
+                       budget: float = None, returns_by_airport: dict = None) -> list:
+        """
+        Her otel için en iyi (uçuş, transfer) çiftini tüm kombinasyonları puanlayarak seç.
+
+        Aynı havalimanı + konumdaki oteller aynı aday kümelerini paylaşır; skor dizisi
+        (otel x uçuş x transfer) her grup için tek NumPy işlemiyle hesaplanır
+        (baskın olunan adaylar önceden elenir).
+
+        Otel fiyatı gecelik x gece olarak toplama girer; budget verilirse toplamı bütçeyi
+        aşan kombinasyonlar seçilmez. returns_by_airport verilirse (tarihli mod) uçuş
+        bileşeni gidiş x dönüş çiftleridir: fiyat ve ceza iki bacağın toplamıdır.
+
+        Returns: otel sırasıyla (Flight | None, dönüş Flight | None, Transfer | None, skor)
+        listesi; bütçeye sığan kombinasyonu olmayan otel için None
+        """
+        weights = resolve_weights(travel_style, self.ranking_weights)
+        empty_flights = (self.flight_table.records[:0], None, [], [])
+        empty_transfers = (self.transfer_table.records[:0], np.zeros(0, dtype=np.int8), [], [])
+        
+        groups = {}
+        for position, (hotel, airport_code) in enumerate(zip(hotels, smart_airports)):
+            location_key = self._transfer_location_key(airport_code, hotel)
+            groups.setdefault(location_key, []).append(position)
+        
+        selections = [None] * len(hotels)
+        with trace_span("ranking", groups=len(groups)) as stage:
+            # Baskın olunan adaylar bileşen başına bir kez elenir (uçuşlar havalimanı, transferler konum başına)
+            flight_fronts = {}
+            for airport_code, flights in flights_by_airport.items():
+                prices, penalties = flights["price"], flight_penalty(flights, weights)
+                front = pareto_front(prices, penalties)
+                flights, prices, penalties = flights[front], prices[front], penalties[front]
+                returns = (returns_by_airport or {}).get(airport_code)
+                if returns is None or not len(returns) or not len(flights):
+                    # Dönüş bacağı yok: sadece gidiş puanlanır (eksik dönüş paket hatasında bildirilir)
+                    flight_fronts[airport_code] = (flights, None, prices, penalties)
+                    continue
+                return_prices, return_penalties = returns["price"], flight_penalty(returns, weights)
+                front = pareto_front(return_prices, return_penalties)
+                returns, return_prices, return_penalties = returns[front], return_prices[front], return_penalties[front]
+                # Gidiş x dönüş çiftleri tek uçuş bileşeni: iki bacağın cephelerinin çarpımı da elenir
+                outbound_idx, return_idx = np.divmod(np.arange(len(flights) * len(returns)), len(returns))
+                prices = prices[outbound_idx] + return_prices[return_idx]
+                penalties = penalties[outbound_idx] + return_penalties[return_idx]
+                front = pareto_front(prices, penalties)
+                flight_fronts[airport_code] = (
+                    flights[outbound_idx[front]], returns[return_idx[front]], prices[front], penalties[front]
+                )
+            transfer_fronts = {}
+            for location_key, (transfers, match_tiers) in transfers_by_location.items():
+                prices, penalties = transfers["price"], transfer_penalty(transfers, match_tiers, weights)
+                front = pareto_front(prices, penalties)
+                transfer_fronts[location_key] = (transfers[front], match_tiers[front], prices[front], penalties[front])
+            
+            for location_key, positions in groups.items():
+                flights, returns, flight_prices, flight_penalties = flight_fronts.get(location_key[0], empty_flights)
+                transfers, match_tiers, transfer_prices, transfer_penalties = transfer_fronts.get(
+                    location_key, empty_transfers
+                )
+                flight_idx, transfer_idx, scores, combinations = rank_combinations(
+                    [hotels[position].price * nights for position in positions],
+                    flight_prices, flight_penalties, transfer_prices, transfer_penalties, weights, budget,
+                )
+                stage.add("combinations", combinations)
+                
+                # Sadece seçilen satırlar kayda çevrilir (grup içinde aynı satır bir kez)
+                records = {}
+                for position, fi, ti, score in zip(positions, flight_idx, transfer_idx, scores):
+                    if not np.isfinite(score):
+                        stage.add("over_budget")
+                        continue
+                    if (fi, ti) not in records:
+                        records[(fi, ti)] = (
+                            Flight.from_row(flights[fi]) if fi >= 0 else None,
+                            Flight.from_row(returns[fi]) if fi >= 0 and returns is not None else None,
+                            Transfer.from_row(transfers[ti]) if ti >= 0 else None,
+                        )
+                    flight, return_flight, transfer = records[(fi, ti)]
+                    selections[position] = (flight, return_flight, transfer, float(score))
+                    
+                    if hot_log.enabled():
+                        hot_log.debug("[🏆 RANKING] %s | style=%s | flight=%s | transfer=%s | score=%.3f",
+                                      hotels[position].name, travel_style,
+                                      f"{flight.carrier} {flight.cabin} ₺{flight.price:,.0f}" if flight else None,
+                                      f"{transfer.category} {MATCH_TIERS[match_tiers[ti]]} {transfer.duration}dk ₺{transfer.price:,.0f}" if transfer else None,
+                                      score)
+        
+        return selections
 
     def _normalize_city_name(self, city: str) -> str:
         """
@@ -883,67 +1281,32 @@ class TravelPlanner:
         normalized = city.replace('İ', 'i').replace('I', 'ı')
         return normalized.lower().strip()
 
-    def _get_smart_airport_code(self, hotel: dict) -> str:
+    def _get_smart_airport_code(self, hotel: Hotel) -> str:
         """
         🎯 AKILLI HAVALİMANI SEÇİMİ (Dynamic IATA Mapping)
         
-        Otelin ilçe/bölgesine göre en uygun havalimanını belirler:
+        Otelin ilçe/bölgesine göre en uygun havalimanını coğrafya tablosundan belirler:
         - Fethiye, Ölüdeniz, Göcek, Marmaris, Datça -> DLM (Dalaman)
         - Bodrum, Didim, Güllük -> BJV (Bodrum)
         - Çeşme, Alaçatı, Urla, Kuşadası -> ADB (İzmir)
         - Belek, Alanya, Kemer, Side -> AYT (Antalya)
         
         Args:
-            hotel: Otel metadata dict (city, district, area içerir)
+            hotel: Otel kaydı (city, district, area içerir)
             
         Returns:
             IATA kodu (str): DLM, BJV, ADB, AYT
         """
-        # Hotel location bilgilerini al ve normalize et
-        city = self._normalize_city_name(hotel.get("city", ""))
-        district = self._normalize_city_name(hotel.get("district", ""))
-        area = self._normalize_city_name(hotel.get("area", ""))
-        
-        # Tüm location bilgilerini birleştir (hiyerarşik kontrol için)
-        location_text = f"{city} {district} {area}".lower()
-        
-        # 🎯 KURAL 1: Dalaman Havalimanı (DLM) - Muğla'nın batı bölgeleri
-        dlm_regions = ['fethiye', 'oludeniz', 'ölüdeniz', 'gocek', 'göcek', 'marmaris', 'datca', 'datça', 'dalaman', 'mugla', 'muğla']
-        if any(region in location_text for region in dlm_regions):
-            print(f"[🎯 SMART AIRPORT] Hotel in {district or area} -> DLM (Dalaman)")
-            return "DLM"
-        
-        # 🎯 KURAL 2: Bodrum Havalimanı (BJV) - Muğla'nın kuzey bölgeleri
-        bjv_regions = ['bodrum', 'didim', 'gulluk', 'güllük', 'milas', 'turgutreis']
-        if any(region in location_text for region in bjv_regions):
-            print(f"[🎯 SMART AIRPORT] Hotel in {district or area} -> BJV (Bodrum)")
-            return "BJV"
-        
-        # 🎯 KURAL 3: İzmir Havalimanı (ADB) - İzmir ve çevresi
-        adb_regions = ['izmir', 'cesme', 'çeşme', 'alacati', 'alaçatı', 'urla', 'kusadasi', 'kuşadası', 'foca', 'foça', 'seferihisar']
-        if any(region in location_text for region in adb_regions):
-            print(f"[🎯 SMART AIRPORT] Hotel in {district or area} -> ADB (İzmir)")
-            return "ADB"
-        
-        # 🎯 KURAL 4: Antalya Havalimanı (AYT) - Antalya ve çevresi
-        ayt_regions = ['antalya', 'belek', 'alanya', 'kemer', 'side', 'manavgat', 'lara', 'kundu', 'serik']
-        if any(region in location_text for region in ayt_regions):
-            print(f"[🎯 SMART AIRPORT] Hotel in {district or area} -> AYT (Antalya)")
-            return "AYT"
-        
-        # 🎯 FALLBACK: Şehir bazlı varsayılan mapping
-        city_to_airport = {
-            "mugla": "DLM",  # Muğla varsayılan Dalaman
-            "muğla": "DLM",
-            "izmir": "ADB",
-            "antalya": "AYT",
-            "bodrum": "BJV",
-            "gaziantep": "GZT"
-        }
+        # Area > District > City hiyerarşisiyle tek sözlük erişimi (data/geography.json)
+        place = self.geography.resolve(hotel.city, hotel.district, hotel.area)
         
-        default_airport = city_to_airport.get(city, "ADB")  # Ultimate fallback: ADB
-        print(f"[🎯 SMART AIRPORT FALLBACK] Hotel in {city} -> {default_airport} (city-based default)")
-        return default_airport
+        if place:
+            hot_log.debug("[🎯 SMART AIRPORT] Hotel in %s (%s) -> %s", place.name, place.level, place.airports[0])
+            return place.airports[0]
+        
+        # 🎯 FALLBACK: Tabloda olmayan konum
+        hot_log.debug("[🎯 SMART AIRPORT FALLBACK] Hotel in %s -> %s", hotel.city, self.geography.default_airport)
+        return self.geography.default_airport
 
     def _clean_preferences(self, preferences: list) -> list:
         """
@@ -996,14 +1359,14 @@ class TravelPlanner:
         # Otelleri şehirlere göre grupla
         cities_to_hotels = {}
         for hotel in hotels:
-            city = hotel.get("city", "bilinmiyor")
+            city = hotel.city or "bilinmiyor"
             if city not in cities_to_hotels:
                 cities_to_hotels[city] = []
             cities_to_hotels[city].append(hotel)
         
         # Şehir sayısı
         num_cities = len(cities_to_hotels)
-        print(f"[🌍 DIVERSITY CHECK] Toplam {len(hotels)} otel, {num_cities} farklı şehir")
+        logger.debug("[🌍 DIVERSITY CHECK] Toplam %d otel, %d farklı şehir", len(hotels), num_cities)
         
         # Eğer zaten çeşitlilik varsa (farklı şehirler varsa), round-robin uygula
         if num_cities >= 2:
@@ -1021,15 +1384,24 @@ class TravelPlanner:
                 if len(diverse_hotels) >= top_k:
                     break
             
-            print(f"[🌍 DIVERSITY APPLIED] Round-robin: {[h['city'] for h in diverse_hotels[:top_k]]}")
+            logger.debug("[🌍 DIVERSITY APPLIED] Round-robin: %d otel", min(len(diverse_hotels), top_k))
             return diverse_hotels[:top_k]
         else:
             # Tek şehir dominant (örn. hepsi İzmir)
             single_city = list(cities_to_hotels.keys())[0]
-            print(f"[⚠️ SINGLE CITY DOMINANCE] Tüm sonuçlar '{single_city}' şehrinden")
+            logger.debug("[⚠️ SINGLE CITY DOMINANCE] Tüm sonuçlar %r şehrinden", single_city)
             return hotels[:top_k]
     
-    def _search_hotels_simple(self, search_query: str, destination_city: str, top_k: int = 3) -> list:
+    def _query_embeddings(self, search_queries: list) -> list:
+        """Önbellekli sorgu embedding'leri; eksikler tek encode çağrısında, isabetler trace'e yazılır."""
+        with trace_span("embedding", queries=len(search_queries)) as stage:
+            vectors, hits = self._embedding_cache.get_many(search_queries, self.embedder.create_embeddings)
+            stage.add("cache_hits", hits)
+        return vectors
+
+
+    def _search_hotels_simple(self, search_query: str, destination_city: str, top_k: int = 3,
+                              max_price: float = None) -> list:
         """
         SIMPLIFIED Hotel Search with FLEXIBLE city filtering
         
@@ -1037,181 +1409,260 @@ class TravelPlanner:
         1. If destination_city is empty or 'bilinmiyor', search ALL cities
         2. If destination_city is specified, filter by city
         3. Trust vector DB results
+        4. If max_price is given, the vector DB only returns hotels at or below it
         
-        Returns: hotels_list (simple list, no fallback info)
+        Returns: hotels_list (Hotel kayıtları, no fallback info)
+        """
+        return self.search_hotels_batch([HotelSearch(search_query, destination_city, top_k, max_price)])[0]
+
+    def search_hotels_batch(self, searches: list) -> list:
+        """
+        Birden fazla otel aramasını toplu çalıştır (tercih varyantları, şehir başına
+        dağıtım, eşzamanlı oturumların sorguları).
+
+        Tüm sorgular tek encode çağrısında vektöre çevrilir. Aynı fiyat filtresini (ve
+        şehir parçaları açıksa aynı parçayı) paylaşan aramalar tek collection.query
+        çağrısında (query_embeddings listesi) sorgulanır; sonuçlar çağıran başına
+        ayrılır, şehir filtresi ve top_k her arama için ayrı uygulanır.
+
+        Args:
+            searches: HotelSearch (veya (sorgu, şehir, top_k, max_price) tuple) listesi
+
+        Returns: her arama için Hotel listesi (aynı sırada; hata olursa o grup için boş liste)
         """
+        searches = [HotelSearch(*search) for search in searches]
+        results = [[] for _ in searches]
+        if not searches:
+            return results
         try:
-            # Normalize city name
-            normalized_city = self._normalize_city_name(destination_city)
-            city_filter_active = normalized_city and normalized_city != 'bilinmiyor'
-            
-            # Vector search
-            query_vector = self.embedder.create_embeddings([search_query])[0].tolist()
-            
-            query_params = {
-                'query_embeddings': [query_vector],
-                'n_results': top_k,
-                'include': ['documents', 'metadatas']
-            }
-            
-            if city_filter_active:
-                print(f"[SIMPLE SEARCH] Searching in city='{normalized_city}'")
-            else:
-                print(f"[SIMPLE SEARCH] Searching in ALL cities (no city filter)")
-            
-            all_results = self.collection.query(**query_params)
-            
-            # Debug: Print what cities we got
-            if all_results and 'metadatas' in all_results and all_results['metadatas']:
-                found_cities = [meta.get('city', 'N/A') for meta in all_results['metadatas'][0][:5]]
-                print(f"[DEBUG] Sample cities from DB: {found_cities}")
-            
-            # Build hotel list
-            matched_hotels = []
-            for i in range(len(all_results['ids'][0])):
-                # Get city and normalize it
-                db_city = all_results['metadatas'][0][i].get('city', '')
-                db_city_normalized = self._normalize_city_name(db_city)
-                
-                # Apply city filter only if active
-                if city_filter_active and db_city_normalized != normalized_city:
-                    continue
-                
-                amenities_data = all_results['metadatas'][0][i].get('amenities', '[]')
-                try:
-                    amenities_list = json.loads(amenities_data) if isinstance(amenities_data, str) else amenities_data
-                except:
-                    amenities_list = []
-                
-                price_value = all_results['metadatas'][0][i].get('price', 0.0)
-                price = float(price_value) if price_value else 0.0
-                
-                # ✅ CRITICAL: Include district and area for transfer matching
-                matched_hotels.append({
-                    "id": all_results['ids'][0][i],
-                    "name": all_results['metadatas'][0][i].get('name', 'Unknown'),
-                    "city": all_results['metadatas'][0][i].get('city', ''),
-                    "district": all_results['metadatas'][0][i].get('district', ''),  # ✅ NEW
-                    "area": all_results['metadatas'][0][i].get('area', ''),  # ✅ NEW
-                    "concept": all_results['metadatas'][0][i].get('concept', ''),
-                    "price": price,
-                    "description": all_results['documents'][0][i],
-                    "amenities": amenities_list
-                })
-                
-                # Stop when we have enough hotels
-                if len(matched_hotels) >= top_k:
-                    break
-            
-            if matched_hotels:
-                print(f"[SIMPLE SEARCH] Found {len(matched_hotels)} hotels")
+            vectors = [list(vector) for vector in self._query_embeddings([search.query for search in searches])]
+        except Exception as e:
+            logger.error("[ERROR] Hotel search error: %s", e, exc_info=True)
+            return results
+
+        # Gruplama: tek ANN çağrısı aynı where filtresini ve aynı hedefi (parça) gerektirir
+        groups = {}
+        for index, search in enumerate(searches):
+            normalized_city = self._normalize_city_name(search.city)
+            city = normalized_city if normalized_city and normalized_city != 'bilinmiyor' else None
+            route = city if self.shard_router is not None else None
+            if city:
+                hot_log.debug("[SIMPLE SEARCH] Searching in city=%r", city)
             else:
-                print(f"[SIMPLE SEARCH] No hotels found in {normalized_city}")
-            
-            return matched_hotels
+                hot_log.debug("[SIMPLE SEARCH] Searching in ALL cities (no city filter)")
+            groups.setdefault((search.max_price, route), []).append((index, city))
+
+        if self.hotel_vectors is not None:
+            store = self.hotel_vectors.precision
+        else:
+            store = f"shards:{self.shard_router.mode}" if self.shard_router is not None else "chroma"
+        for (max_price, route), members in groups.items():
+            # Gruptaki en büyük top_k istenir; her arama kendi top_k'sı kadarını alır
+            top_k = max(searches[index].top_k for index, _ in members)
+            city_filter = any(city for _, city in members)
+            try:
+                with trace_span("ann_query", n_results=top_k, city_filter=city_filter, store=store,
+                                adaptive=self.adaptive_retrieval, queries=len(members)) as stage:
+                    if self.adaptive_retrieval:
+                        # Büyüme sorgu başınadır: her arama kendi eşik / filtre durumuyla ilerler
+                        group_results = [
+                            self._adaptive_ann_query(vectors[index], searches[index].top_k, max_price, city, stage)
+                            for index, city in members
+                        ]
+                    else:
+                        batch = self._ann_query([vectors[index] for index, _ in members], top_k, max_price, route,
+                                                ['documents', 'metadatas'], stage)
+                        # Satırlar çağıran başına ayrılır (Chroma sonucundaki 'included' vb. alınmaz)
+                        fields = [field for field in ('ids', 'documents', 'metadatas', 'distances')
+                                  if batch.get(field) is not None]
+                        group_results = [{field: [batch[field][row]] for field in fields}
+                                         for row in range(len(members))]
+                    stage.add("candidates_scanned", sum(len(result['ids'][0]) for result in group_results))
+            except Exception as e:
+                logger.error("[ERROR] Hotel search error: %s", e, exc_info=True)
+                continue
+            for (index, city), result in zip(members, group_results):
+                results[index] = self._hotels_from_results(result, city, searches[index].top_k)
+        return results
+
+    def _hotels_from_results(self, all_results: dict, city: str, top_k: int) -> list:
+        """Tek sorgunun ANN sonucundan Hotel listesi (şehir filtresi + top_k)."""
+        # Debug: DB'den gelen şehirler (sadece örneklenen isteklerde hesaplanır)
+        if hot_log.enabled() and all_results and 'metadatas' in all_results and all_results['metadatas']:
+            found_cities = [meta.get('city', 'N/A') for meta in all_results['metadatas'][0][:5]]
+            hot_log.debug("[DEBUG] Sample cities from DB: %s", found_cities)
         
-        except Exception as e:
-            print(f"[ERROR] Hotel search error: {e}")
-            return []
+        # Build hotel list
+        matched_hotels = []
+        for i in range(len(all_results['ids'][0])):
+            # Get city and normalize it
+            db_city = all_results['metadatas'][0][i].get('city', '')
+            db_city_normalized = self._normalize_city_name(db_city)
+            
+            # Apply city filter only if active
+            if city and db_city_normalized != city:
+                continue
+            
+            # ✅ CRITICAL: district ve area transfer eşleştirmesi için kayıtta tutulur
+            matched_hotels.append(Hotel.from_metadata(
+                all_results['ids'][0][i], all_results['metadatas'][0][i], all_results['documents'][0][i],
+                score=_similarity(all_results['distances'][0][i]),
+            ))
+            
+            # Stop when we have enough hotels
+            if len(matched_hotels) >= top_k:
+                break
+        
+        if matched_hotels:
+            hot_log.debug("[SIMPLE SEARCH] Found %d hotels", len(matched_hotels))
+        else:
+            hot_log.debug("[SIMPLE SEARCH] No hotels found in %s", city or "ALL cities")
+        
+        return matched_hotels
+
+    def _ann_query(self, query_vectors: list, n_results: int, max_price: float, city: str, include: list,
+                   stage) -> dict:
+        """
+        Tek ANN çağrısı (kompakt depo / şehir parçaları / ana koleksiyon), sorgu başına bir
+        sonuç satırı; sonuç her zaman collection.query biçiminde ve distances (kosinüs mesafesi) içerir.
+        """
+        include = include + ['distances']
+        if self.hotel_vectors is not None:
+            results, rescored = self._query_hotel_vectors(query_vectors, n_results, max_price, include)
+            stage.add("rescored", rescored)
+            return results
+        query_params = {
+            'query_embeddings': query_vectors,
+            'n_results': n_results,
+            'include': include
+        }
+        if max_price is not None:
+            query_params['where'] = {'price': {'$lte': max_price}}
+        if self.shard_router is not None:
+            # Şehre kilitli: sadece şehrin parça(lar)ı; şehirsiz: ana koleksiyon
+            stage.add("shards", len(self.shard_router.routes(city)))
+            return self.shard_router.query(**query_params, city=city)
+        return self.collection.query(**query_params)
+
+    def _adaptive_ann_query(self, query_vector: list, top_k: int, max_price: float, city: str, stage) -> dict:
+        """
+        Benzerlik eşikli uyarlamalı arama: n_results geometrik büyür (top_k, 2x, 4x...).
+
+        Tur başına sadece metadata + mesafe çekilir. Durma koşulları:
+          - şehir filtresinden geçen aday top_k'ya ulaştı (filtreler sağlandı),
+          - son aday MERGENX_MIN_SIMILARITY'nin altına düştü (sonrakiler daha zayıf:
+            büyütmek sadece alakasız aday taşır),
+          - koleksiyon tükendi veya MERGENX_ADAPTIVE_MAX_RESULTS'a ulaşıldı.
+        Eşik sadece büyümeyi durdurur; bulunan oteller skorlarıyla döner. Dokümanlar
+        (açıklamalar) sadece seçilen oteller için id ile okunur.
+        """
+        n_results = max(1, top_k)
+        limit = max(n_results, self.adaptive_max_results)
+        while True:
+            results = self._ann_query([query_vector], n_results, max_price, city, ['metadatas'], stage)
+            stage.add("adaptive_rounds")
+            ids, metadatas, distances = results['ids'][0], results['metadatas'][0], results['distances'][0]
+            selected = [
+                i for i in range(len(ids))
+                if city is None or self._normalize_city_name(metadatas[i].get('city', '')) == city
+            ][:top_k]
+            weakest = _similarity(distances[-1]) if distances else None
+            if (len(selected) >= top_k or len(ids) < n_results or n_results >= limit
+                    or weakest is None or weakest < self.min_similarity):
+                break
+            n_results = min(n_results * 2, limit)
+        stage.set(final_n_results=n_results, below_threshold=sum(
+            _similarity(distance) < self.min_similarity for distance in distances
+        ))
+
+        selected_ids = [ids[i] for i in selected]
+        found = self.collection.get(ids=selected_ids, include=['documents']) if selected_ids else {'ids': [], 'documents': []}
+        documents = dict(zip(found['ids'], found['documents']))
+        return {
+            'ids': [selected_ids],
+            'documents': [[documents.get(hotel_id, "") for hotel_id in selected_ids]],
+            'metadatas': [[metadatas[i] for i in selected]],
+            'distances': [[distances[i] for i in selected]],
+        }
+
+    def _query_hotel_vectors(self, query_vectors: list, top_k: int, max_price: float = None,
+                             include: list = None) -> tuple:
+        """
+        Kompakt depoda aday geçişi + float32 yeniden puanlama (sorgu başına); dokümanlar /
+        metadata tüm sorgular için tek get çağrısında Chroma'dan id ile.
 
-    def _filter_flights(self, origin_iata: str, destination_iata: str, travel_style: str, time_preference: str = None) -> tuple:
+        Returns: (collection.query biçiminde sonuç, yeniden puanlanan toplam aday sayısı)
         """
-        SIMPLIFIED Flight Filter: Basic origin-destination matching
+        fetch = [field for field in (include or ['documents', 'metadatas']) if field in ('documents', 'metadatas')]
+        searched = [self.hotel_vectors.search(vector, top_k, max_price, self.vector_rescore_factor)
+                    for vector in query_vectors]
+        unique_ids = list(dict.fromkeys(hotel_id for ids, _, _ in searched for hotel_id in ids))
+        found = self.collection.get(ids=unique_ids, include=fetch) if unique_ids else {'ids': []}
+        rows = {hotel_id: index for index, hotel_id in enumerate(found['ids'])}
+        results = {'ids': [], 'distances': [], **{field: [] for field in fetch}}
+        for ids, similarities, _ in searched:
+            # get() sırası garanti değil: benzerlik sırası korunur
+            ranked = [(hotel_id, float(similarity)) for hotel_id, similarity in zip(ids, similarities)
+                      if hotel_id in rows]
+            results['ids'].append([hotel_id for hotel_id, _ in ranked])
+            results['distances'].append([1.0 - similarity for _, similarity in ranked])
+            for field in fetch:
+                results[field].append([found[field][rows[hotel_id]] for hotel_id, _ in ranked])
+        return results, sum(rescored for _, _, rescored in searched)
+
+    def _flight_options(self, origin_iata: str, destination_iata: str, time_preference: str = None,
+                        day: int = None) -> np.ndarray:
+        """
+        Flight candidates: origin-destination route rows inside the time window
         
         Args:
             origin_iata: Origin airport code
             destination_iata: Destination airport code
-            travel_style: Travel style
             time_preference: Time preference (if any)
+            day: Kalkış günü (date.toordinal); verilirse sadece o günün uçuşları
         
         Returns:
-            (flight_object, reason_text)
+            Aday uçuş satırları (structured array, boş olabilir); seçim _rank_packages'ta yapılır
         """
         try:
-            print(f"[FLIGHT SEARCH] Looking for flights: {origin_iata} -> {destination_iata}, style={travel_style}, time={time_preference}")
+            hot_log.debug("[FLIGHT SEARCH] Looking for flights: %s -> %s, time=%s", origin_iata, destination_iata, time_preference)
             
-            matching_flights = []
+            # IATA kodu eşleştirmesi: rota dilimi (derlenmiş tablodan, tüm tabloyu taramadan)
+            # Tarihli modda rotanın sıralı kalkış günlerinde ikili arama: sadece o günün uçuşları
+            if day is not None:
+                flights = self.flight_table.rows_between((origin_iata, destination_iata), "dep_day", day, day + 1)
+            else:
+                flights = self.flight_table.rows((origin_iata, destination_iata))
+            mask = np.ones(len(flights), dtype=bool)
             
-            for flight in self.flights:
-                leg = flight.get("leg", {})
-                
-                # IATA kodu eşleştirmesi
-                if (leg.get("origin") == origin_iata and 
-                    leg.get("destination") == destination_iata):
-                    
-                    # ============================================================
-                    # ✅ FIX 3: HARD-CODED TIME FILTERING
-                    # Kullanıcı zaman tercihi belirttiyse, uçuşları saate göre filtrele
-                    # ============================================================
-                    if time_preference:
-                        departure_time = leg.get("departure", "")
-                        if departure_time:
-                            try:
-                                # ISO format: "2024-01-15T18:30:00" -> saat çıkar
-                                hour = int(departure_time.split("T")[1].split(":")[0])
-                                
-                                # HARD-CODE: Zaman filtreleme
-                                if time_preference == 'sabah' and not (6 <= hour < 12):
-                                    continue  # ✅ FIX 4: Log temizliği - skip logunu kaldırdık
-                                elif time_preference == 'öğleden' and not (12 <= hour < 17):
-                                    continue  # ✅ FIX 4: Log temizliği
-                                elif time_preference == 'akşam' and not (17 <= hour < 24):
-                                    continue  # ✅ FIX 4: Log temizliği
-                            except (ValueError, IndexError) as time_error:
-                                pass  # ✅ FIX 4: Error log da kaldırıldı
-                    
-                    matching_flights.append(flight)
+            # ============================================================
+            # ✅ FIX 3: HARD-CODED TIME FILTERING
+            # Kullanıcı zaman tercihi belirttiyse, uçuşları saate göre filtrele
+            # (kalkış saati derlemede çıkarıldı; okunamayan saat = -1, filtrelenmez)
+            # ============================================================
+            window = FLIGHT_TIME_WINDOWS.get(time_preference) if time_preference else None
+            if window and len(flights):
+                hours = flights["dep_hour"]
+                mask &= (hours < 0) | ((hours >= window[0]) & (hours < window[1]))
             
             # ✅ FIX 4: Sadece başarılı match'leri logla
-            if matching_flights and time_preference:
-                print(f"[TIME FILTER MATCH] Found {len(matching_flights)} flights for '{time_preference}' preference")
-            
-            if not matching_flights:
-                print(f"[FLIGHT SEARCH] No flights found for {origin_iata} -> {destination_iata}")
-                return (None, "")
-            
-            # Travel style'a göre filtrele
-            if travel_style == "lüks":
-                # Premium kabin ara
-                premium_flights = [f for f in matching_flights 
-                                  if f.get("pricing", {}).get("cabin") in ["BUSINESS", "PREMIUM_ECONOMY"]]
-                matching_flights = premium_flights if premium_flights else matching_flights
-            
-            # Fiyata göre sırala ve en uygununu seç
-            matching_flights.sort(key=lambda x: x.get("pricing", {}).get("amount", 0))
-            selected_flight = matching_flights[0] if matching_flights else None
-            
-            if selected_flight:
-                airline_name = self._simple_translate(selected_flight.get("carrier", ""))
-                cabin = selected_flight.get("pricing", {}).get("cabin", "")
-                price = float(selected_flight.get("pricing", {}).get("amount", 0))
-                
-                reason = f"{airline_name} ({cabin}) - ₺{price:,.0f}"
-                
-                # GERÇEK uçuş objesini döndür
-                flight_object = {
-                    "flight_id": selected_flight.get("flight_id"),
-                    "carrier": selected_flight.get("carrier"),
-                    "flight_no": selected_flight.get("flight_no"),
-                    "origin": selected_flight.get("leg", {}).get("origin"),
-                    "destination": selected_flight.get("leg", {}).get("destination"),
-                    "departure": selected_flight.get("leg", {}).get("departure"),
-                    "arrival": selected_flight.get("leg", {}).get("arrival"),
-                    "price": price,
-                    "cabin": cabin,
-                    "baggage": selected_flight.get("baggage")
-                }
-                
-                print(f"[SIMPLE FLIGHT] Found flight: {reason}")
-                return (flight_object, reason)
+            if mask.any() and time_preference:
+                hot_log.debug("[TIME FILTER MATCH] Found %d flights for %r preference", int(mask.sum()), time_preference)
+            
+            if not mask.any():
+                hot_log.debug("[FLIGHT SEARCH] No flights found for %s -> %s", origin_iata, destination_iata)
             
-            return (None, "")
+            return flights[mask]
             
         except Exception as e:
-            print(f"[ERROR] Uçuş filtreleme hatası: {e}")
-            return (None, "")
+            logger.error("[ERROR] Uçuş filtreleme hatası: %s", e, exc_info=True)
+            return self.flight_table.records[:0]
+
+    def _transfer_location_key(self, airport_code: str, hotel: Hotel) -> tuple:
+        """_transfer_options sonucunu belirleyen alanlar (aynı anahtar = aynı aday kümesi)."""
+        return (airport_code,) + hotel.location_key
 
-    def _filter_transfers(self, airport_code: str, hotel: dict, travel_style: str) -> tuple:
+    def _transfer_options(self, airport_code: str, hotel: Hotel) -> tuple:
         """
         ✅ STRICT HIERARCHY: Area > District > City
         
@@ -1221,48 +1672,29 @@ class TravelPlanner:
         3. Use exact .lower().strip() matching - NO partial matches
         4. If hotel is in 'Çeşme', DON'T match 'Foça' or 'Lara' transfers
         
-        Returns: (transfer_object, reason_text)
+        Seçim (konum kademesi + araç + süre + fiyat) _rank_packages'ta yapılır.
+        
+        Returns: (aday transfer satırları, eşleşme kademeleri) - MATCH_TIERS indeksleri
         """
         try:
-            # Get transfer routes
-            if isinstance(self.transfers, dict) and "transfer_routes" in self.transfers:
-                routes = self.transfers.get("transfer_routes", [])
-            else:
-                routes = self.transfers if isinstance(self.transfers, list) else []
+            hotel_name = hotel.name
+            hotel_city, hotel_district, hotel_area = hotel.location_key
             
-            hotel_name = hotel.get("name", "Unknown Hotel")
-            hotel_city = hotel.get("city", "").lower().strip()
-            hotel_district = hotel.get("district", "").lower().strip()
-            hotel_area = hotel.get("area", "").lower().strip()
-            
-            print(f"\n[🔍 TRANSFER SEARCH] Hotel: {hotel_name}")
-            print(f"[📍 LOCATION] City: '{hotel_city}' | District: '{hotel_district}' | Area: '{hotel_area}'")
+            hot_log.debug("[🔍 TRANSFER SEARCH] Hotel: %s", hotel_name)
+            hot_log.debug("[📍 LOCATION] City: %r | District: %r | Area: %r", hotel_city, hotel_district, hotel_area)
             
             # ✅ CRITICAL: Verify metadata is not empty
             if not hotel_district or not hotel_area:
-                print(f"[⚠️ METADATA WARNING] District or Area is EMPTY - this will cause transfer matching issues!")
-            
-            # ✅ Define city-to-regions mapping for flexible matching
-            # If hotel is in İzmir city, allow transfers to İzmir districts (Çeşme, Alaçatı, Foça, etc.)
-            city_regions_map = {
-                "izmir": ["cesme", "çesme", "alacati", "alaçatı", "foca", "foça", "urla", "seferihisar", "gumuldur", "gümüldür"],
-                "antalya": ["belek", "lara", "kemer", "alanya", "side", "manavgat", "kundu"]
-            }
-            
-            # ✅ STEP 1: Match airport_code with from_code
-            airport_matches = []
-            for transfer in routes:
-                route = transfer.get("route", {})
-                from_code = route.get("from_code")
-                
-                if from_code == airport_code:
-                    airport_matches.append(transfer)
+                hot_log.debug("[⚠️ METADATA WARNING] District or Area is EMPTY - this will cause transfer matching issues")
+            
+            # ✅ STEP 1: Match airport_code with from_code (havalimanı indeksinden)
+            airport_matches = self.transfer_table.rows(airport_code)
             
-            if not airport_matches:
-                print(f"[❌ NO AIRPORT MATCH] No transfers found for airport code: {airport_code}")
-                return (None, "")
+            if not len(airport_matches):
+                hot_log.debug("[❌ NO AIRPORT MATCH] No transfers found for airport code: %s", airport_code)
+                return (airport_matches, np.zeros(0, dtype=np.int8))
             
-            print(f"[✅ AIRPORT MATCH] Found {len(airport_matches)} transfers from {airport_code}")
+            hot_log.debug("[✅ AIRPORT MATCH] Found %d transfers from %s", len(airport_matches), airport_code)
             
             # ✅ STEP 2: FLEXIBLE HIERARCHY - Area > District > City with partial matching
             # Normalize hotel location data
@@ -1272,9 +1704,11 @@ class TravelPlanner:
             
             hierarchy_matches = []
             
-            for transfer in airport_matches:
-                route = transfer.get("route", {})
-                to_area_name = route.get("to_area_name", "").lower().strip()
+            # Metin sütunları havalimanı başına bir kez decode edilir; eşleşmeler satır indeksi tutar
+            area_names = self.transfer_table.text_column(airport_code, "to_area_name")
+            
+            for transfer, to_area_name in enumerate(area_names):
+                to_area_name = to_area_name.lower().strip()
                 to_area_normalized = self._normalize_city_name(to_area_name)
                 
                 matched = False
@@ -1289,7 +1723,7 @@ class TravelPlanner:
                             "match_type": "AREA",
                             "match_value": to_area_name
                         })
-                        print(f"[🎯 AREA MATCH] Transfer to '{to_area_name}' ≈ Hotel area '{hotel_area}'")
+                        hot_log.debug("[🎯 AREA MATCH] Transfer to %r ≈ Hotel area %r", to_area_name, hotel_area)
                         matched = True
                         continue
                 
@@ -1303,25 +1737,23 @@ class TravelPlanner:
                             "match_type": "DISTRICT",
                             "match_value": to_area_name
                         })
-                        print(f"[🎯 DISTRICT MATCH] Transfer to '{to_area_name}' ≈ Hotel district '{hotel_district}'")
+                        hot_log.debug("[🎯 DISTRICT MATCH] Transfer to %r ≈ Hotel district %r", to_area_name, hotel_district)
                         matched = True
                         continue
                 
                 # ✅ PRIORITY 3: CITY-REGION MATCH (Flexible for same-city regions)
                 # If hotel is in İzmir city, allow transfers to İzmir districts
                 if not matched and hotel_city_normalized and to_area_normalized:
-                    # Check if transfer destination is in the same city's region list
-                    if hotel_city_normalized in city_regions_map:
-                        allowed_regions = city_regions_map[hotel_city_normalized]
-                        if any(region in to_area_normalized for region in allowed_regions):
-                            hierarchy_matches.append({
-                                "transfer": transfer,
-                                "match_type": "CITY_REGION",
-                                "match_value": to_area_name
-                            })
-                            print(f"[🎯 CITY-REGION MATCH] Transfer to '{to_area_name}' is in {hotel_city} region")
-                            matched = True
-                            continue
+                    # Transfer varış bölgesi otelin şehrine ait bir ilçe/bölge mi? (coğrafya tablosu)
+                    if geo_key(hotel_city) in self.geography.cities_in(to_area_name):
+                        hierarchy_matches.append({
+                            "transfer": transfer,
+                            "match_type": "CITY_REGION",
+                            "match_value": to_area_name
+                        })
+                        hot_log.debug("[🎯 CITY-REGION MATCH] Transfer to %r is in %s region", to_area_name, hotel_city)
+                        matched = True
+                        continue
                     
                     # Direct city match as final fallback
                     if not matched and hotel_city_normalized == to_area_normalized:
@@ -1330,96 +1762,26 @@ class TravelPlanner:
                             "match_type": "CITY",
                             "match_value": to_area_name
                         })
-                        print(f"[🎯 CITY MATCH] Transfer to '{to_area_name}' == Hotel city '{hotel_city}'")
+                        hot_log.debug("[🎯 CITY MATCH] Transfer to %r == Hotel city %r", to_area_name, hotel_city)
                         matched = True
                         continue
                 
                 if not matched:
-                    print(f"[⚠️ NO MATCH] Transfer to '{to_area_name}' doesn't match hotel location")
+                    hot_log.debug("[⚠️ NO MATCH] Transfer to %r doesn't match hotel location", to_area_name)
             
-            # ✅ STEP 3: Select best match based on hierarchy
+            # ✅ STEP 3: Aday kümesi (sadece hiyerarşiye uyanlar; sıralama skorla yapılır)
             if not hierarchy_matches:
-                print(f"[❌ NO HIERARCHY MATCH] No transfers match hotel location hierarchy")
-                print(f"[STRICT POLICY] Hotel in '{hotel_district}' - Will NOT use 'Foça' or 'Lara' transfers")
-                return (None, "")
-            
-            # ✅ VEHICLE QUALITY PRIORITY for luxury travel_style
-            # Define vehicle quality tiers (lower number = higher quality)
-            vehicle_quality_map = {
-                # Premium tier
-                "VIP": 1, "VAN_VIP": 1, "PREMIUM": 1, "PREMIUM_VAN": 1,
-                # Mid tier
-                "VAN": 2, "MINIVAN": 2, "VITO": 2, "MERCEDES": 2, "SPRINTER": 2,
-                # Standard tier
-                "SHUTTLE": 3, "STANDARD": 3, "ECONOMY": 3, "BUS": 3
-            }
-            
-            def get_vehicle_quality(transfer_dict):
-                """Get vehicle quality score (lower is better)"""
-                vehicle_category = transfer_dict["transfer"].get("vehicle_info", {}).get("category", "").upper()
-                # Return quality score, default to 99 if unknown
-                return vehicle_quality_map.get(vehicle_category, 99)
-            
-            # ✅ SMART SORTING based on travel_style
-            hierarchy_priority = {"AREA": 1, "DISTRICT": 2, "CITY_REGION": 3, "CITY": 4}
-            
-            if travel_style == "lüks":
-                # For luxury: Hierarchy > Quality > Price
-                # First prioritize location match, then vehicle quality, then price
-                print(f"[🌟 LUXURY MODE] Prioritizing VIP/Premium vehicles over price")
-                hierarchy_matches.sort(key=lambda x: (
-                    hierarchy_priority.get(x["match_type"], 99),  # Location first
-                    get_vehicle_quality(x),  # Then quality
-                    float(x["transfer"].get("total_price", 0))  # Then price
-                ))
-            else:
-                # For non-luxury: Hierarchy > Price > Quality
-                # Prioritize cheapest option
-                hierarchy_matches.sort(key=lambda x: (
-                    hierarchy_priority.get(x["match_type"], 99),  # Location first
-                    float(x["transfer"].get("total_price", 0)),  # Then price
-                    get_vehicle_quality(x)  # Then quality
-                ))
-            
-            best_match = hierarchy_matches[0]
-            selected_transfer = best_match["transfer"]
-            match_type = best_match["match_type"]
-            match_value = best_match["match_value"]
-            
-            # ✅ LOG: Show vehicle quality decision
-            vehicle_category = selected_transfer.get("vehicle_info", {}).get("category", "")
-            quality_score = vehicle_quality_map.get(vehicle_category.upper(), 99)
-            quality_tier = "PREMIUM" if quality_score == 1 else "MID" if quality_score == 2 else "STANDARD"
-            
-            if travel_style == "lüks":
-                print(f"[🌟 LUXURY SELECTION] Vehicle: {vehicle_category} (Quality: {quality_tier})")
-                if quality_score > 1:
-                    print(f"[⚠️ LUXURY NOTE] No VIP vehicles available, selecting best available: {vehicle_category}")
-            
-            vehicle_type = selected_transfer.get("vehicle_info", {}).get("category", "")
-            price = float(selected_transfer.get("total_price", 0))
-            duration = selected_transfer.get("route", {}).get("estimated_duration", 0)
-            
-            reason = f"{vehicle_type} - {duration} dakika - ₺{price:,.0f}"
-            
-            transfer_obj = {
-                "service_code": selected_transfer.get("service_code"),
-                "from": selected_transfer.get("route", {}).get("from_name"),
-                "to": selected_transfer.get("route", {}).get("to_area_name"),
-                "duration": duration,
-                "vehicle_category": vehicle_type,
-                "vehicle_features": selected_transfer.get("vehicle_info", {}).get("features", []),
-                "price": price
-            }
-            
-            print(f"[✅ SELECTED] {match_type} match: Transfer to '{match_value}' | {reason}")
-            return (transfer_obj, reason)
+                hot_log.debug("[❌ NO HIERARCHY MATCH] No transfers match hotel location hierarchy")
+                hot_log.debug("[STRICT POLICY] Hotel in %r - Will NOT use other districts' transfers", hotel_district)
+                return (airport_matches[:0], np.zeros(0, dtype=np.int8))
+            
+            rows = np.array([match["transfer"] for match in hierarchy_matches])
+            tiers = np.array([MATCH_TIERS.index(match["match_type"]) for match in hierarchy_matches], dtype=np.int8)
+            return (airport_matches[rows], tiers)
             
         except Exception as e:
-            print(f"[ERROR] Transfer filter error: {e}")
-            import traceback
-            traceback.print_exc()
-            return (None, "")
+            logger.error("[ERROR] Transfer filter error: %s", e, exc_info=True)
+            return (self.transfer_table.records[:0], np.zeros(0, dtype=np.int8))
 
     def _generate_batch_summaries(self, packages: list, user_query: str, travel_params: dict) -> list:
         """
@@ -1471,25 +1833,7 @@ class TravelPlanner:
                 """
             
             # 🎭 Kullanıcı niyetini çıkar (anahtar kelimeler)
-            query_lower = user_query.lower()
-            intent_keywords = {
-                "romantik": "Romantik Kaçamak",
-                "kız kıza": "Keyifli Kız Kıza Tatil",
-                "sessiz": "Huzurlu Dinlenme",
-                "sakin": "Sakin Bir Hafta Sonu",
-                "lüks": "Lüks Deneyim",
-                "ekonomik": "Uygun Fiyatlı Tatil",
-                "aile": "Aile Dostu Tatil",
-                "eğlence": "Eğlence Dolu Tatil",
-                "deniz": "Deniz Keyfi",
-                "spa": "Wellness ve Rahatlama"
-            }
-            
-            package_theme = "Özel Seçim"  # Varsayılan
-            for keyword, theme in intent_keywords.items():
-                if keyword in query_lower:
-                    package_theme = theme
-                    break
+            package_theme = get_query_matcher().first(user_query, "theme", "Özel Seçim")
             
             prompt = f"""
             Sen profesyonel bir Seyahat Danışmanısın. Kullanıcı şöyle bir tatil istedi: "{user_query}"
@@ -1532,7 +1876,7 @@ class TravelPlanner:
             ✅ Paket 2: [Tema] - [Hikaye tarzı akıcı paragraf]
             ✅ Paket 3: [Tema] - [Hikaye tarzı akıcı paragraf]
             
-            Sadece bu formatı kullan, başka hiçbir şey yazma.
+            Tam olarak {len(packages)} satır yaz. Sadece bu formatı kullan, başka hiçbir şey yazma.
             """
             
             completion = self.llm.client.chat.completions.create(
@@ -1551,11 +1895,11 @@ class TravelPlanner:
                 hotel_name = packages[idx]["hotel"]["name"]
                 summaries.append(f"{hotel_name}, tercihlerinize uyumlu bir paket sunar.")
             
-            print(f"[BATCH SUCCESS] Generated {len(summaries)} summaries in single call")
+            logger.debug("[BATCH SUCCESS] Generated %d summaries in single call", len(summaries))
             return summaries
         
         except Exception as e:
-            print(f"[BATCH ERROR] {e}, falling back to individual summaries")
+            logger.warning("[BATCH ERROR] %s, falling back to individual summaries", e)
             # Fallback: Basit özetler
             return [f"{pkg['hotel']['name']}, tercihlerinize uyumlu bir paket sunar." for pkg in packages]
 
@@ -1659,14 +2003,25 @@ class TravelPlanner:
             amenities_first = hotel.get('amenities', ['ekstra hizmetler'])[0] if hotel.get('amenities') else "ekstra hizmetler"
             return f"{hotel_name}, {amenities_first} ve konforlu bir ortamda tercihlerinize uyumlu bir paket sunar. Uçuş ve transfer hizmetleriyle tam kaynaklanmış bir tatil deneyimi yaşayacaksınız."
 
-    def search(self, query: str, top_k: int = 3):
+    def search(self, query: str, top_k: int = 3, **plan_options):
         """
         Backward compatibility: Eski search fonksiyonu, yeni plan_travel'ı çağırır
         """
-        packages, error = self.plan_travel(query, top_k)
+        hotels, _next_cursor, error = self.search_page(query, page_size=top_k, **plan_options)
+        return (hotels, error)
+
+    def search_page(self, query: str, page_size: int = 3, cursor: str = None, **plan_options):
+        """
+        Sayfalı arama (Streamlit arayüzü): plan_travel_page sonucunu eski hotels formatına çevirir.
+
+        plan_options: plan_travel_page'e iletilir (budget, nights, check_in, check_out)
+
+        Returns: (hotels_list, next_cursor, error_message)
+        """
+        packages, next_cursor, error = self.plan_travel_page(query, page_size=page_size, cursor=cursor, **plan_options)
         
         if error:
-            return ([], error)
+            return ([], None, error)
         
         # Eski format için hotels dizisine dönüştür
         hotels = []
@@ -1676,7 +2031,7 @@ class TravelPlanner:
             hotel["package"] = package
             hotels.append(hotel)
         
-        return (hotels, None)
+        return (hotels, next_cursor, None)
 
 if __name__ == "__main__":
     # Test amacli seyahat planlama
@@ -0,0 +1,200 @@
+"""
+Aşama Bazlı Gecikme İzleme (tracing).
+
+plan_travel_page her istek için bir Trace açar; sorgu parse, embedding, ANN sorgusu,
+çeşitlilik döngüsü, havalimanı çözümleme, uçuş/transfer filtreleme, fiyatlama ve
+LLM çağrısı birer span olarak süre + sayaçlarıyla kaydedilir (taranan aday sayısı,
+önbellek isabeti vb.).
+
+Aktif trace contextvars ile taşınır; trace yokken span() hiçbir şey kaydetmez.
+
+Çıktılar:
+- Trace.breakdown(): Streamlit panelindeki aşama tablosu
+- MERGENX_TRACE_FILE ayarlıysa her trace bu dosyaya bir JSON satırı olarak eklenir
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_trace = ContextVar("mergenx_trace", default=None)
+_current_span = ContextVar("mergenx_span", default=None)
+
+
+class Span:
+    """Tek bir aşama: süre (ms) + sayaçlar/öznitelikler."""
+
+    __slots__ = ("name", "parent", "start_ms", "duration_ms", "attrs")
+
+    def __init__(self, name: str, parent: str, start_ms: float, attrs: dict):
+        self.name = name
+        self.parent = parent
+        self.start_ms = start_ms
+        self.duration_ms = 0.0
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key: str, amount: int = 1):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "start_ms": round(self.start_ms, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attrs": self.attrs,
+        }
+
+
+class _NullSpan:
+    """Trace yokken dönen span: tüm çağrılar boşa düşer."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, key: str, amount: int = 1):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """Bir isteğin tüm span'leri (kayıt sırasıyla)."""
+
+    def __init__(self, name: str, **attrs):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attrs = attrs
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms = 0.0
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def _record(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def breakdown(self) -> list:
+        """
+        Aşama bazlı özet (aynı isimli span'ler toplanır), ilk görülme sırasıyla.
+
+        Returns: [{"stage", "calls", "total_ms", "share", "attrs"}, ...]
+        """
+        stages = {}
+        for span in self.spans:
+            stage = stages.setdefault(span.name, {"stage": span.name, "calls": 0, "total_ms": 0.0, "attrs": {}})
+            stage["calls"] += 1
+            stage["total_ms"] += span.duration_ms
+            for key, value in span.attrs.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stage["attrs"][key] = stage["attrs"].get(key, 0) + value
+                else:
+                    stage["attrs"][key] = value
+        total = self.duration_ms or self.elapsed_ms()
+        for stage in stages.values():
+            stage["total_ms"] = round(stage["total_ms"], 3)
+            stage["share"] = round(stage["total_ms"] / total, 4) if total else 0.0
+        return list(stages.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "attrs": self.attrs,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+class JsonlTraceExporter:
+    """Trace'leri JSON lines dosyasına ekler (thread-safe)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace):
+        line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    """MERGENX_TRACE_FILE ayarlıysa JSONL exporter, değilse None."""
+    global _exporter
+    path = os.getenv("MERGENX_TRACE_FILE")
+    if not path:
+        return None
+    with _exporter_lock:
+        if _exporter is None or _exporter.path != path:
+            _exporter = JsonlTraceExporter(path)
+        return _exporter
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str, **attrs):
+    """
+    Yeni trace başlat. Zaten aktif bir trace varsa (örn. Streamlit isteği sarmaladı)
+    onu kullanır; böylece aynı isteğin span'leri tek trace'te toplanır.
+    """
+    existing = _current_trace.get()
+    if existing is not None:
+        yield existing
+        return
+
+    trace = Trace(name, **attrs)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.duration_ms = trace.elapsed_ms()
+        _current_trace.reset(token)
+        exporter = get_exporter()
+        if exporter is not None:
+            try:
+                exporter.export(trace)
+            except OSError:
+                pass
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Aktif trace'e süre ölçümlü bir span ekle (trace yoksa maliyetsiz no-op)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield NULL_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(name, parent.name if parent is not None else None, trace.elapsed_ms(), dict(attrs))
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.duration_ms = (time.perf_counter() - start) * 1000
+        _current_span.reset(token)
+        trace._record(current)
@@ -0,0 +1,321 @@
+"""
+Derlenmiş Uçuş / Transfer Tabloları (NumPy structured array, memory-mapped).
+
+flights.json ve transfers.json ilk kullanımda sıkıştırılmış ikili tablolara
+derlenir (<data_dir>/.cache/*.npy) ve np.load(mmap_mode="r") ile açılır:
+- Aynı makinedeki tüm Streamlit worker'ları aynı sayfaları paylaşır (kopya yok)
+- Sadece paket üretiminde kullanılan alanlar tutulur (status, transfer_zones... yok)
+- Kayıtlar rota / havalimanı anahtarına göre gruplanır; arama bir dilim (slice) okur
+- Sadece pakete seçilen satır kayda (records.Flight / records.Transfer) dönüştürülür
+- Kalite kademesi (kabin / araç sınıfı) ve kalkış günü derleme sırasında hesaplanır
+- Tarih aralığı sorguları rota başına sıralanmış kalkış günlerinde ikili arama yapar
+
+Kaynak JSON değiştiğinde (mtime / boyut) tablo kendiliğinden yeniden derlenir.
+Önceden derlemek için: python -m src.model.travel_tables --data-dir data
+"""
+import argparse
+import json
+import logging
+import os
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+from src.model.records import FEATURE_SEPARATOR, cabin_tier, vehicle_tier
+
+logger = logging.getLogger(__name__)
+
+TABLE_FORMAT_VERSION = 4
+CACHE_DIR_NAME = ".cache"
+
+# (alan, numpy tipi); None = metin (UTF-8 bayt)
+FLIGHT_FIELDS = (
+    ("flight_id", None), ("carrier", None), ("flight_no", None), ("origin", None), ("destination", None),
+    ("departure", None), ("arrival", None), ("dep_hour", "i1"), ("price", "f8"), ("cabin", None), ("baggage", None),
+    ("quality", "i1"), ("dep_day", "i4"),
+)
+TRANSFER_FIELDS = (
+    ("service_code", None), ("from_code", None), ("from_name", None), ("to_area_name", None),
+    ("duration", "i4"), ("category", None), ("features", None), ("price", "f8"), ("quality", "i1"),
+)
+
+
+def _departure_hour(departure: str) -> int:
+    # ISO format: "2024-01-15T18:30:00" -> 18 (okunamazsa -1: zaman filtresi uygulanmaz)
+    try:
+        return int(departure.split("T")[1].split(":")[0])
+    except (AttributeError, ValueError, IndexError):
+        return -1
+
+
+def departure_day(departure: str) -> int:
+    """ISO tarih/saat -> gün numarası (date.toordinal); okunamazsa -1."""
+    try:
+        return date.fromisoformat(departure[:10]).toordinal()
+    except (TypeError, ValueError):
+        return -1
+
+
+def _flight_row(flight: dict) -> dict:
+    leg = flight.get("leg", {}) or {}
+    pricing = flight.get("pricing", {}) or {}
+    return {
+        "flight_id": flight.get("flight_id") or "",
+        "carrier": flight.get("carrier") or "",
+        "flight_no": str(flight.get("flight_no") or ""),
+        "origin": leg.get("origin") or "",
+        "destination": leg.get("destination") or "",
+        "departure": leg.get("departure") or "",
+        "arrival": leg.get("arrival") or "",
+        "dep_hour": _departure_hour(leg.get("departure", "")),
+        "price": float(pricing.get("amount") or 0),
+        "cabin": pricing.get("cabin") or "",
+        "baggage": flight.get("baggage") or "",
+        "quality": cabin_tier(pricing.get("cabin")),
+        "dep_day": departure_day(leg.get("departure", "")),
+    }
+
+
+def _transfer_row(transfer: dict) -> dict:
+    route = transfer.get("route", {}) or {}
+    vehicle = transfer.get("vehicle_info", {}) or {}
+    return {
+        "service_code": transfer.get("service_code") or "",
+        "from_code": route.get("from_code") or "",
+        "from_name": route.get("from_name") or "",
+        "to_area_name": route.get("to_area_name") or "",
+        "duration": int(route.get("estimated_duration") or 0),
+        "category": vehicle.get("category") or "",
+        "features": FEATURE_SEPARATOR.join(vehicle.get("features", []) or []),
+        "price": float(transfer.get("total_price") or 0),
+        "quality": vehicle_tier(vehicle.get("category")),
+    }
+
+
+def _build_array(rows: list, fields: tuple) -> np.ndarray:
+    """
+    Satırlardan structured array. fields: (alan, tip) çiftleri; tip None ise metin alanıdır
+    ve UTF-8 bayt olarak, en uzun değerin genişliğiyle saklanır.
+    """
+    columns = {}
+    dtype = []
+    for field, kind in fields:
+        if kind is None:
+            columns[field] = [row[field].encode("utf-8") for row in rows]
+            kind = f"S{max((len(value) for value in columns[field]), default=0) or 1}"
+        else:
+            columns[field] = [row[field] for row in rows]
+        dtype.append((field, kind))
+    array = np.zeros(len(rows), dtype=np.dtype(dtype))
+    for field, values in columns.items():
+        if values:
+            array[field] = values
+    return array
+
+
+class CompiledTable:
+    """
+    Anahtara göre gruplanmış, salt okunur kayıt tablosu.
+
+    Args:
+        records: Structured array (mmap veya bellek içi)
+        index: anahtar -> (başlangıç, bitiş) dilimi
+    """
+
+    def __init__(self, records: np.ndarray, index: dict):
+        self.records = records
+        self.index = index
+        self._text_cache = {}
+        self._sorted_cache = {}
+        # Anahtar başına en düşük fiyat (bütçe aramasında paket alt sınırı)
+        self.min_prices = self._group_min("price")
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def rows(self, key) -> np.ndarray:
+        """Anahtarın kayıtları (dosya sırası korunur); yoksa boş dilim."""
+        start, end = self.index.get(key, (0, 0))
+        return self.records[start:end]
+
+    def rows_between(self, key, field: str, low, high) -> np.ndarray:
+        """
+        Anahtarın low <= field < high aralığındaki kayıtları (dosya sırası korunur).
+
+        Alan, anahtar başına bir kez sıralanır (kararlı argsort, önbellekli); sonraki
+        aralık sorguları ikili arama (searchsorted) ile dilim okur, tarama yapmaz.
+        """
+        rows = self.rows(key)
+        if not len(rows):
+            return rows
+        cache_key = (key, field)
+        cached = self._sorted_cache.get(cache_key)
+        if cached is None:
+            values = np.asarray(rows[field])
+            order = np.argsort(values, kind="stable")
+            cached = (order, values[order])
+            self._sorted_cache[cache_key] = cached
+        order, sorted_values = cached
+        start, end = np.searchsorted(sorted_values, [low, high], side="left")
+        return rows[np.sort(order[start:end])]
+
+    def span(self, field: str):
+        """Alanın geçerli (>= 0) değer aralığı (en küçük, en büyük); kayıt veya alan yoksa None."""
+        if field not in (self.records.dtype.names or ()):
+            return None
+        values = np.asarray(self.records[field])
+        values = values[values >= 0]
+        return (values.min().item(), values.max().item()) if len(values) else None
+
+    def min_price(self, key):
+        """Anahtarın en ucuz kaydının fiyatı; kayıt yoksa None."""
+        return self.min_prices.get(key)
+
+    def _group_min(self, field: str) -> dict:
+        # Gruplar bitişik ve tabloyu baştan sona kapsar: tek reduceat ile tüm anahtarlar
+        spans = sorted((start, key) for key, (start, end) in self.index.items() if end > start)
+        if not spans:
+            return {}
+        minima = np.minimum.reduceat(np.asarray(self.records[field]), [start for start, _key in spans])
+        return {key: float(value) for (_start, key), value in zip(spans, minima)}
+
+    def count(self, key) -> int:
+        start, end = self.index.get(key, (0, 0))
+        return end - start
+
+    def text_column(self, key, field: str) -> list:
+        """Dilimin bir metin sütunu (decode edilmiş, anahtar başına bir kez)."""
+        cache_key = (key, field)
+        values = self._text_cache.get(cache_key)
+        if values is None:
+            values = [value.decode("utf-8") for value in self.rows(key)[field]]
+            self._text_cache[cache_key] = values
+        return values
+
+
+def _source_version(path: Path) -> list:
+    try:
+        stat = path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+    except OSError:
+        return [None, None]
+
+
+def _group(rows: list, key_fields: tuple) -> tuple:
+    """Satırları anahtara göre kararlı sırala (dosya sırası korunur) + dilim indeksi."""
+    rows = sorted(rows, key=lambda row: tuple(row[field] for field in key_fields))
+    index = {}
+    for position, row in enumerate(rows):
+        key = tuple(row[field] for field in key_fields)
+        start, _end = index.get(key, (position, position))
+        index[key] = (start, position + 1)
+    return rows, index
+
+
+def _compile_flights(source: Path) -> tuple:
+    rows = []
+    if source.exists():
+        with open(source, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # flights.json bir obje, "flights" anahtarı altında liste var
+        flights = data.get("flights", []) if isinstance(data, dict) else data if isinstance(data, list) else []
+        rows = [_flight_row(flight) for flight in flights]
+    rows, index = _group(rows, ("origin", "destination"))
+    array = _build_array(rows, FLIGHT_FIELDS)
+    return array, index
+
+
+def _compile_transfers(source: Path) -> tuple:
+    rows = []
+    if source.exists():
+        with open(source, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # transfers.json bir obje, "transfer_routes" anahtarı altında liste var
+        routes = data.get("transfer_routes", []) if isinstance(data, dict) else data if isinstance(data, list) else []
+        rows = [_transfer_row(route) for route in routes]
+    rows, index = _group(rows, ("from_code",))
+    index = {key[0]: value for key, value in index.items()}
+    array = _build_array(rows, TRANSFER_FIELDS)
+    return array, index
+
+
+def _load_or_compile(source: Path, name: str, compiler, cache_dir: Path = None) -> CompiledTable:
+    """
+    Güncel derlenmiş tablo varsa mmap ile aç; yoksa derle, atomik yaz, sonra aç.
+
+    Cache dizini yazılamıyorsa tablo bellekte derlenir (mmap olmadan).
+    """
+    cache_dir = cache_dir or source.parent / CACHE_DIR_NAME
+    array_path = cache_dir / f"{name}.npy"
+    meta_path = cache_dir / f"{name}.meta.json"
+    version = {"format": TABLE_FORMAT_VERSION, "source": _source_version(source)}
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") == version:
+            return CompiledTable(_open_array(array_path), _decode_index(meta["index"]))
+    except (OSError, ValueError, KeyError):
+        pass
+
+    started = datetime.now()
+    array, index = compiler(source)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Eşzamanlı worker'lar aynı dosyayı derleyebilir: benzersiz geçici dosya + os.replace
+        suffix = uuid.uuid4().hex[:8]
+        tmp_array = cache_dir / f"{name}.{suffix}.tmp.npy"
+        tmp_meta = cache_dir / f"{name}.{suffix}.tmp.json"
+        np.save(tmp_array, array)
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "index": _encode_index(index)}, f, ensure_ascii=False)
+        os.replace(tmp_array, array_path)
+        os.replace(tmp_meta, meta_path)
+        logger.info("Compiled %s -> %s (%d records, %.2fs)", source.name, array_path, len(array),
+                    (datetime.now() - started).total_seconds())
+        return CompiledTable(_open_array(array_path), index)
+    except OSError as e:
+        logger.warning("Could not write compiled %s table (%s); using in-memory table", name, e)
+        return CompiledTable(array, index)
+
+
+def _open_array(path: Path) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        # Boş tablo mmap edilemez (veri bölümü yok)
+        return np.load(path)
+
+
+def _encode_index(index: dict) -> list:
+    return [[list(key) if isinstance(key, tuple) else key, start, end] for key, (start, end) in index.items()]
+
+
+def _decode_index(entries: list) -> dict:
+    return {tuple(key) if isinstance(key, list) else key: (start, end) for key, start, end in entries}
+
+
+def load_flight_table(data_dir, cache_dir: Path = None) -> CompiledTable:
+    """flights.json -> (origin, destination) anahtarlı tablo."""
+    return _load_or_compile(Path(data_dir) / "flights.json", "flights", _compile_flights, cache_dir)
+
+
+def load_transfer_table(data_dir, cache_dir: Path = None) -> CompiledTable:
+    """transfers.json -> from_code (havalimanı) anahtarlı tablo."""
+    return _load_or_compile(Path(data_dir) / "transfers.json", "transfers", _compile_transfers, cache_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uçuş / transfer tablolarını önceden derle")
+    parser.add_argument("--data-dir", default=os.path.join(os.getcwd(), "data"))
+    args = parser.parse_args(argv)
+    flights = load_flight_table(args.data_dir)
+    transfers = load_transfer_table(args.data_dir)
+    print(f"✅ {len(flights)} uçuş ({len(flights.index)} rota), "
+          f"{len(transfers)} transfer ({len(transfers.index)} havalimanı) derlendi")
+
+
+if __name__ == "__main__":
+    main()
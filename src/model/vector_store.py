@@ -1,11 +1,13 @@
-import chromadb
 import json
 import os
 import uuid
 import shutil
 import time
 import tempfile
-from src.model.embeddings import MergenEmbedder
+from src.model.index_config import HnswParams
+from src.model.resources import (
+    acquire_chroma_client, acquire_embedder, invalidate_chroma_client, release_chroma_client, release_embedder,
+)
 
 def get_value(hotel: dict, keys_list):
     """
@@ -30,7 +32,12 @@ def get_value(hotel: dict, keys_list):
     return None
 
 class MergenVectorStore:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, embedder=None):
+        """
+        Args:
+            db_path: ChromaDB dizini (varsayılan ./data/chroma_db_v2)
+            embedder: create_embeddings(texts) sağlayan nesne (varsayılan süreçte paylaşılan MergenEmbedder)
+        """
         # Absolute path logic for cloud compatibility
         if db_path is None:
             db_path = "./data/chroma_db_v2"
@@ -40,10 +47,25 @@ class MergenVectorStore:
             db_path = os.path.join(os.getcwd(), db_path)
         
         self.db_path = db_path
-        self.client = chromadb.PersistentClient(path=self.db_path)
-        self.embedder = MergenEmbedder()
+        # Model ve client süreçte paylaşılır (TravelPlanner ile aynı örnekler); close() ile bırakılır
+        self.client = acquire_chroma_client(self.db_path)
+        self._shared_embedder = None
+        if embedder is None:
+            embedder = self._shared_embedder = acquire_embedder()
+        self.embedder = embedder
         # Koleksiyonu olustur veya var olani al
-        self.collection = self.client.get_or_create_collection(name="hotels")
+        self.collection = self.client.get_or_create_collection(
+            name="hotels", metadata=HnswParams.from_env().collection_metadata()
+        )
+
+    def close(self):
+        """Paylaşılan Chroma client'ı ve (store kendisi aldıysa) embedding modelini bırak."""
+        if getattr(self, "client", None) is not None:
+            release_chroma_client(self.db_path, self.client)
+            self.client = None
+        if self._shared_embedder is not None:
+            release_embedder(self._shared_embedder)
+            self._shared_embedder = None
 
     def _validate_hotel_data(self, hotel: dict) -> dict:
         """
@@ -215,12 +237,12 @@ class MergenVectorStore:
             # ============================================================
             print("[STEP 3] NUCLEAR RESET - Physical database wipe...")
             
-            # Close existing client first
+            # Close existing client first (paylaşılan client tüm sahipler için kapatılır)
             try:
                 if hasattr(self, 'collection'):
                     delattr(self, 'collection')
-                if hasattr(self, 'client'):
-                    del self.client
+                self.client = None
+                if invalidate_chroma_client(self.db_path):
                     print("[INFO] Closed existing client")
             except Exception as close_error:
                 print(f"[INFO] Close client: {close_error}")
@@ -261,13 +283,13 @@ class MergenVectorStore:
             
             # Fresh Client: Reinitialize with clean slate
             print("[STEP 3.5] FRESH CLIENT - Reinitializing ChromaDB client...")
-            self.client = chromadb.PersistentClient(path=self.db_path)
+            self.client = acquire_chroma_client(self.db_path)
             print("[SUCCESS] New ChromaDB client created")
             
             # Create clean collection
             self.collection = self.client.get_or_create_collection(
                 name="hotels",
-                metadata={"hnsw:space": "cosine"}
+                metadata=HnswParams.from_env().collection_metadata()
             )
             print("[SUCCESS] New clean collection created")
 
@@ -458,7 +480,7 @@ class MergenVectorStore:
                 self.client.delete_collection(name="hotels")
                 self.collection = self.client.get_or_create_collection(
                     name="hotels",
-                    metadata={"hnsw:space": "cosine"}
+                    metadata=HnswParams.from_env().collection_metadata()
                 )
                 print("[RECOVERY] Collection recovered (empty)")
             except Exception as recovery_error:
@@ -467,4 +489,7 @@ class MergenVectorStore:
 
 if __name__ == "__main__":
     store = MergenVectorStore()
-    store.process_and_save("data/hotels.json")
\ No newline at end of file
+    try:
+        store.process_and_save("data/hotels.json")
+    finally:
+        store.close()
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Sorgu Sözlükleri: Niyet analizinde kullanılan tüm anahtar kelime listeleri.
+
+Bu listeler koddan ayrılmış veridir; yeni bir kelime eklemek için sadece
+ilgili sözlüğü güncellemek yeterlidir. Şehir anahtar kelimeleri coğrafya
+tablosundan (data/geography.json) gelir. Hepsi tek bir KeywordMatcher'a derlenir
+ve sorgu tek geçişte taranır.
+
+Sözlük sırası önceliktir (örn. 'lüks' kelimeleri 'ekonomik' kelimelerinden önce gelir).
+
+Bütçe, gece sayısı ve tarihler sayısal olduğu için sözlükle değil, aşağıdaki kalıplarla okunur.
+"""
+import re
+from datetime import date
+from functools import lru_cache
+
+from src.model.geography import get_geography
+from src.model.keyword_matcher import KeywordMatcher, fold_case
+
+# Anahtar kelime -> travel_style
+TRAVEL_STYLE_KEYWORDS = {
+    "lüks": "lüks",
+    "lux": "lüks",
+    "vip": "lüks",
+    "premium": "lüks",
+    "ekonomik": "ekonomik",
+    "ucuz": "ekonomik",
+    "budget": "ekonomik",
+}
+
+# Anahtar kelime -> time_preference
+TIME_KEYWORDS = {
+    "sabah": "sabah", "morning": "sabah", "erken": "sabah", "sabahları": "sabah", "sabahın": "sabah",
+    "öğle": "öğle", "öğleden": "öğle", "noon": "öğle", "afternoon": "öğle", "öğleyin": "öğle", "öğleden sonra": "öğle",
+    "akşam": "akşam", "evening": "akşam", "akşamları": "akşam", "akşamın": "akşam", "akşamüstü": "akşam",
+    "gece": "gece", "night": "gece", "geç": "gece", "geceleyin": "gece", "gece yarısı": "gece",
+}
+
+# Uçuş niyeti
+FLIGHT_KEYWORDS = [
+    "uçuş", "uçak", "uçağı", "uçağıyla", "uçakla",
+    "flight", "gidiş", "dönüş", "uçma", "uçuyorum",
+    "havayolu", "bilet", "sefer",
+]
+
+# Transfer niyeti
+TRANSFER_KEYWORDS = ["transfer", "araç"]
+
+# Özet başlığı için paket teması
+THEME_KEYWORDS = {
+    "romantik": "Romantik Kaçamak",
+    "kız kıza": "Keyifli Kız Kıza Tatil",
+    "sessiz": "Huzurlu Dinlenme",
+    "sakin": "Sakin Bir Hafta Sonu",
+    "lüks": "Lüks Deneyim",
+    "ekonomik": "Uygun Fiyatlı Tatil",
+    "aile": "Aile Dostu Tatil",
+    "eğlence": "Eğlence Dolu Tatil",
+    "deniz": "Deniz Keyfi",
+    "spa": "Wellness ve Rahatlama",
+}
+
+# Kısa promptlar için niyet genişletme (LLM parametre çıkarımı)
+PROMPT_EXPANSIONS = {
+    "kız kıza": "eğlence, merkezi, sosyal, nightlife, bar, müzik, cafe",
+    "kız": "eğlence, merkezi, sosyal, nightlife, bar, müzik, cafe",
+    "help": "yardımcı personel, rehber, bilgilendirme, destek",
+    "hel": "yardımcı personel, rehber, bilgilendirme, destek",
+    "muhafazakar": "aile, çocuk, kapalı havuz, hijab friendly, sessiz",
+    "balayı": "romantik, honeymoon, jakuzi, özel, couples",
+    "iş": "business, wifi, workstation, meeting, conference",
+}
+
+# Tutar: "20.000", "20000", "1,5" + opsiyonel "bin" / "k" çarpanı
+_AMOUNT = r"(\d{1,3}(?:[.,]\d{3})+|\d+(?:[.,]\d+)?)\s*(bin|k\b)?"
+
+# Bütçe kalıpları (sıra önceliktir): "₺20.000", "20 bin TL", "bütçem 15000", "25 bin altında"
+BUDGET_PATTERNS = (
+    re.compile(r"₺\s*" + _AMOUNT),
+    re.compile(_AMOUNT + r"\s*(?:₺|(?:tl|lira|try)\b)"),
+    re.compile(r"bütçe\w*\s*(?:[:=]\s*)?" + _AMOUNT + r"(?!\s*(?:\d|gece))"),
+    re.compile(_AMOUNT + r"\s*(?:altı|altında|altındaki)\b"),
+)
+
+# Gece sayısı: "3 gece", "5 night" ("gece" burada zaman tercihi değildir)
+NIGHTS_PATTERN = re.compile(r"(\d+)\s*(?:gece|night)", re.IGNORECASE)
+
+
+def _parse_amount(number: str, multiplier: str) -> float:
+    if re.fullmatch(r"\d{1,3}(?:[.,]\d{3})+", number):
+        value = float(re.sub(r"[.,]", "", number))  # Binlik ayraç
+    else:
+        value = float(number.replace(",", "."))
+    return value * 1000 if multiplier else value
+
+
+def parse_budget(query: str):
+    """Sorgudaki toplam bütçe (TL); yoksa None."""
+    text = fold_case(query)
+    for pattern in BUDGET_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return _parse_amount(match.group(1), match.group(2))
+    return None
+
+
+def parse_nights(query: str):
+    """Sorgudaki gece sayısı; yoksa None."""
+    match = NIGHTS_PATTERN.search(fold_case(query))
+    return int(match.group(1)) if match and int(match.group(1)) > 0 else None
+
+
+MONTHS = {
+    "ocak": 1, "şubat": 2, "mart": 3, "nisan": 4, "mayıs": 5, "haziran": 6,
+    "temmuz": 7, "ağustos": 8, "eylül": 9, "ekim": 10, "kasım": 11, "aralık": 12,
+}
+_MONTH = "(" + "|".join(MONTHS) + ")"
+
+# Konaklama tarihleri (sıra önceliktir):
+# "2026-06-15 / 2026-06-20", "15.06.2026 - 20.06.2026", "15 haziran - 3 temmuz", "15-20 haziran"
+DATE_PATTERNS = (
+    ("iso", re.compile(r"(\d{4}-\d{2}-\d{2})\D+?(\d{4}-\d{2}-\d{2})")),
+    ("dotted", re.compile(r"(\d{1,2})[./](\d{1,2})[./](\d{4})\D+?(\d{1,2})[./](\d{1,2})[./](\d{4})")),
+    ("two_months", re.compile(r"(\d{1,2})\s+" + _MONTH + r"\w*\s*[-–]\s*(\d{1,2})\s+" + _MONTH + r"\w*(?:\s+(\d{4}))?")),
+    ("one_month", re.compile(r"(\d{1,2})\s*[-–]\s*(\d{1,2})\s+" + _MONTH + r"\w*(?:\s+(\d{4}))?")),
+)
+
+
+def _infer_year(month: int, day: int, year, today: date, calendar: tuple = None) -> date:
+    # Yıl yazılmadıysa: uçuş takviminin (ilk, son kalkış günü) yılı; takvim yoksa bu yıl,
+    # tarih geçtiyse gelecek yıl
+    if year:
+        return date(int(year), month, day)
+    if calendar:
+        first, last = calendar
+        candidates = [date(y, month, day) for y in range(first.year, last.year + 1)]
+        # Takvim içindeki tarih; yoksa takvime en yakın olan (kalkış yoksa uyarı planner'da)
+        return min(candidates, key=lambda candidate: max((first - candidate).days, (candidate - last).days, 0))
+    candidate = date(today.year, month, day)
+    return candidate if candidate >= today else date(today.year + 1, month, day)
+
+
+def parse_stay_dates(query: str, today: date = None, calendar: tuple = None):
+    """
+    Sorgudaki giriş / çıkış tarihleri. Yılsız tarihlerin ("15-20 haziran") yılı
+    calendar (uçuş takviminin ilk / son kalkış günü) verilirse ondan çıkarılır.
+
+    Returns: (check_in, check_out) date çifti; bulunamaz veya geçersizse None
+    """
+    text = fold_case(query)
+    today = today or date.today()
+    for kind, pattern in DATE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        groups = match.groups()
+        try:
+            if kind == "iso":
+                check_in, check_out = date.fromisoformat(groups[0]), date.fromisoformat(groups[1])
+            elif kind == "dotted":
+                check_in = date(int(groups[2]), int(groups[1]), int(groups[0]))
+                check_out = date(int(groups[5]), int(groups[4]), int(groups[3]))
+            elif kind == "two_months":
+                check_in = _infer_year(MONTHS[groups[1]], int(groups[0]), groups[4], today, calendar)
+                check_out = _infer_year(MONTHS[groups[3]], int(groups[2]), groups[4] or check_in.year, today, calendar)
+            else:
+                check_in = _infer_year(MONTHS[groups[2]], int(groups[0]), groups[3], today, calendar)
+                check_out = date(check_in.year, check_in.month, int(groups[1]))
+        except ValueError:
+            return None
+        if check_out <= check_in:
+            # "28 aralık - 3 ocak" gibi yıl dönümü
+            check_out = check_out.replace(year=check_out.year + 1) if kind == "two_months" else check_out
+        return (check_in, check_out) if check_out > check_in else None
+    return None
+
+
+def stay_nights(check_in: date, check_out: date) -> int:
+    return max(1, (check_out - check_in).days)
+
+
+def strip_nights(query: str) -> str:
+    """Gece sayısı ifadesini çıkar (anahtar kelime taramasında '3 gece' zaman tercihi sayılmasın)."""
+    return NIGHTS_PATTERN.sub(" ", query)
+
+
+@lru_cache(maxsize=1)
+def get_query_matcher() -> KeywordMatcher:
+    """Tüm sorgu sözlüklerinden derlenmiş matcher (süreç başına bir kez oluşturulur)."""
+    return KeywordMatcher({
+        # Şehir -> (Görünen ad, IATA): data/geography.json'dan
+        "city": get_geography().query_keywords(),
+        "style": TRAVEL_STYLE_KEYWORDS,
+        "time": TIME_KEYWORDS,
+        "flight": FLIGHT_KEYWORDS,
+        "transfer": TRANSFER_KEYWORDS,
+        "theme": THEME_KEYWORDS,
+        "expansion": PROMPT_EXPANSIONS,
+    })
@@ -5,23 +5,25 @@ import sys
 import re
 import logging
 
-# Configure logging (PRODUCTION MODE: nur INFO level)
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Proje kök dizinini Python yoluna ekle (Import hatalarını önlemek için)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
+    from src.model.log_utils import configure_logging
+    from src.model.offline import asset_report
     from src.model.search_engine import MergenSearchEngine
+    from src.model.tracing import start_trace
 except ImportError as e:
+    logging.basicConfig(level=logging.INFO)
     logger.error(f"Modül yükleme hatası: {e}", exc_info=True)
     st.error(f"❌ Modül yükleme hatası. Lütfen yöneticiyle iletişime geçin.")
     st.stop()
 
+# Configure logging (PRODUCTION MODE: INFO; MERGENX_LOG_LEVEL=DEBUG + MERGENX_DEBUG_SAMPLE_RATE ile teşhis)
+configure_logging()
+
 # Sayfa Yapılandırması
 st.set_page_config(
     page_title="MergenX - Akıllı Otel Arama Motoru",
@@ -36,6 +38,10 @@ if "search_results" not in st.session_state:
     st.session_state.search_results = None
 if "search_time" not in st.session_state:
     st.session_state.search_time = 0
+if "search_cursor" not in st.session_state:
+    st.session_state.search_cursor = None
+if "search_trace" not in st.session_state:
+    st.session_state.search_trace = None
 
 # Yardımcı Fonksiyonlar
 def clean_description(text, hotel_name="", city="", concept=""):
@@ -75,10 +81,26 @@ def clean_description(text, hotel_name="", city="", concept=""):
     
     return " ".join(cleaned)
 
+def render_trace_panel(trace_data):
+    """Son isteğin aşama bazlı süre dökümü (src/model/tracing.py)."""
+    with st.expander(f"⏱️ Aşama Süreleri ({trace_data['duration_ms']:.0f} ms)"):
+        rows = []
+        for stage in trace_data["stages"]:
+            rows.append({
+                "Aşama": stage["stage"],
+                "Çağrı": stage["calls"],
+                "Süre (ms)": round(stage["total_ms"], 2),
+                "Pay": f"{stage['share'] * 100:.1f}%",
+                "Sayaçlar": ", ".join(f"{key}={value}" for key, value in stage["attrs"].items()),
+            })
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
 def clear_search():
     """Aramayı temizle fonksiyonu"""
     st.session_state.search_query = ""
     st.session_state.search_results = None
+    st.session_state.search_cursor = None
+    st.session_state.search_trace = None
     st.session_state.search_time = 0
 
 # UI Başlıkları
@@ -121,6 +143,15 @@ if engine:
         else:
             st.success("✅ Vektör DB: Bağlı")
             st.success("✅ LLM: Aktif")
+        
+        # Başlangıç varlıklarının kaynağı (çevrimdışı modda hub'a gidilmez)
+        asset_status = asset_report()
+        st.caption(
+            ("📴 Çevrimdışı mod" if asset_status["offline"] else "🌐 Çevrimiçi mod")
+            + (" • telemetri açık" if asset_status["telemetry"] else " • telemetri kapalı")
+        )
+        for asset_name, asset in asset_status["assets"].items():
+            st.caption(f"📦 {asset_name}: {asset['source']}")
         top_k = st.slider("Öneri Sayısı", 1, 10, 3)
         st.divider()
         
@@ -130,6 +161,8 @@ if engine:
             db_path = "data/chroma_db_v2"
             if os.path.exists(db_path):
                 try:
+                    # Paylaşılan Chroma client'ı kapat (silinen dizine açık client kalmasın)
+                    engine.close()
                     shutil.rmtree(db_path)
                     st.success("✅ Veritabanı silindi! Sayfa yenilendiğinde tekrar oluşturulacak.")
                     st.cache_resource.clear()
@@ -159,15 +192,22 @@ if engine:
         col1, col2, col3 = st.columns([5, 5, 1])
         with col3:
             st.metric("⏱️ Hız", f"{st.session_state.search_time:.2f}s")
+    
+    if st.session_state.search_trace:
+        render_trace_panel(st.session_state.search_trace)
 
-    # Arama sonuçlarını sadece butona basıldığında göster
+    # Yeni arama: ilk sayfa (sonuçlar oturumda tutulur, sonraki sayfalar eklenir)
     if search_button and query:
         with st.spinner("MergenX analiz ediyor..."):
             start_time = time.time()
-            results, error_msg = engine.search(query, top_k=top_k)
+            with start_trace("streamlit_search") as trace:
+                results, next_cursor, error_msg = engine.search_page(query, page_size=top_k)
             elapsed_time = time.time() - start_time
+            st.session_state.search_trace = {"duration_ms": trace.duration_ms, "stages": trace.breakdown()}
             
+            st.session_state.search_query = query
             st.session_state.search_results = results
+            st.session_state.search_cursor = next_cursor
             st.session_state.search_time = elapsed_time
             
             # Sonuç kontrolü
@@ -177,212 +217,243 @@ if engine:
             elif not results or not isinstance(results, list):
                 logger.warning(f"No results for query: {query}")
                 st.error("❌ Arama sonucu bulunamadı. Lütfen bir daha deneyin.")
-            else:
-                # Yeni Arama Yap Butonu
-                st.divider()
-                if st.button("🔎 Yeni Arama Yap", use_container_width=True):
-                    clear_search()
-                    st.rerun()
+    
+    results = st.session_state.search_results
+    if results and isinstance(results, list):
+        # Yeni Arama Yap Butonu
+        st.divider()
+        if st.button("🔎 Yeni Arama Yap", use_container_width=True):
+            clear_search()
+            st.rerun()
+        
+        st.divider()
+        st.markdown("## 🤖 MergenX Seyahat Planı")
+        
+        # Fallback uyarısı varsa göster (ilk kez)
+        if results and results[0].get("fallback_warning"):
+            st.warning(results[0].get("fallback_warning"))
+            st.divider()
+        
+
+        # Paket Kartları - Revize Görünüm
+        for idx, hotel in enumerate(results):
+            with st.container(border=True):
+                # Şehir uyuşmazlığı hatası varsa göster
+                if hotel.get("error"):
+                    st.error(f"⚠️ {hotel.get('error')}")
+                
+                # ============================================================
+                # ÜSTTE: AKILLI ÖZET (LLM'in Önerisi)
+                # ============================================================
+                st.markdown("### ✨ Seyahat Öneriniz")
+                
+                # Package bilgisi kontrol et
+                package = hotel.get("package", {})
+                intelligent_summary = hotel.get("reason", "")
+                
+                if intelligent_summary:
+                    st.success(f"✅ {intelligent_summary}", icon="✨")
+                else:
+                    st.success("✅ Kriterlerinizle tam uyumlu bir paket hazırlandı!", icon="✨")
                 
                 st.divider()
-                st.markdown("## 🤖 MergenX Seyahat Planı")
                 
-                # Fallback uyarısı varsa göster (ilk kez)
-                if results and results[0].get("fallback_warning"):
-                    st.warning(results[0].get("fallback_warning"))
+                # ============================================================
+                # ORTA: PAKET BİLGİLERİ (3 Kolon)
+                # ============================================================
+                st.markdown("### 📦 Paket Detayları")
+                
+                col1, col2, col3 = st.columns(3)
+                
+                # ---- KOLON 1: OTEL BİLGİSİ ----
+                with col1:
+                    st.markdown("#### 🏨 Konaklama")
+                    
+                    hotel_info = package.get("hotel", {})
+                    st.markdown(f"**{hotel_info.get('name', hotel['name'])}**")
+                    st.markdown(f"📍 {hotel_info.get('city', hotel['city'])}")
+                    
+                    if hotel_info.get("concept"):
+                        st.markdown(f"🎯 {hotel_info.get('concept')}")
+                    if hotel_info.get("score") is not None:
+                        st.caption(f"Sorgu benzerliği: {hotel_info['score']:.2f}")
+
+                    # Amenities göster
+                    amenities = hotel_info.get("amenities", [])
+                    if amenities:
+                        st.caption("**Tesisler:**")
+                        for amenity in amenities[:3]:
+                            st.markdown(f"✓ {amenity}")
+                    
+                    # Fiyat
                     st.divider()
+                    price = hotel_info.get("price", hotel['price'])
+                    st.markdown(f"**₺{price:,.0f}** / gece")
                 
-                # Paket Kartları - Revize Görünüm
-                for idx, hotel in enumerate(results):
-                    with st.container(border=True):
-                        # Şehir uyuşmazlığı hatası varsa göster
-                        if hotel.get("error"):
-                            st.error(f"⚠️ {hotel.get('error')}")
-                        
-                        # ============================================================
-                        # ÜSTTE: AKILLI ÖZET (LLM'in Önerisi)
-                        # ============================================================
-                        st.markdown("### ✨ Seyahat Öneriniz")
-                        
-                        # Package bilgisi kontrol et
-                        package = hotel.get("package", {})
-                        intelligent_summary = hotel.get("reason", "")
-                        
-                        if intelligent_summary:
-                            st.success(f"✅ {intelligent_summary}", icon="✨")
-                        else:
-                            st.success("✅ Kriterlerinizle tam uyumlu bir paket hazırlandı!", icon="✨")
-                        
-                        st.divider()
+                # ---- KOLON 2: UÇUŞ BİLGİSİ ----
+                with col2:
+                    st.markdown("#### ✈️ Uçuş")
+                    
+                    flight = package.get("flight")
+                    
+                    if flight:
+                        # Havayolu bilgisi
+                        carrier = flight.get("carrier", "")
+                        carrier_name = ""
                         
-                        # ============================================================
-                        # ORTA: PAKET BİLGİLERİ (3 Kolon)
-                        # ============================================================
-                        st.markdown("### 📦 Paket Detayları")
+                        # Tercüme sözlüğü
+                        carrier_names = {
+                            "TK": "🇹🇷 Türk Hava Yolları",
+                            "PC": "🟡 Pegasus Airlines",
+                            "HV": "Havayolu Express",
+                            "U6": "Bees Airline"
+                        }
+                        carrier_name = carrier_names.get(carrier, carrier)
                         
-                        col1, col2, col3 = st.columns(3)
+                        st.markdown(f"**{carrier_name}**")
+                        st.markdown(f"Uçuş: {flight.get('flight_no', 'N/A')}")
+                        st.markdown(f"Kabin: {flight.get('cabin', 'Ekonomi')}")
                         
-                        # ---- KOLON 1: OTEL BİLGİSİ ----
-                        with col1:
-                            st.markdown("#### 🏨 Konaklama")
-                            
-                            hotel_info = package.get("hotel", {})
-                            st.markdown(f"**{hotel_info.get('name', hotel['name'])}**")
-                            st.markdown(f"📍 {hotel_info.get('city', hotel['city'])}")
-                            
-                            if hotel_info.get("concept"):
-                                st.markdown(f"🎯 {hotel_info.get('concept')}")
-                            
-                            # Amenities göster
-                            amenities = hotel_info.get("amenities", [])
-                            if amenities:
-                                st.caption("**Tesisler:**")
-                                for amenity in amenities[:3]:
-                                    st.markdown(f"✓ {amenity}")
-                            
-                            # Fiyat
-                            st.divider()
-                            price = hotel_info.get("price", hotel['price'])
-                            st.markdown(f"**₺{price:,.0f}** / gece")
+                        if flight.get("departure"):
+                            dep_time = flight.get("departure", "")[:16] if flight.get("departure") else "N/A"
+                            st.markdown(f"📅 {dep_time}")
                         
-                        # ---- KOLON 2: UÇUŞ BİLGİSİ ----
-                        with col2:
-                            st.markdown("#### ✈️ Uçuş")
-                            
-                            flight = package.get("flight")
-                            
-                            if flight:
-                                # Havayolu bilgisi
-                                carrier = flight.get("carrier", "")
-                                carrier_name = ""
-                                
-                                # Tercüme sözlüğü
-                                carrier_names = {
-                                    "TK": "🇹🇷 Türk Hava Yolları",
-                                    "PC": "🟡 Pegasus Airlines",
-                                    "HV": "Havayolu Express",
-                                    "U6": "Bees Airline"
-                                }
-                                carrier_name = carrier_names.get(carrier, carrier)
-                                
-                                st.markdown(f"**{carrier_name}**")
-                                st.markdown(f"Uçuş: {flight.get('flight_no', 'N/A')}")
-                                st.markdown(f"Kabin: {flight.get('cabin', 'Ekonomi')}")
-                                
-                                if flight.get("departure"):
-                                    dep_time = flight.get("departure", "")[:16] if flight.get("departure") else "N/A"
-                                    st.markdown(f"📅 {dep_time}")
-                                
-                                if flight.get("baggage"):
-                                    st.markdown(f"🛄 {flight.get('baggage')}")
-                                
-                                st.divider()
-                                st.markdown(f"**₺{flight.get('price', 0):,.0f}**")
-                            else:
-                                st.markdown("ℹ️ *Uçuş pakete dahil değil*")
-                                st.markdown("---")
-                                st.markdown("**₺0**")
+                        if flight.get("baggage"):
+                            st.markdown(f"🛄 {flight.get('baggage')}")
                         
-                        # ---- KOLON 3: TRANSFER BİLGİSİ ----
-                        with col3:
-                            st.markdown("#### 🚗 Transfer")
-                            
-                            transfer = package.get("transfer")
-                            
-                            if transfer:
-                                # Araç tipi tercümesi
-                                vehicle_code = transfer.get("vehicle_category", "")
-                                vehicle_names = {
-                                    "VAN_VIP": "🚐 Lüks VIP Araç",
-                                    "VAN_STANDARD": "🚌 Standart Minibüs",
-                                    "CAR_ECONOMY": "🚗 Ekonomik Sedan",
-                                    "CAR_COMFORT": "🚙 Konforlu Sedan",
-                                    "CAR_PREMIUM": "🚘 Premium Araç",
-                                    "SUV": "🚙 SUV",
-                                    "LUXURY": "👑 Lüks Araç"
-                                }
-                                vehicle_name = vehicle_names.get(vehicle_code, vehicle_code)
-                                
-                                st.markdown(f"**{vehicle_name}**")
-                                st.markdown(f"Route: {transfer.get('from', 'N/A')} → {transfer.get('to', 'N/A')}")
-                                
-                                duration = transfer.get("duration", 0)
-                                if duration:
-                                    st.markdown(f"⏱️ {duration} dakika")
-                                
-                                # Özellikler
-                                features = transfer.get("vehicle_features", [])
-                                if features:
-                                    st.caption("**Olanaklar:**")
-                                    for feature in features[:2]:
-                                        feature_names = {
-                                            "WIFI": "📶 WiFi",
-                                            "BABY_SEAT_AVAIL": "👶 Bebek Koltuğu",
-                                            "LEATHER_SEATS": "🛋️ Deri Koltuk",
-                                            "CLIMATE_CONTROL": "❄️ İklim Kontrolü",
-                                            "REFRESHMENTS": "🥤 İçecek Servisi"
-                                        }
-                                        feature_name = feature_names.get(feature, feature)
-                                        st.markdown(f"✓ {feature_name}")
-                                
-                                st.divider()
-                                # Fiyatı güvenli şekilde göster
-                                transfer_price = transfer.get('price', 0)
-                                if transfer_price is None:
-                                    transfer_price = 0
-                                st.markdown(f"**₺{float(transfer_price):,.0f}**")
-                            else:
-                                st.markdown("ℹ️ *Transfer pakete dahil değil*")
-                                st.markdown("---")
-                                st.markdown("**₺0**")
+                        # Tarihli aramada dönüş uçuşu
+                        return_flight = package.get("return_flight")
+                        if return_flight:
+                            st.markdown(f"↩️ Dönüş: {return_flight.get('flight_no', 'N/A')} · {return_flight.get('departure', '')[:16]}")
                         
-                        # ============================================================
-                        # ALT: TOPLAM PAKET TUTARI
-                        # ============================================================
                         st.divider()
+                        st.markdown(f"**₺{flight.get('price', 0) + (return_flight or {}).get('price', 0):,.0f}**")
+                    else:
+                        st.markdown("ℹ️ *Uçuş pakete dahil değil*")
+                        st.markdown("---")
+                        st.markdown("**₺0**")
+                
+                # ---- KOLON 3: TRANSFER BİLGİSİ ----
+                with col3:
+                    st.markdown("#### 🚗 Transfer")
+                    
+                    transfer = package.get("transfer")
+                    
+                    if transfer:
+                        # Araç tipi tercümesi
+                        vehicle_code = transfer.get("vehicle_category", "")
+                        vehicle_names = {
+                            "VAN_VIP": "🚐 Lüks VIP Araç",
+                            "VAN_STANDARD": "🚌 Standart Minibüs",
+                            "CAR_ECONOMY": "🚗 Ekonomik Sedan",
+                            "CAR_COMFORT": "🚙 Konforlu Sedan",
+                            "CAR_PREMIUM": "🚘 Premium Araç",
+                            "SUV": "🚙 SUV",
+                            "LUXURY": "👑 Lüks Araç"
+                        }
+                        vehicle_name = vehicle_names.get(vehicle_code, vehicle_code)
                         
-                        # Fiyat hesaplaması - price_breakdown'dan al
-                        price_breakdown = package.get("price_breakdown", {})
-                        
-                        if price_breakdown:
-                            # Yeni yapıdan oku
-                            hotel_price = price_breakdown.get("hotel", 0)
-                            flight_price = price_breakdown.get("flight", 0)
-                            transfer_price = price_breakdown.get("transfer", 0)
-                            total_price = price_breakdown.get("total", 0)
-                        else:
-                            # Fallback: Eski yapıdan oku (compatibility)
-                            hotel_price = package.get("hotel", {}).get("price", hotel['price'])
-                            flight_price = package.get("flight", {}).get("price", 0) if package.get("flight") else 0
-                            transfer_price = package.get("transfer", {}).get("price", 0) if package.get("transfer") else 0
-                            total_price = hotel_price + flight_price + transfer_price
+                        st.markdown(f"**{vehicle_name}**")
+                        st.markdown(f"Route: {transfer.get('from', 'N/A')} → {transfer.get('to', 'N/A')}")
                         
-                        # Fiyat dökümü
-                        col_break1, col_break2, col_break3 = st.columns(3)
-                        with col_break1:
-                            st.metric("🏨 Otel", f"₺{hotel_price:,.0f}")
-                        with col_break2:
-                            if flight_price > 0:
-                                st.metric("✈️ Uçuş", f"₺{flight_price:,.0f}")
-                            else:
-                                st.metric("✈️ Uçuş", "—")
-                        with col_break3:
-                            if transfer_price > 0:
-                                st.metric("🚗 Transfer", f"₺{transfer_price:,.0f}")
-                            else:
-                                st.metric("🚗 Transfer", "—")
+                        duration = transfer.get("duration", 0)
+                        if duration:
+                            st.markdown(f"⏱️ {duration} dakika")
                         
-                        # TOPLAM - ✅ BELİRGİN GÖSTERIM
-                        st.divider()
-                        col_total1, col_total2 = st.columns([1, 2])
-                        with col_total1:
-                            st.markdown("### 💰")
-                        with col_total2:
-                            st.markdown(f"## TOPLAM: **₺{total_price:,.0f}**")
+                        # Özellikler
+                        features = transfer.get("vehicle_features", [])
+                        if features:
+                            st.caption("**Olanaklar:**")
+                            for feature in features[:2]:
+                                feature_names = {
+                                    "WIFI": "📶 WiFi",
+                                    "BABY_SEAT_AVAIL": "👶 Bebek Koltuğu",
+                                    "LEATHER_SEATS": "🛋️ Deri Koltuk",
+                                    "CLIMATE_CONTROL": "❄️ İklim Kontrolü",
+                                    "REFRESHMENTS": "🥤 İçecek Servisi"
+                                }
+                                feature_name = feature_names.get(feature, feature)
+                                st.markdown(f"✓ {feature_name}")
                         
-                        st.markdown(f"*Otel ₺{hotel_price:,.0f} + Uçuş ₺{flight_price:,.0f} + Transfer ₺{transfer_price:,.0f}*")
                         st.divider()
+                        # Fiyatı güvenli şekilde göster
+                        transfer_price = transfer.get('price', 0)
+                        if transfer_price is None:
+                            transfer_price = 0
+                        st.markdown(f"**₺{float(transfer_price):,.0f}**")
+                    else:
+                        st.markdown("ℹ️ *Transfer pakete dahil değil*")
+                        st.markdown("---")
+                        st.markdown("**₺0**")
+                
+                # ============================================================
+                # ALT: TOPLAM PAKET TUTARI
+                # ============================================================
+                st.divider()
+                
+                # Fiyat hesaplaması - price_breakdown'dan al
+                price_breakdown = package.get("price_breakdown", {})
+                
+                if price_breakdown:
+                    # Yeni yapıdan oku
+                    hotel_price = price_breakdown.get("hotel", 0)
+                    flight_price = price_breakdown.get("flight", 0)
+                    transfer_price = price_breakdown.get("transfer", 0)
+                    total_price = price_breakdown.get("total", 0)
+                else:
+                    # Fallback: Eski yapıdan oku (compatibility)
+                    hotel_price = package.get("hotel", {}).get("price", hotel['price'])
+                    flight_price = package.get("flight", {}).get("price", 0) if package.get("flight") else 0
+                    transfer_price = package.get("transfer", {}).get("price", 0) if package.get("transfer") else 0
+                    total_price = hotel_price + flight_price + transfer_price
+                
+                # Fiyat dökümü
+                col_break1, col_break2, col_break3 = st.columns(3)
+                nights = package.get("metadata", {}).get("nights", 1)
+                with col_break1:
+                    st.metric(f"🏨 Otel ({nights} gece)" if nights > 1 else "🏨 Otel", f"₺{hotel_price:,.0f}")
+                with col_break2:
+                    if flight_price > 0:
+                        st.metric("✈️ Uçuş", f"₺{flight_price:,.0f}")
+                    else:
+                        st.metric("✈️ Uçuş", "—")
+                with col_break3:
+                    if transfer_price > 0:
+                        st.metric("🚗 Transfer", f"₺{transfer_price:,.0f}")
+                    else:
+                        st.metric("🚗 Transfer", "—")
+                
+                # TOPLAM - ✅ BELİRGİN GÖSTERIM
+                st.divider()
+                col_total1, col_total2 = st.columns([1, 2])
+                with col_total1:
+                    st.markdown("### 💰")
+                with col_total2:
+                    st.markdown(f"## TOPLAM: **₺{total_price:,.0f}**")
+                
+                st.markdown(f"*Otel ₺{hotel_price:,.0f} + Uçuş ₺{flight_price:,.0f} + Transfer ₺{transfer_price:,.0f}*")
+                st.divider()
+        
+        # Sonraki sayfa: aynı aday havuzundan, sadece yeni paketler için özet üretilir
+        if st.session_state.search_cursor:
+            if st.button("➕ Daha Fazla Paket Göster", use_container_width=True):
+                with st.spinner("Yeni paketler hazırlanıyor..."):
+                    with start_trace("streamlit_next_page") as trace:
+                        more_results, next_cursor, error_msg = engine.search_page(
+                            st.session_state.search_query,
+                            page_size=top_k,
+                            cursor=st.session_state.search_cursor
+                        )
+                st.session_state.search_trace = {"duration_ms": trace.duration_ms, "stages": trace.breakdown()}
+                if error_msg:
+                    logger.error(f"Pagination error: {error_msg}")
+                    st.error(f"❌ {error_msg}")
+                    st.session_state.search_cursor = None
+                else:
+                    st.session_state.search_results = results + more_results
+                    st.session_state.search_cursor = next_cursor
+                    st.rerun()
+
 
-                    
 else:
     st.warning("⚠️ Sistem yüklenemedi. Lütfen terminal loglarını kontrol edin.")
\ No newline at end of file
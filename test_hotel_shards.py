@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# HotelShardRouter kontrolü: paralel parça sorguları çağıranın trace'ine span yazar, sonuçlar mesafeye göre birleşir
+import threading
+
+from src.model.hotel_shards import HotelShardRouter
+from src.model.log_utils import CorrelationIdFilter
+from src.model.tracing import current_trace, span, start_trace
+
+
+class FakeShard:
+    """collection.query / count arayüzü: sabit oteller, sorgu thread'i ve trace kimliği kaydedilir."""
+
+    def __init__(self, hotels: list):
+        self.hotels = hotels  # (id, şehir, mesafe)
+        self.calls = []
+
+    def count(self) -> int:
+        return len(self.hotels)
+
+    def query(self, query_embeddings, n_results, include, where=None):
+        trace = current_trace()
+        self.calls.append((threading.current_thread().name, trace.trace_id if trace else None))
+        rows = sorted(self.hotels, key=lambda hotel: hotel[2])[:n_results]
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for _ in query_embeddings:
+            result["ids"].append([hotel_id for hotel_id, _, _ in rows])
+            result["documents"].append([hotel_id for hotel_id, _, _ in rows])
+            result["metadatas"].append([{"city": city} for _, city, _ in rows])
+            result["distances"].append([distance for _, _, distance in rows])
+        return result
+
+
+def _router():
+    # airport modu: Muğla otelleri iki parçada (BJV, DLM); BJV parçasında bir Aydın oteli de var
+    shards = {
+        "BJV": FakeShard([("bjv-1", "Muğla", 0.2), ("bjv-2", "Aydın", 0.1), ("bjv-3", "Muğla", 0.5)]),
+        "DLM": FakeShard([("dlm-1", "Muğla", 0.3), ("dlm-2", "Muğla", 0.4)]),
+    }
+    city_shards = {"Muğla": {"BJV": 2, "DLM": 2}, "Aydın": {"BJV": 1}}
+    return HotelShardRouter(FakeShard([]), shards, city_shards, "airport"), shards
+
+
+def test_parallel_shard_spans_attach_to_parent_trace():
+    router, shards = _router()
+    try:
+        with start_trace("plan_travel") as trace:
+            with span("ann_query"):
+                result = router.query([[0.0, 1.0]], n_results=3, city="Muğla")
+        shard_spans = [s for s in trace.spans if s.name == "shard_query"]
+        assert sorted(s.attrs["shard"] for s in shard_spans) == ["BJV", "DLM"]
+        assert all(s.parent == "ann_query" for s in shard_spans)
+        # Sorgular worker thread'lerinde çalıştı ve aynı trace'i (korelasyon kimliğini) gördü
+        for shard in shards.values():
+            assert [trace_id for _, trace_id in shard.calls] == [trace.trace_id]
+            assert all(name.startswith("mergenx-shard") for name, _ in shard.calls)
+        # Başka şehrin oteli süzülür, parçalar mesafeye göre birleşir
+        assert result["ids"][0] == ["bjv-1", "dlm-1", "dlm-2"]
+    finally:
+        router.close()
+
+
+def test_correlation_id_in_shard_threads():
+    router, shards = _router()
+    seen = []
+    original = shards["DLM"].query
+
+    def logging_query(*args, **kwargs):
+        record = type("Record", (), {})()
+        CorrelationIdFilter().filter(record)
+        seen.append(record.correlation_id)
+        return original(*args, **kwargs)
+
+    shards["DLM"].query = logging_query
+    try:
+        with start_trace("plan_travel") as trace:
+            router.query([[0.0, 1.0]], n_results=2, city="Muğla")
+        assert seen == [trace.trace_id]
+    finally:
+        router.close()
+
+
+if __name__ == "__main__":
+    test_parallel_shard_spans_attach_to_parent_trace()
+    test_correlation_id_in_shard_threads()
+    print("HotelShardRouter: parça span'leri ve korelasyon kimliği üst trace'te")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# CompactVectorStore kontrolü: int8 / float16 recall@k, float32 kaba kuvvete (exact_search) karşı;
+# disk deposu derlemeler arasında dizileri karıştırmaz
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.model.hotel_vectors import CompactVectorStore, _normalize, exact_search, load_or_build, quantize
+
+
+def _store(precision: str, hotels: int = 2000, dim: int = 64, seed: int = 0) -> CompactVectorStore:
+    rng = np.random.default_rng(seed)
+    # Kümeli vektörler: benzer oteller birbirine yakın (kaba kuvvet sıralaması kolay değil)
+    centers = rng.normal(size=(20, dim))
+    full = _normalize(centers[rng.integers(0, 20, hotels)] + 0.3 * rng.normal(size=(hotels, dim)))
+    codes, scale = quantize(full, precision)
+    ids = np.array([f"hotel-{i}".encode("utf-8") for i in range(hotels)])
+    prices = rng.integers(500, 10000, hotels).astype(np.float32)
+    return CompactVectorStore(ids, codes, scale, full, prices, precision)
+
+
+def _recall(store: CompactVectorStore, k: int, rescore_factor: int, max_price: float = None,
+            queries: int = 100) -> float:
+    rng = np.random.default_rng(1)
+    position = {value.decode("utf-8"): index for index, value in enumerate(store.ids)}
+    recalls = []
+    for query in rng.normal(size=(queries, store.full.shape[1])).astype(np.float32):
+        ids, _scores, _rescored = store.search(query, k, max_price, rescore_factor)
+        expected = set(exact_search(store.full, query, k, store.prices, max_price).tolist())
+        found = {position[hotel_id] for hotel_id in ids}
+        if max_price is not None:
+            assert all(store.prices[i] <= max_price for i in found)
+        recalls.append(len(found & expected) / max(len(expected), 1))
+    return float(np.mean(recalls))
+
+
+def test_int8_recall():
+    store = _store("int8")
+    for k in (10, 30):
+        assert _recall(store, k, rescore_factor=4) >= 0.99, k
+        assert _recall(store, k, rescore_factor=0) >= 0.85, k  # sadece aday geçişi
+
+
+def test_float16_recall():
+    assert _recall(_store("float16"), 10, rescore_factor=4) == 1.0
+
+
+def test_price_filter():
+    assert _recall(_store("int8"), 10, rescore_factor=4, max_price=3000) >= 0.99
+
+
+class FakeCollection:
+    """collection.get / count arayüzü: sayfa sayfa (id, vektör, fiyat)."""
+
+    def __init__(self, hotels: int, dim: int = 8, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.id = f"collection-{hotels}"
+        self.ids = [f"hotel-{i}" for i in range(hotels)]
+        self.vectors = rng.normal(size=(hotels, dim)).tolist()
+        self.gets = 0
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def get(self, include, limit, offset):
+        self.gets += 1
+        rows = slice(offset, offset + limit)
+        return {"ids": self.ids[rows], "embeddings": self.vectors[rows],
+                "metadatas": [{"price": 1000.0} for _ in self.ids[rows]]}
+
+
+def test_store_builds_switch_atomically():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = FakeCollection(50)
+        assert len(load_or_build(first, cache_dir, "int8", "db")) == 50
+        # Güncel derleme yeniden açılır (koleksiyon okunmaz)
+        reopened = FakeCollection(50)
+        assert len(load_or_build(reopened, cache_dir, "int8", "db")) == 50 and reopened.gets == 0
+
+        # Yeni derleme kendi dosyalarına yazar; eski derlemenin açık dizileri değişmez
+        old = load_or_build(first, cache_dir, "int8", "db")
+        assert len(load_or_build(FakeCollection(80), cache_dir, "int8", "db")) == 80
+        assert len(old.ids) == len(old.full) == 50
+
+        # Meta'daki sayıyla uyuşmayan dizi (yarım kalmış / karışmış yazım) kullanılmaz, depo yeniden derlenir
+        meta_path = next(Path(cache_dir).glob("*.meta.json"))
+        build = json.loads(meta_path.read_text(encoding="utf-8"))["build"]
+        np.save(next(Path(cache_dir).glob(f"*.{build}.full.npy")), np.zeros((50, 8), dtype=np.float32))
+        rebuilt = FakeCollection(80)
+        store = load_or_build(rebuilt, cache_dir, "int8", "db")
+        assert rebuilt.gets > 0 and len(store.full) == len(store.ids) == 80
+
+
+if __name__ == "__main__":
+    store = _store("int8")
+    for k in (10, 30):
+        print(f"int8 recall@{k}: yeniden puanlamalı {_recall(store, k, 4):.4f}, aday geçişi {_recall(store, k, 0):.4f}")
+    test_int8_recall()
+    test_float16_recall()
+    test_price_filter()
+    test_store_builds_switch_atomically()
+    print("CompactVectorStore: recall ve derleme değişimi kontrolleri geçti")
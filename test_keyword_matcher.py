@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# KeywordMatcher (Aho-Corasick) kontrolü: sonuçlar `keyword in text` / str.find ile birebir aynı olmalı
+import random
+
+from src.model.keyword_matcher import KeywordMatcher, fold_case
+
+ALPHABET = "abcçiıİIsşu "
+
+
+def _random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def _substring_hits(vocabulary: dict, text: str) -> set:
+    """Referans: her anahtar kelimenin tüm (çakışan dahil) geçişleri, str.find ile."""
+    folded = fold_case(text)
+    hits = set()
+    for keyword in vocabulary:
+        needle = fold_case(keyword)
+        start = folded.find(needle)
+        while start != -1:
+            hits.add((keyword, start, start + len(needle)))
+            start = folded.find(needle, start + 1)
+    return hits
+
+
+def test_matches_str_find(trials: int = 3000, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(trials):
+        vocabulary = {_random_text(rng, rng.randint(1, 4)): True for _ in range(rng.randint(1, 8))}
+        text = _random_text(rng, rng.randint(0, 40))
+        matcher = KeywordMatcher({"test": vocabulary})
+        found = {(hit.keyword, hit.start, hit.end) for hit in matcher.find_all(text)}
+        assert found == _substring_hits(vocabulary, text), (vocabulary, text)
+
+
+def test_scan_priority():
+    matcher = KeywordMatcher({"city": {"antalya": "AYT", "izmir": "ADB"}, "time": {"sabah": "morning", "akşam": "evening"}})
+    hits = matcher.scan("İZMİR'e akşam, Antalya'ya sabah")
+    assert [hit.value for hit in hits["city"]] == ["AYT", "ADB"]  # sözlük sırası önceliktir
+    assert matcher.first("İzmir sabah", "time") == "morning" and matcher.first("otel", "time", "yok") == "yok"
+
+
+if __name__ == "__main__":
+    test_matches_str_find()
+    test_scan_priority()
+    print("KeywordMatcher: str.find ile birebir aynı (3000 rastgele deneme)")
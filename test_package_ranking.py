@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# pareto_front ve rank_combinations kontrolü: kaba kuvvetle aynı sonuç
+import random
+
+import numpy as np
+
+from src.model.package_ranking import RankingWeights, pareto_front, rank_combinations
+
+
+def _brute_force_front(prices, penalties) -> list:
+    """Referans: hiçbir adayın (eşitler arasında dosya sırasında öncekinin) baskın olmadığı indeksler."""
+    front = []
+    for i in range(len(prices)):
+        dominated = False
+        for j in range(len(prices)):
+            if j == i:
+                continue
+            no_worse = prices[j] <= prices[i] and penalties[j] <= penalties[i]
+            better = prices[j] < prices[i] or penalties[j] < penalties[i]
+            if no_worse and (better or j < i):
+                dominated = True
+                break
+        if not dominated:
+            front.append(i)
+    return front
+
+
+def test_pareto_front_brute_force(trials: int = 2000, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(trials):
+        n = rng.randint(1, 12)
+        # Küçük tamsayılar: eşit fiyat / ceza durumları sık oluşur
+        prices = np.array([float(rng.randint(1, 6)) for _ in range(n)])
+        penalties = np.array([float(rng.randint(0, 4)) for _ in range(n)])
+        assert pareto_front(prices, penalties).tolist() == _brute_force_front(prices, penalties), (prices, penalties)
+
+
+def test_pruning_keeps_best_combination(trials: int = 300, seed: int = 1):
+    # Uçuş / transfer dizilerini önce pareto_front ile daraltmak seçilen skoru değiştirmemeli
+    rng = np.random.default_rng(seed)
+    weights = RankingWeights()
+    for _ in range(trials):
+        hotels = rng.integers(500, 5000, size=rng.integers(1, 5)).astype(float)
+        flights = rng.integers(1000, 4000, size=rng.integers(1, 8)).astype(float)
+        flight_pen = rng.integers(0, 3, size=len(flights)).astype(float)
+        transfers = rng.integers(200, 1500, size=rng.integers(1, 8)).astype(float)
+        transfer_pen = rng.integers(0, 3, size=len(transfers)).astype(float)
+        _, _, full_scores, _ = rank_combinations(hotels, flights, flight_pen, transfers, transfer_pen, weights)
+        f, t = pareto_front(flights, flight_pen), pareto_front(transfers, transfer_pen)
+        _, _, pruned_scores, _ = rank_combinations(hotels, flights[f], flight_pen[f], transfers[t], transfer_pen[t],
+                                                   weights)
+        assert np.allclose(full_scores, pruned_scores)
+
+
+if __name__ == "__main__":
+    test_pareto_front_brute_force()
+    test_pruning_keeps_best_combination()
+    print("pareto_front: kaba kuvvetle aynı; daraltma en iyi kombinasyonu korur")